@@ -0,0 +1,108 @@
+"""
+Metrik akurasi forecast terhadap data aktual yang diperbarui secara inkremental.
+
+Untuk setiap key (misalnya Origin City) disimpan jumlah berjalan (lihat
+`FIELDS`), bukan nilai metriknya. Saat data aktual beberapa hari baru masuk,
+kontribusi hari-hari tersebut cukup ditambahkan (dan kontribusi lama untuk
+hari yang dikoreksi dikurangi), sehingga biaya update sebanding dengan
+jumlah hari yang masuk, bukan panjang seluruh periode.
+
+Metrik (dalam persen):
+- WAPE: total |forecast - aktual| / total aktual.
+- MAPE: rata-rata |forecast - aktual| / aktual untuk hari dengan aktual != 0.
+- Bias: total (forecast - aktual) / total aktual (positif = forecast terlalu tinggi).
+"""
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk membuat tabel akurasi
+import pandas as pd
+
+# Urutan baris pada matriks jumlah berjalan [len(FIELDS) x key]
+FIELDS = ('days', 'actual', 'forecast', 'abs_error', 'error', 'ape', 'ape_days')
+
+
+# Fungsi untuk menghitung jumlah berjalan dari potongan forecast dan aktual [key x tanggal]
+def metric_sums(forecast, actual):
+    """
+    Parameters:
+    - forecast: Matriks forecast [key x tanggal].
+    - actual: Matriks aktual dengan bentuk sama (NaN = belum ada data).
+
+    Returns:
+    - np.ndarray [len(FIELDS) x key]; sel tanpa aktual atau forecast tidak dihitung.
+    """
+    forecast = np.asarray(forecast, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    valid = ~np.isnan(actual) & ~np.isnan(forecast)
+    actual = np.where(valid, actual, 0)
+    error = np.where(valid, forecast, 0) - actual
+    nonzero = valid & (actual != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.where(nonzero, np.abs(error) / np.abs(actual), 0)
+    return np.stack([
+        valid.sum(axis=1), actual.sum(axis=1), (actual + error).sum(axis=1), np.abs(error).sum(axis=1),
+        error.sum(axis=1), ape.sum(axis=1), nonzero.sum(axis=1),
+    ]).astype(float)
+
+
+# Fungsi untuk memperbarui jumlah berjalan saat beberapa kolom (tanggal) data aktual diganti
+def update_sums(sums, forecast, old_actual, new_actual):
+    """
+    Parameters:
+    - sums: Jumlah berjalan saat ini (dari `metric_sums`).
+    - forecast: Forecast [key x tanggal] untuk tanggal yang berubah saja.
+    - old_actual, new_actual: Aktual sebelum dan sesudah untuk tanggal yang sama.
+
+    Returns:
+    - Jumlah berjalan baru.
+    """
+    return sums - metric_sums(forecast, old_actual) + metric_sums(forecast, new_actual)
+
+
+# Fungsi untuk menghitung WAPE, MAPE, dan Bias dari jumlah berjalan
+def metrics_from_sums(sums):
+    """
+    Returns:
+    - Dictionary array per key: 'days', 'actual', 'forecast', 'abs_error',
+      'wape', 'mape', dan 'bias' (persen, NaN jika tidak terdefinisi).
+    """
+    values = dict(zip(FIELDS, np.asarray(sums, dtype=float)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'days': values['days'],
+            'actual': values['actual'],
+            'forecast': values['forecast'],
+            'abs_error': values['abs_error'],
+            'wape': np.where(values['actual'] != 0, values['abs_error'] / values['actual'] * 100, np.nan),
+            'mape': np.where(values['ape_days'] > 0, values['ape'] / values['ape_days'] * 100, np.nan),
+            'bias': np.where(values['actual'] != 0, values['error'] / values['actual'] * 100, np.nan),
+        }
+
+
+# Fungsi untuk membuat tabel akurasi (baris total di atas, lalu per key)
+def accuracy_table(keys, sums, key_name='Origin City', total_label='All Origin Cities'):
+    """
+    Returns:
+    - DataFrame berisi angka yang sudah diformat untuk tampilan tabel
+      ('Observations' = jumlah hari dengan data aktual, pada baris total
+      dijumlahkan untuk semua key); key tanpa data aktual tidak ditampilkan.
+    """
+    sums = np.asarray(sums, dtype=float)
+    has_actual = sums[FIELDS.index('days')] > 0
+    labels = [total_label] + [key for key, keep in zip(keys, has_actual) if keep]
+    metrics = metrics_from_sums(np.column_stack([sums.sum(axis=1), sums[:, has_actual]]))
+
+    def percent(values):
+        return [f"{x:.2f}%" if pd.notnull(x) else "N/A" for x in values]
+
+    return pd.DataFrame({
+        key_name: labels,
+        'Observations': [f"{x:,.0f}" for x in metrics['days']],
+        'Actual': [f"{x:,.0f}" for x in metrics['actual']],
+        'Forecast': [f"{x:,.0f}" for x in metrics['forecast']],
+        'Abs Error': [f"{x:,.0f}" for x in metrics['abs_error']],
+        'WAPE': percent(metrics['wape']),
+        'MAPE': percent(metrics['mape']),
+        'Bias': percent(metrics['bias']),
+    })
@@ -7,9 +7,49 @@ from flask import Flask, render_template, request, redirect, url_for, send_file,
 
 # Library untuk melakukan manipulasi terhadap dataset
 import pandas as pd
+import numpy as np
 
-# Library yang mengunggah model Prophet untuk melakukan forecasting
-from prophet import Prophet
+# Fitting per series (Prophet harian atau mingguan), bisa dijalankan lokal maupun di worker task queue
+from prophet_fits import fit_origin_city
+
+# Task queue untuk mengirim fitting ke worker di mesin lain (opsional)
+from task_queue import executor_from_env, wait_result
+
+# Deduplikasi series sebelum fitting
+from series_dedup import forecast_unique_series, series_fingerprint
+
+# Forecast cadangan saat batas waktu analisis hampir habis
+from fallback_forecast import TimeBudget, ForecastCache, fallback_forecast, METHOD_PROPHET, METHOD_FLAT
+
+# Perbandingan banyak skenario growth sekaligus
+from growth_scenarios import ScenarioCache, scenario_results
+
+# Cube agregasi untuk semua rollup dashboard
+from rollup_cube import RollupCube
+
+# Policy window training sebelum fitting
+from training_window import TRAINING_WINDOW_CHOICES, parse_training_window, apply_training_window
+
+# Antrian job untuk menjalankan analisis di background
+from job_queue import JobQueue, DONE, FAILED, CANCELLED
+
+# Pembatalan job: menghentikan fitting baru dan proses cmdstan yang sedang berjalan
+from cancellation import JobCancelled, cancel_scope, track_cmdstan_processes
+
+# Scheduler global untuk membatasi fitting bersamaan sesuai jumlah core
+from fit_scheduler import FitScheduler
+
+# Penyimpanan hasil analisis per job/sesi
+from result_store import AnalysisStore
+
+# Store forecast numerik (memory-map) yang dibagi antar worker proses
+from forecast_arrays import ForecastArrayStore
+
+# Library untuk streaming progress ke browser (Server-Sent Events)
+import time
+import uuid
+import threading
+from flask import Response, stream_with_context
 
 import random
 
@@ -19,22 +59,81 @@ import plotly.io as pio
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 
+# Grafik dengan satu trace per series dan pilihan Origin City di browser
+from compact_chart import compact_chart_html, chart_series, compact_values, downsample_indices, MAX_POINTS
+
+# Cache tabel HTML dan grafik yang sudah dirender per analisis, view, dan growth
+from render_cache import RenderCache
+
+# Metrik akurasi forecast vs aktual (WAPE, MAPE, Bias) yang diperbarui inkremental
+from actual_metrics import metric_sums, update_sums, accuracy_table
+
+
+# Asset UI (Plotly.js, jQuery, Bootstrap) disajikan lokal dengan nama ber-fingerprint
+import static_assets
+
+# Kompresi respons (gzip/brotli) untuk HTML dan JSON yang besar
+import compression
+
+# Serialisasi JSON cepat (orjson) untuk jsonify, termasuk array NumPy
+import fast_json
 
 
 app = Flask(__name__)
+static_assets.init_app(app)
+compression.init_app(app, min_size=int(os.environ.get('FORECAST_COMPRESS_MIN_BYTES', 1024)))
+fast_json.init_app(app)
 UPLOAD_FOLDER = 'uploads'
 RESULT_FOLDER = 'results'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULT_FOLDER, exist_ok=True)
 
-# Variabel global untuk menyimpan hasil forecast
-forecast_results = {}
-result_df = None
-base_forecast_df = None
+# Hasil forecast disimpan per analisis (ID job), bukan di variabel global,
+# agar analisis yang berjalan bersamaan tidak saling menimpa dan bisa dibaca oleh worker lain
+analysis_store = AnalysisStore(
+    os.path.join(RESULT_FOLDER, 'analyses'),
+    ttl_seconds=int(os.environ.get('FORECAST_RESULT_TTL', 6 * 3600))
+)
+
+# Forecast numerik per analisis ditulis sekali sebagai array memory-map, sehingga
+# /update-growth, /compare-forecast-actual, dan /export bisa dilayani worker mana pun tanpa memuat ulang analisis
+forecast_arrays = ForecastArrayStore(
+    os.path.join(RESULT_FOLDER, 'arrays'),
+    ttl_seconds=analysis_store.ttl_seconds
+)
+
+# Forecast Prophet terbaru per series, dipakai sebagai cadangan tercepat jika budget waktu habis
+forecast_cache = ForecastCache(max_entries=int(os.environ.get('FORECAST_CACHE_ENTRIES', 500)))
+
+# Cache hasil skenario growth per ID analisis dan ID skenario
+scenario_cache = ScenarioCache(max_entries=int(os.environ.get('FORECAST_SCENARIO_CACHE_ENTRIES', 200)))
+
+# Cache tabel dan grafik yang sudah dirender (update growth berulang dan membuka ulang hasil tidak merender ulang)
+render_cache = RenderCache(max_entries=int(os.environ.get('FORECAST_RENDER_CACHE_ENTRIES', 100)))
+
+# Penambahan data aktual (baca-ubah-tulis actual.npy) dijalankan satu per satu di proses ini
+actuals_lock = threading.Lock()
+
+# Jika FORECAST_TASK_QUEUE diisi (folder shared filesystem), fitting dikirim ke worker
+# (`python task_queue.py <folder>`) alih-alih dijalankan di proses ini
+remote_fits = executor_from_env()
+
+# Catat proses cmdstan per job agar fitting yang sedang berjalan bisa dihentikan saat job dibatalkan
+track_cmdstan_processes()
+
+# Worker pool untuk job /analyze (jumlah analisis yang berjalan bersamaan)
+analysis_jobs = JobQueue(max_workers=int(os.environ.get('FORECAST_JOB_WORKERS', 4)))
+
+# Semua fitting dari semua job berbagi slot CPU yang sama: maksimal satu fitting per core,
+# slot dibagi adil antar job, dan job kecil (interaktif) didahulukan dari job besar
+fit_scheduler = FitScheduler(
+    slots=int(os.environ.get('FORECAST_FIT_SLOTS', 0)) or None,
+    interactive_series=int(os.environ.get('FORECAST_INTERACTIVE_SERIES', 20))
+)
 
 @app.route('/')
 def index():
-    return render_template('index.html')  # Menampilkan halaman upload
+    return render_template('index.html', training_windows=TRAINING_WINDOW_CHOICES)  # Menampilkan halaman upload
 
 # Ganti nilai negatif dengan angka acak antara 5 hingga 32
 def replace_negative_with_random(data, min_val=5, max_val=32):
@@ -46,8 +145,6 @@ def replace_negative_with_random(data, min_val=5, max_val=32):
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    global result_df, base_forecast_df, forecast_data, total_december_forecast
-
     # Proses file upload
     if 'file' not in request.files:
         return "No file uploaded", 400
@@ -74,6 +171,139 @@ def analyze():
     except ValueError:
         return "Invalid input for year or days", 400
 
+    # Resolusi fitting: 'daily' (default) atau 'weekly'
+    resolution = request.form.get('resolution', 'daily')
+    if resolution not in ('daily', 'weekly'):
+        return "Invalid resolution. Please choose daily or weekly.", 400
+
+    # Policy window training (default: seluruh histori)
+    try:
+        training_window = parse_training_window(request.form.get('training_window', 'all'))
+    except ValueError as e:
+        return str(e), 400
+
+    # Batas waktu analisis dalam detik (opsional, kosong = tanpa batas)
+    time_budget = request.form.get('time_budget', '').strip()
+    try:
+        time_budget = float(time_budget) if time_budget else None
+    except ValueError:
+        return "Invalid time budget", 400
+    if time_budget is not None and time_budget <= 0:
+        return "Time budget must be greater than 0 seconds", 400
+
+    # Mode preview: jumlah kota terbesar yang di-fit sebelum hasil sementara ditampilkan (opsional)
+    preview_top_k = request.form.get('preview_top_k', '').strip()
+    try:
+        preview_top_k = int(preview_top_k) if preview_top_k else None
+    except ValueError:
+        return "Invalid preview size", 400
+    if preview_top_k is not None and preview_top_k <= 0:
+        return "Preview size must be greater than 0", 400
+
+    # Fitting dijalankan di background, request langsung mengembalikan job ID
+    # (ID job sekaligus menjadi ID hasil analisis di analysis_store)
+    analysis_store.purge_expired()
+    forecast_arrays.purge_expired()
+    job_id = uuid.uuid4().hex
+    analysis_jobs.submit(
+        run_and_store_analysis, job_id, data, year, days_before_event, days_after_event, resolution, training_window,
+        time_budget, preview_top_k, job_id=job_id
+    )
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({
+            'job_id': job_id,
+            'status_url': url_for('job_status', job_id=job_id),
+            'result_url': url_for('job_result', job_id=job_id)
+        }), 202
+    return render_template('job.html', job_id=job_id)
+
+
+class ProgressTracker:
+    """
+    Menghitung progress forecasting (series selesai, total, ETA) dan mengirim
+    hasil sementara setiap Origin City melalui callback `progress(event, data)`.
+    """
+
+    def __init__(self, total, progress=None, queue_status=None):
+        self.total = total
+        self.done = 0
+        self.progress = progress
+        self.queue_status = queue_status
+        self.started_at = time.time()
+        self.publish_progress()
+
+    def publish_progress(self, current=None):
+        if self.progress is None:
+            return
+        elapsed = time.time() - self.started_at
+        eta = elapsed / self.done * (self.total - self.done) if self.done else None
+        self.progress('progress', {
+            'done': self.done,
+            'total': self.total,
+            'current': current,
+            'elapsed_seconds': round(elapsed, 1),
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'fit_queue': self.queue_status() if self.queue_status is not None else None,
+        })
+
+    def fit_queued(self, queue_status):
+        # Fitting harus menunggu slot CPU: tampilkan kedalaman antrian di UI
+        if self.progress is not None:
+            self.progress('queue', queue_status)
+
+    def series_done(self, cities, december_forecast):
+        self.done += len(cities)
+        if self.progress is None:
+            return
+
+        # Hasil sementara (sebelum penyesuaian growth) untuk tabel dan grafik
+        values = december_forecast['yhat'].round()
+        daily = {
+            'dates': december_forecast['ds'].dt.strftime('%Y-%m-%d').tolist(),
+            'values': [None if pd.isnull(v) else float(v) for v in values],
+            'december_total': float(values.sum()),
+        }
+        daily['method'] = december_forecast['method'].iloc[0] if 'method' in december_forecast else METHOD_FLAT
+        for city in cities:
+            self.progress('series', {'city': str(city), **daily})
+        self.publish_progress(current=str(cities[-1]))
+
+
+# Fungsi untuk menjalankan seluruh proses forecasting (dipanggil oleh worker job)
+def run_analysis(data, year, days_before_event, days_after_event, resolution='daily', training_window=('all', None),
+                 time_budget=None, preview_top_k=None, progress=None, job_id=None, cancel_token=None, on_preview=None):
+    """
+    Menjalankan preprocessing, forecasting per Origin City, dan pembuatan grafik.
+
+    Parameter `progress(event, data)` (opsional) menerima event 'progress'
+    (jumlah series selesai, total, dan ETA), event 'series' (total dan
+    forecast harian Desember per Origin City) setiap kali satu series selesai,
+    serta event 'queue' saat fitting menunggu slot CPU di `fit_scheduler`.
+
+    Fitting dijalankan paralel, tetapi setiap fitting harus mendapat slot dari
+    `fit_scheduler` atas nama `job_id` sehingga total fitting di semua job
+    tidak melebihi jumlah core. Jika FORECAST_TASK_QUEUE diisi, fitting
+    dikirim ke worker task queue dan hasilnya di-stream kembali per series.
+
+    Jika `time_budget` (detik) diberikan, series yang belum di-fit saat waktu
+    hampir habis diisi dari sumber tercepat: forecast cache, top-down dari
+    series yang sudah di-fit, atau seasonal naive. Metode setiap Origin City
+    dicatat di kolom 'Method' pada tabel hasil.
+
+    Series di-fit berurutan dari volume 28 hari terakhir yang terbesar. Jika
+    `preview_top_k` dan `on_preview(analysis)` diberikan, hasil sementara
+    dikirim ke `on_preview` segera setelah `preview_top_k` series terbesar
+    selesai; series sisanya diestimasi (cache, top-down, atau seasonal naive)
+    sementara fitting-nya tetap berjalan di background.
+
+    Jika `cancel_token` dibatalkan, fitting baru tidak dijadwalkan, proses
+    cmdstan yang berjalan dihentikan, dan `JobCancelled` dilempar.
+
+    Returns:
+    - Dictionary hasil analisis ('result_df', 'base_table', 'forecast_data',
+      'forecast_cube', 'total_december_forecast', 'graph_html').
+    """
     # Preprocessing data
     data['DATE'] = pd.to_datetime(data['DATE'])
     all_forecasting = data[data['DATE'] <= '2024-12-01']
@@ -87,20 +317,8 @@ def analyze():
         'upper_window': [days_after_event, days_after_event]
     })
 
-    # Fungsi untuk melakukan forecasting per Origin City
-    def forecast_origin_city(city_name, all_forecasting, events, year=2024):
-        # Filter data per Origin City
-        city_data = all_forecasting[all_forecasting['Origin City'] == city_name]
-        city_data = city_data.groupby('ds').agg({"y": "sum"}).reset_index()
-
-        # Inisialisasi Prophet
-        model = Prophet(holidays=events, changepoint_prior_scale=0.1)
-        model.fit(city_data)
-
-        # Forecast Desember
-        future = model.make_future_dataframe(periods=31)
-        forecast = model.predict(future)
-
+    # Fungsi untuk menyesuaikan forecast di sekitar event dan mengambil bulan Desember
+    def adjust_origin_city(forecast, year=2024):
         # Menyimpan minggu untuk setiap tanggal
         forecast['week'] = forecast['ds'].dt.isocalendar().week
 
@@ -120,7 +338,7 @@ def analyze():
                     forecast.loc[forecast['ds'] == event_date, 'yhat'] = highest_value
 
                     # Update nilai tertinggi sebelumnya menjadi nilai tertinggi kedua
-                    if second_highest_value is not None:
+                    if pd.notnull(second_highest_value):
                         for date in highest_dates:
                             if date != pd.to_datetime(event_date):
                                 forecast.loc[forecast['ds'] == date, 'yhat'] = second_highest_value
@@ -136,28 +354,141 @@ def analyze():
         # Filter data Desember
         december_forecast = forecast[(forecast['ds'] >= f"{year}-12-01") & (forecast['ds'] <= f"{year}-12-31")]
 
-        # Total forecast untuk Desember
-        total_forecast = december_forecast['yhat'].sum()
-
-        # Return total forecast dan dataframe Desember forecast
-        return total_forecast, december_forecast
+        # Return dataframe Desember forecast
+        return december_forecast
 
 
-    # Forecasting per Origin City
+    # Agregasi series harian per Origin City dalam satu kali groupby
     origin_cities = all_forecasting['Origin City'].unique()
-    results = {}
-    december_forecasts = {}
+    city_daily = all_forecasting.groupby(['Origin City', 'ds'])['y'].sum().reset_index()
+    city_series = {
+        city: group[['ds', 'y']].reset_index(drop=True)
+        for city, group in city_daily.groupby('Origin City', sort=False)
+    }
+    city_series = {
+        city: apply_training_window(city_series[city], training_window)
+        for city in origin_cities if city in city_series
+    }
+
+    # Urutkan berdasarkan volume 28 hari terakhir: kota terbesar di-fit dan tampil lebih dulu
+    recent_volume = {
+        city: series.loc[series['ds'] > series['ds'].max() - pd.Timedelta(days=28), 'y'].sum()
+        for city, series in city_series.items()
+    }
+    ranked_series = dict(sorted(city_series.items(), key=lambda item: -recent_volume[item[0]]))
+
+    # Forecasting per Origin City, hanya sekali untuk setiap series yang unik
+    # (series identik di-fit satu kali, series nol/konstan tidak di-fit)
+    tracker = ProgressTracker(len(city_series), progress, queue_status=lambda: fit_scheduler.status(job_id))
+    budget = TimeBudget(time_budget)
+    cache_settings = (year, days_before_event, days_after_event, resolution)
+    fitted_series, fitted_forecasts = [], []
+    fitted_lock = threading.Lock()
+
+    # Forecast cepat saat budget waktu hampir habis: cache, top-down, lalu seasonal naive
+    def fallback_origin_city(city_data, cache_key):
+        with fitted_lock:
+            pooled_series, pooled_forecasts = list(fitted_series), list(fitted_forecasts)
+        return fallback_forecast(city_data, forecast_cache.get(cache_key), pooled_series, pooled_forecasts, periods=31)
+
+    # Setiap fitting menunggu slot CPU global sebelum berjalan
+    def scheduled_forecast_origin_city(city_data):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        cache_key = (series_fingerprint(city_data),) + cache_settings
+        if not budget.can_fit():
+            return fallback_origin_city(city_data, cache_key)
+
+        if remote_fits is not None:
+            # Fitting dikirim ke worker task queue (tidak memakai slot CPU lokal)
+            started = budget.clock()
+            forecast = wait_result(remote_fits.submit(fit_origin_city, city_data, events, resolution), cancel_token)
+            budget.record(budget.clock() - started)
+        else:
+            with fit_scheduler.slot(job_id, len(city_series), on_wait=tracker.fit_queued, cancel_token=cancel_token):
+                # Waktu menunggu slot juga memakai budget
+                if not budget.can_fit():
+                    return fallback_origin_city(city_data, cache_key)
+                started = budget.clock()
+                with cancel_scope(cancel_token):
+                    forecast = fit_origin_city(city_data, events, resolution)
+                budget.record(budget.clock() - started)
+
+        forecast_cache.put(cache_key, forecast)
+        with fitted_lock:
+            fitted_series.append(city_data)
+            fitted_forecasts.append(forecast)
+        return forecast.assign(method=METHOD_PROPHET)
+
+    # Mode preview: kirim hasil sementara setelah top-K kota terbesar selesai di-fit
+    preview_keys = set(list(ranked_series)[:preview_top_k]) if preview_top_k and on_preview is not None else set()
+    if len(preview_keys) >= len(city_series):
+        preview_keys = set()
+    completed = {}
+
+    def series_completed(cities, december_forecast):
+        tracker.series_done(cities, december_forecast)
+        for city in cities:
+            completed[city] = december_forecast
+        if preview_keys and preview_keys <= completed.keys():
+            preview_keys.clear()
+            on_preview(build_preview())
+
+    def build_preview():
+        # Series yang belum selesai diestimasi tanpa fitting
+        forecasts = {}
+        for city, city_data in city_series.items():
+            if city in completed:
+                forecasts[city] = completed[city].copy()
+            else:
+                cache_key = (series_fingerprint(city_data),) + cache_settings
+                forecasts[city] = adjust_origin_city(fallback_origin_city(city_data, cache_key))
+        analysis = build_analysis(data, year, origin_cities, forecasts)
+        analysis['preview'] = {'fitted': len(completed), 'total': len(city_series)}
+        return analysis
+
+    december_forecasts = forecast_unique_series(
+        ranked_series, scheduled_forecast_origin_city, adjust_origin_city, on_complete=series_completed,
+        max_workers=remote_fits.max_inflight if remote_fits is not None else fit_scheduler.slots
+    )
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+    december_forecasts = {city: december_forecasts[city] for city in city_series}
+    return build_analysis(data, year, origin_cities, december_forecasts)
+
+
+# Fungsi untuk membuat tabel, data forecast, cube, dan grafik dari forecast Desember per Origin City
+def build_analysis(data, year, origin_cities, december_forecasts):
+    """
+    Membuat hasil analisis dari forecast Desember setiap Origin City.
+
+    Parameters:
+    - data: DataFrame upload (kolom 'DATE', 'Origin City', 'Connote').
+    - year: Tahun analisis.
+    - origin_cities: Daftar Origin City pada upload.
+    - december_forecasts: Dictionary Origin City -> DataFrame forecast Desember
+      (kolom 'ds', 'yhat', dan opsional 'method'). DataFrame akan diubah.
+
+    Returns:
+    - Dictionary hasil analisis ('result_df', 'base_table', 'methods', 'forecast_data',
+      'forecast_cube', 'total_december_forecast', 'graph_html', dan 'history' =
+      data historis harian [Origin City x tanggal]).
+    """
+    results = {city: df['yhat'].sum() for city, df in december_forecasts.items()}
 
-    for city in origin_cities:
-        total_forecast, december_forecast = forecast_origin_city(city, all_forecasting, events)
-        results[city] = total_forecast
-        december_forecasts[city] = december_forecast  # Simpan Desember forecast per kota
+    # Metode yang menghasilkan forecast setiap Origin City (series nol/konstan: 'flat')
+    methods = {
+        city: df.pop('method').iloc[0] if 'method' in df else METHOD_FLAT
+        for city, df in december_forecasts.items()
+    }
 
     # Total pengiriman bulan November per Origin City
     november_start = f"{year}-11-01"
     november_end = f"{year}-11-30"
-    november_data = data[(data['DATE'] >= november_start) & (data['DATE'] <= november_end)]
-    total_november_per_city = november_data.groupby('Origin City')['Connote'].sum()
+    forecast_cube = RollupCube(['Origin City'])
+    forecast_cube.add('history', data, 'Connote', date_col='DATE')
+    total_november_per_city = forecast_cube.totals('history', level=1, start=november_start, end=november_end) \
+                                           .set_index('Origin City')['Connote']
 
     # Gabungkan hasil November dan Desember ke dalam DataFrame
     result_df = pd.DataFrame({
@@ -181,16 +512,18 @@ def analyze():
     result_df['Growth %'] = ((result_df['Desember'] - result_df['November']) / result_df['November']) * 100
     result_df['Desember'] = replace_negative_with_random(result_df['Desember'])
 
+    # Simpan baseline data (numerik) sebelum diformat, Desember dibulatkan seperti di tabel
+    base_table = pd.DataFrame({
+        'November': result_df['November'].to_numpy(dtype=float),
+        'Desember': result_df['Desember'].astype(float).round().to_numpy(),
+        'Growth %': result_df['Growth %'].to_numpy(dtype=float),
+    }, index=result_df['Origin City'])
+
     # Format angka agar lebih rapi
     result_df['November'] = result_df['November'].apply(lambda x: f"{x:,.0f}")
     result_df['Desember'] = result_df['Desember'].apply(lambda x: f"{x:,.0f}")
     result_df['Growth %'] = result_df['Growth %'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "N/A")
-
-    # Simpan baseline data (numerik) sebelum diformat
-    base_forecast_df = result_df.copy()
-
-    # Total pengiriman bulan Desember berdasarkan forecasting
-    total_december_forecast = sum(results.values())
+    result_df['Method'] = [methods[city] for city in result_df['Origin City']]
 
     # Menggabungkan data forecasting dari semua Origin City
     forecast_data = pd.DataFrame()
@@ -205,6 +538,10 @@ def analyze():
     forecast_data['yhat'] = forecast_data['yhat'].apply(lambda x: round(x))
     forecast_data = forecast_data.rename(columns={'ds': 'Date', 'yhat': 'Forecasted Shipments'})
 
+    # Total pengiriman bulan Desember: jumlah forecast harian yang sudah dibulatkan,
+    # sama dengan total grafik dan `december_total` setelah growth diubah
+    total_december_forecast = float(forecast_data['Forecasted Shipments'].sum())
+
     # Total forecast per Origin City berdasarkan forecast harian Desember
     total_forecast_per_city = forecast_data.groupby('Origin City')['Forecasted Shipments'].sum().reset_index()
     total_forecast_per_city = total_forecast_per_city.rename(columns={'Forecasted Shipments': 'Total Forecasted Shipments'})
@@ -212,62 +549,62 @@ def analyze():
     # Menggabungkan informasi jumlah forecast dengan data forecast
     forecast_data = pd.merge(forecast_data, total_forecast_per_city, on='Origin City', how='left')
 
+    # Tambahkan forecast harian ke cube agregasi
+    forecast_cube.add('forecast', forecast_data, 'Forecasted Shipments')
+
     # Membuat visualisasi Line Graph berdasarkan Tanggal dan Origin City
-    fig = go.Figure()
-
-    # Grafik untuk All Origin City
-    all_cities_data = forecast_data.groupby('Date')['Forecasted Shipments'].sum().reset_index()
-    fig.add_trace(go.Scatter(
-        x=all_cities_data['Date'],
-        y=all_cities_data['Forecasted Shipments'],
-        mode='lines+markers',
-        name='All Origin City',
-        visible=True,  # Semua trace ditampilkan awalnya
-        hovertemplate=("Date=%{x|%b %d, %Y}<br>"
-                       "Total Forecasted Shipments=%{y:,}<extra></extra>")
-    ))
-
-    # Grafik per Origin City
-    for city in origin_cities:
-        city_data = forecast_data[forecast_data['Origin City'] == city]
-        fig.add_trace(go.Scatter(
-            x=city_data['Date'],
-            y=city_data['Forecasted Shipments'],
-            mode='lines+markers',
-            name=city,
-            visible=False,  # Semua trace di-hide awalnya
-            customdata=city_data[['Origin City']],  # Tambahkan Origin City sebagai custom data
-            hovertemplate=(
-                "Origin City=%{customdata[0]}<br>"
-                "Date=%{x|%b %d, %Y}<br>"
-                "Forecasted Shipments=%{y:,}<extra></extra>"
-            )  # Format informasi hover
-        ))
-
-    # Dropdown menu untuk memilih Origin City
-    buttons = []
-    buttons.append(dict(label='All Origin Cities',
-                        method='update',
-                        args=[{'visible': [True] + [False] * len(origin_cities)},
-                              {'title': "Forecasted Shipments for All Origin Cities"}]))
-
-    for i, city in enumerate(origin_cities):
-        visibility = [False] * (len(origin_cities) + 1)
-        visibility[i + 1] = True
-        buttons.append(dict(label=city,
-                            method='update',
-                            args=[{'visible': visibility},
-                                  {'title': f"Forecasted Shipments for {city}"}]))
-
-    fig.update_layout(
-        updatemenus=[dict(
-            active=0,
-            buttons=buttons,
+    # (satu trace, data per Origin City dipilih di browser)
+    all_cities_data = forecast_cube.series('forecast', level=0)
+    city_values = forecast_data.pivot_table(index='Origin City', columns='Date', values='Forecasted Shipments',
+                                            aggfunc='sum').reindex(index=origin_cities, columns=all_cities_data['Date'])
+    graph_html = forecast_chart_html(all_cities_data['Date'], list(origin_cities),
+                                     all_cities_data['Forecasted Shipments'], city_values.to_numpy(dtype=float))
+
+    # Data historis harian per Origin City untuk grafik riwayat (hari tanpa pengiriman = 0)
+    history = data.groupby(['Origin City', data['DATE'].dt.normalize()])['Connote'].sum().unstack(fill_value=0)
+    history = history.reindex(columns=pd.date_range(history.columns.min(), history.columns.max()), fill_value=0)
+
+    return {
+        'result_df': result_df,
+        'base_table': base_table,
+        'methods': result_df['Method'].tolist(),
+        'forecast_data': forecast_data,
+        'forecast_cube': forecast_cube,
+        'total_december_forecast': total_december_forecast,
+        'graph_html': graph_html,
+        'history': history,
+    }
+
+
+# Fungsi untuk membuat grafik forecast harian dengan dropdown Origin City
+def forecast_chart_html(dates, cities, totals, city_values):
+    """
+    Membuat HTML grafik forecast (total semua Origin City dan per Origin City).
+
+    Parameters:
+    - dates: Tanggal forecast.
+    - cities: Daftar Origin City (urutan baris `city_values`).
+    - totals: Total forecast harian semua Origin City.
+    - city_values: Matriks forecast harian [Origin City x tanggal].
+    """
+    return compact_chart_html(
+        dates, cities,
+        [chart_series(totals, city_values,
+                      names=('All Origin City', '{key}'),
+                      hovertemplates=("Date=%{x|%b %d, %Y}<br>"
+                                      "Total Forecasted Shipments=%{y:,}<extra></extra>",
+                                      "Origin City={key}<br>"
+                                      "Date=%{x|%b %d, %Y}<br>"
+                                      "Forecasted Shipments=%{y:,}<extra></extra>"))],
+        all_label='All Origin Cities',
+        titles=("Forecasted Shipments for All Origin Cities", "Forecasted Shipments for {key}"),
+        kind='forecast',
+        menu=dict(
             x=0.5,  # Posisikan di tengah secara horizontal
             xanchor='center',
             y=1.02,  # Letakkan tepat di bawah judul
             yanchor='bottom'
-        )],
+        ),
         title="Forecasted Shipments per Origin City (Desember 2024)",
         xaxis_title="Date",
         yaxis_title="Forecasted Shipments",
@@ -277,21 +614,152 @@ def analyze():
         yaxis=dict(tickformat=',.0f')
     )
 
-    # Menampilkan grafik di halaman web Flask
-    graph_html = fig.to_html(full_html=False)
+
+# Fungsi job: menjalankan analisis lalu menyimpan hasilnya dengan key ID analisis
+def run_and_store_analysis(analysis_id, *args, progress=None, cancel_token=None):
+    def store(analysis):
+        # Data historis hanya disimpan di store array (tidak ikut di-pickle bersama hasil analisis)
+        forecast_arrays.write(analysis_id, analysis['forecast_data'], 'Origin City', 'Date', 'Forecasted Shipments',
+                              analysis['base_table'], labels={'Method': analysis['methods']},
+                              history=analysis.pop('history', None))
+        analysis_store.put(analysis_id, analysis)
+
+    # Hasil sementara (mode preview) disimpan dengan ID yang sama, lalu ditimpa hasil akhir
+    def store_preview(analysis):
+        store(analysis)
+        if progress is not None:
+            progress('preview', {'job_id': analysis_id, **analysis['preview']})
+
+    try:
+        store(run_analysis(*args, progress=progress, job_id=analysis_id, cancel_token=cancel_token,
+                           on_preview=store_preview))
+    except Exception:
+        if cancel_token is not None and cancel_token.is_cancelled():
+            # Job dibatalkan: hapus hasil sementara (mode preview) yang sudah tersimpan
+            analysis_store.delete(analysis_id)
+            forecast_arrays.delete(analysis_id)
+        raise
+    return analysis_id
+
+
+# Fungsi untuk mengambil hasil analisis dari request (form atau query string)
+def requested_analysis_id():
+    return request.form.get('analysis_id') or request.args.get('analysis_id')
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    # Status job analisis untuk polling
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        # Job dijalankan oleh worker lain: cukup cek apakah hasilnya sudah tersimpan
+        if analysis_store.get(job_id) is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'job_id': job_id, 'status': DONE, 'result_url': url_for('job_result', job_id=job_id)})
+
+    status = job.to_dict()
+    if job.status == DONE:
+        status['result_url'] = url_for('job_result', job_id=job_id)
+    else:
+        if forecast_arrays.get(job_id) is not None:
+            # Hasil sementara (mode preview) sudah tersedia
+            status['preview_url'] = url_for('job_result', job_id=job_id)
+        status['fit_queue'] = fit_scheduler.status(job_id)
+    return jsonify(status)
+
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    # Stream progress dan hasil sementara per series (Server-Sent Events)
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    # Lanjutkan dari event terakhir jika browser melakukan reconnect
+    try:
+        start = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start = 0
+
+    def stream():
+        for index, event, data in job.iter_events(start):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            if event in (DONE, 'preview'):
+                data = {**data, 'result_url': url_for('job_result', job_id=job_id)}
+            yield f"id: {index}\nevent: {event}\ndata: {fast_json.dumps(data)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    # Batalkan analisis yang masih di antrian (langsung 'cancelled') atau sedang berjalan
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status in (DONE, FAILED, CANCELLED):
+        return jsonify({**job.to_dict(), 'error': f"Job already {job.status}"}), 409
+    analysis_jobs.cancel(job_id)
+    return jsonify(job.to_dict()), 202
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    # Halaman hasil analisis setelah job selesai (atau hasil sementara pada mode preview)
+    job = analysis_jobs.get(job_id)
+    analysis = analysis_store.get(job_id)
+    if job is not None and job.status == CANCELLED:
+        return "Analysis was cancelled. Please run analysis again.", 410
+    if analysis is None:
+        if job is None:
+            return "Analysis not found or expired. Please run analysis again.", 404
+        if job.status == FAILED:
+            return f"An error occurred: {job.error}", 500
+        return jsonify(job.to_dict()), 409
+
+    # Tabel, grafik, dan total mengikuti growth terakhir jika /update-growth pernah dipanggil
+    arrays = forecast_arrays.get(job_id)
+    growth = arrays.read_state().get('growth') if arrays is not None else None
+    graph_html = analysis['graph_html']
+    total_december_forecast = analysis['total_december_forecast']
+    if arrays is not None:
+        table_html = growth_table_html(job_id, arrays, growth)
+        total_december_forecast = december_total(arrays, growth)
+        if growth is not None:
+            graph_html = growth_chart_html(job_id, arrays, growth)
+    else:
+        table_html = analysis['result_df'].to_html(classes='table table-striped', index=False)
+    total_december_forecast = f"{total_december_forecast:,.0f}"
+    history_html = history_chart_html(job_id, arrays) if arrays is not None and arrays.history is not None else None
+    preview = analysis.get('preview')
+
+    # Halaman preview mengambil hasil akhir dalam format JSON lalu mengganti tabel dan grafik di tempat
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'table_html': table_html,
+            'graph_html': graph_html,
+            'total_december_forecast': total_december_forecast,
+            'preview': preview,
+        })
 
     # Tampilkan hasil
     return render_template('result.html', \
-                           tables=[result_df.to_html(classes='table table-striped', index=False)],\
-                           total_december_forecast=f"{total_december_forecast:,.0f}", \
-                           graph_html=graph_html)
+                           analysis_id=job_id, \
+                           tables=[table_html],\
+                           total_december_forecast=total_december_forecast, \
+                           graph_html=graph_html, \
+                           history_html=history_html, \
+                           preview=preview)
 
 
 @app.route('/update-growth', methods=['POST'])
 def update_growth():
-    global result_df, base_forecast_df, forecast_data  # Akses base_forecast_df dan forecast_data
-
-    if base_forecast_df is None or base_forecast_df.empty:
+    # Ambil forecast milik halaman ini dari store array (dibaca zero-copy oleh worker mana pun)
+    arrays = forecast_arrays.get(requested_analysis_id())
+    if arrays is None or not arrays.keys:
         return jsonify({'error': 'No base forecast data available. Please run analysis first.'}), 400
 
     try:
@@ -300,248 +768,338 @@ def update_growth():
     except ValueError:
         return jsonify({'error': 'Invalid growth value'}), 400
 
+    # Simpan growth terakhir agar compare dan export (di worker mana pun) memakai nilai yang sama
+    arrays.write_state({'growth': growth})
+
+    # Mode delta: hanya angka yang berubah, grafik dan tabel diperbarui di browser
+    if request.form.get('format') == 'delta':
+        return jsonify(growth_delta(arrays, growth))
+    return apply_growth(requested_analysis_id(), arrays, growth)
+
+
+@app.route('/growth-scenarios', methods=['POST'])
+def growth_scenarios():
+    """
+    Membandingkan banyak skenario growth sekaligus terhadap baseline analisis.
+
+    Body JSON: 'analysis_id', 'scenarios' (list skenario dengan 'id', 'growth',
+    'group_overrides', dan 'overrides' per Origin City), serta 'groups'
+    (opsional, Origin City -> grup seperti AREA). Growth yang tersimpan untuk
+    halaman hasil dan export tidak berubah.
+    """
+    payload = request.get_json(silent=True) or {}
+    arrays = forecast_arrays.get(payload.get('analysis_id'))
+    if arrays is None:
+        return jsonify({'error': 'No forecast data available. Please run analysis first.'}), 400
+
+    scenarios = payload.get('scenarios')
+    if not isinstance(scenarios, list) or not scenarios or not all(isinstance(scenario, dict) for scenario in scenarios):
+        return jsonify({'error': 'Please provide a non-empty list of scenarios'}), 400
+
     try:
-        # Pastikan data numerik diubah dengan benar
-        base_forecast_df['Desember'] = pd.to_numeric(base_forecast_df['Desember'].replace({',': ''}, regex=True), errors='coerce')
-        base_forecast_df['November'] = pd.to_numeric(base_forecast_df['November'].replace({',': ''}, regex=True), errors='coerce')
+        results = scenario_results(arrays, payload['analysis_id'], scenarios,
+                                   groups=payload.get('groups'), cache=scenario_cache)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'keys': arrays.keys,
+        'dates': [str(date) for date in arrays.dates],
+        'scenarios': results,
+    })
+
+
+@app.route('/forecast-baseline/<analysis_id>')
+def forecast_baseline(analysis_id):
+    # Forecast harian tanpa growth per Origin City, diambil sekali oleh halaman hasil untuk update growth delta
+    arrays = forecast_arrays.get(analysis_id)
+    if arrays is None:
+        return jsonify({'error': 'No forecast data available. Please run analysis first.'}), 404
+
+    # Matriks dikirim sebagai array biner (f8), di-decode di browser oleh unpackArray (compact_chart.py)
+    return jsonify({
+        'keys': arrays.keys,
+        'values': fast_json.pack_array(arrays.values),
+    })
 
+
+# Fungsi untuk menghitung kolom numerik tabel hasil dari baseline dan growth (None = tanpa growth)
+def growth_values(arrays, growth=None):
+    november = np.asarray(arrays.table['November'])
+    if growth is None:
+        desember = np.asarray(arrays.table['Desember'])
+        growth_pct = np.asarray(arrays.table['Growth %'])
+    else:
         # Menghitung ulang nilai Desember dan Growth, dengan pembulatan
-        result_df['Desember'] = (base_forecast_df['Desember'] * (1 + growth / 100)).round()
-        result_df['Growth %'] = ((result_df['Desember'] - base_forecast_df['November']) / base_forecast_df['November']) * 100
-
-        # Format kolom untuk tampilan tabel
-        result_df['Desember'] = result_df['Desember'].apply(lambda x: f"{int(x):,}")  # Format tanpa koma desimal
-        result_df['Growth %'] = result_df['Growth %'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "N/A")
-
-        # Pastikan kolom `Initial Shipments` ada di forecast_data
-        if 'Initial Shipments' not in forecast_data.columns:
-            forecast_data['Initial Shipments'] = forecast_data['Forecasted Shipments']
-
-        # Resetkan Forecasted Shipments ke nilai awal sebelum growth
-        forecast_data['Forecasted Shipments'] = forecast_data['Initial Shipments'] * (1 + growth / 100)
-
-        # Update `Forecasted Shipments` berdasarkan growth dengan pembulatan
-        forecast_data['Forecasted Shipments'] = (forecast_data['Initial Shipments'] * (1 + growth / 100)).round()
-
-        # Membuat grafik baru dengan Dropdown Menu
-        fig = go.Figure()
-
-        # Grafik untuk All Origin City
-        all_cities_data = forecast_data.groupby('Date')['Forecasted Shipments'].sum().reset_index()
-        fig.add_trace(go.Scatter(
-            x=all_cities_data['Date'],
-            y=all_cities_data['Forecasted Shipments'],
-            mode='lines+markers',
-            name='All Origin City',
-            visible=True,  # Menampilkan grafik untuk All Origin City
-            hovertemplate=("Date=%{x|%b %d, %Y}<br>"
-                           "Total Forecasted Shipments=%{y:,}<extra></extra>")
-        ))
-
-        # Menambahkan trace untuk setiap kota
-        for city in forecast_data['Origin City'].unique():
-            city_data = forecast_data[forecast_data['Origin City'] == city]
-            fig.add_trace(go.Scatter(
-                x=city_data['Date'],
-                y=city_data['Forecasted Shipments'],
-                mode='lines+markers',
-                name=city,
-                visible=False,  # Semua trace di-hide awalnya
-                customdata=city_data[['Origin City']],  # Tambahkan Origin City sebagai custom data
-                hovertemplate=(
-                    "Origin City=%{customdata[0]}<br>"
-                    "Date=%{x|%b %d, %Y}<br>"
-                    "Forecasted Shipments=%{y:,}<extra></extra>"
-                )
-            ))
-
-        # Membuat dropdown menu
-        buttons = []
-        buttons.append(dict(label='All Origin Cities',
-                            method='update',
-                            args=[{'visible': [True] + [False] * len(forecast_data['Origin City'].unique())},
-                                  {'title': "Forecasted Shipments for All Origin Cities"}]))
-
-        for i, city in enumerate(forecast_data['Origin City'].unique()):
-            visibility = [False] * (len(forecast_data['Origin City'].unique()) + 1)
-            visibility[i + 1] = True  # Set hanya trace yang sesuai terlihat
-            buttons.append(dict(
-                label=city,
-                method='update',
-                args=[{'visible': visibility},
-                      {'title': f"Forecasted Shipments for {city}"}]
-            ))
-
-        # Menambahkan menu dropdown ke layout
-        fig.update_layout(
-            updatemenus=[dict(
-                active=0,
-                buttons=buttons,
-                x=0.5,  # Posisikan di tengah secara horizontal
-                xanchor='center',
-                y=1.02,  # Letakkan tepat di bawah judul
-                yanchor='bottom'
-            )],
-            title="Forecasted Shipments per Origin City (Desember 2024)",
-            xaxis_title="Date",
-            yaxis_title="Forecasted Shipments",
-            legend_title="Origin City",
-            uniformtext_minsize=10,
-            uniformtext_mode='hide',
-            yaxis=dict(tickformat=',.0f')
-        )
+        desember = np.round(arrays.table['Desember'] * (1 + growth / 100))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth_pct = (desember - november) / november * 100
+    return november, desember, growth_pct
+
+
+# Fungsi untuk memformat kolom Desember dan Growth % seperti tabel hasil
+def format_desember(desember):
+    return [f"{x:,.0f}" for x in desember]
+
+
+def format_growth_pct(growth_pct):
+    return [f"{x:.2f}%" if pd.notnull(x) else "N/A" for x in growth_pct]
 
-        # Konversi grafik ke HTML
-        graph_html = fig.to_html(full_html=False)
 
-        # Kirim data tabel dan grafik ke frontend
-        updated_table = result_df.to_html(classes='table table-striped', index=False)
-        return jsonify({'updated_table': updated_table, 'graph_html': graph_html})
+# Fungsi untuk membuat tabel hasil dari baseline numerik dan growth (None = tanpa growth)
+def growth_table(arrays, growth=None):
+    november, desember, growth_pct = growth_values(arrays, growth)
+
+    # Format kolom untuk tampilan tabel
+    return pd.DataFrame({
+        'Origin City': arrays.keys,
+        'November': [f"{x:,.0f}" for x in november],
+        'Desember': format_desember(desember),
+        'Growth %': format_growth_pct(growth_pct),
+        **arrays.labels,
+    })
+
+
+# Fungsi untuk membuat tabel hasil (HTML) dengan growth, dirender sekali per analisis dan growth
+def growth_table_html(analysis_id, arrays, growth=None):
+    return render_cache.get_or_render(
+        RenderCache.key(analysis_id, arrays, 'table', growth),
+        lambda: growth_table(arrays, growth).to_html(classes='table table-striped', index=False)
+    )
+
+
+# Fungsi untuk membuat update growth ringkas (tanpa tabel HTML dan grafik)
+def growth_delta(arrays, growth):
+    """
+    Membuat perubahan akibat growth dalam bentuk JSON ringkas.
+
+    Parameters:
+    - arrays: ForecastArrays hasil analisis.
+    - growth: Growth dalam persen.
+
+    Returns:
+    - Dictionary berisi 'growth', 'scale' (pengali forecast harian per Origin
+      City, dibulatkan di browser), 'all_cities' (total harian semua Origin
+      City), 'total_december_forecast', serta 'desember' dan 'growth_pct'
+      (teks per baris tabel, urutan sama dengan 'keys' pada /forecast-baseline).
+    """
+    scale = growth_scale(growth)
+    _, desember, growth_pct = growth_values(arrays, growth)
+    all_cities = arrays.total_series(scale)
+    return {
+        'growth': growth,
+        'scale': scale,
+        'all_cities': all_cities,
+        'total_december_forecast': f"{december_total(arrays, growth):,.0f}",
+        'desember': format_desember(desember),
+        'growth_pct': format_growth_pct(growth_pct),
+    }
+
+
+# Fungsi untuk mengambil faktor pengali forecast dari growth (None = tanpa growth)
+def growth_scale(growth=None):
+    return 1 if growth is None else 1 + growth / 100
+
+
+# Fungsi untuk menghitung total forecast Desember dengan growth (None = tanpa growth)
+def december_total(arrays, growth=None):
+    # Jumlah forecast harian yang dibulatkan per Origin City, sama seperti build_analysis dan grafik
+    return float(arrays.total_series(growth_scale(growth)).sum())
+
+
+# Fungsi untuk membuat grafik forecast harian dengan growth, dibulatkan per Origin City (dirender sekali per growth)
+def growth_chart_html(analysis_id, arrays, growth):
+    scale = growth_scale(growth)
+    return render_cache.get_or_render(
+        RenderCache.key(analysis_id, arrays, 'forecast_chart', growth),
+        lambda: forecast_chart_html(arrays.date_index(), arrays.keys, arrays.total_series(scale),
+                                    np.round(arrays.values * scale))
+    )
+
+
+# Fungsi untuk menerapkan growth pada hasil analisis dan membuat tabel serta grafik baru
+def apply_growth(analysis_id, arrays, growth):
+    try:
+        updated_table = growth_table_html(analysis_id, arrays, growth)
+
+        graph_html = growth_chart_html(analysis_id, arrays, growth)
+
+        # Kirim data tabel, grafik, dan total ke frontend
+        return jsonify({'updated_table': updated_table, 'graph_html': graph_html,
+                        'total_december_forecast': f"{december_total(arrays, growth):,.0f}"})
 
     except Exception as e:
         # Tangani error yang terjadi
-        return jsonify({'error': str(e)}), 500
+        response = jsonify({'error': str(e)})
+        response.status_code = 500
+        return response
 
 
 
 @app.route('/compare-forecast-actual', methods=['POST'])
 def compare_forecast_actual():
-    global forecast_data, growth_data, actual_data
+    # Ambil forecast milik halaman ini dari store array (dibaca zero-copy oleh worker mana pun)
+    arrays = forecast_arrays.get(requested_analysis_id())
+    if arrays is None:
+        return jsonify({'error': 'No forecast data available. Please run analysis first.'}), 400
+
+    # Forecast dan tabel memakai growth terakhir jika /update-growth pernah dipanggil
+    growth = arrays.read_state().get('growth')
 
-    # Gunakan hasil growth jika ada, jika tidak gunakan forecast_data
-    comparison_data = growth_data if 'growth_data' in globals() and growth_data is not None else forecast_data
+    actual_grouped, error = read_actual_upload()
+    if error is not None:
+        return error
 
-    # Pastikan forecast_data memiliki kolom datetime
-    comparison_data['Date'] = pd.to_datetime(comparison_data['Date'], errors='coerce')
+    # Data aktual per Origin City, disejajarkan dengan baris (Origin City) dan tanggal forecast.
+    # Disimpan di store array agar data per Origin City bisa diambil saat dipilih (/compare-series).
+    actual_values = actual_grouped.unstack('Date').reindex(index=arrays.keys, columns=arrays.date_index()) \
+                                  .to_numpy(dtype=float)
 
+    # Metrik akurasi dihitung penuh sekali, lalu diperbarui inkremental oleh /append-actuals
+    sums = metric_sums(growth_forecast(arrays, growth), actual_values)
+    arrays.write_actuals(actual_values, metrics=actual_metrics_state(sums, growth))
+    return compare_response(arrays, actual_values, growth, sums)
+
+
+@app.route('/append-actuals', methods=['POST'])
+def append_actuals():
+    """
+    Menambahkan data aktual hari-hari baru ke data aktual yang sudah diunggah.
+
+    File cukup berisi hari yang baru (kolom sama dengan /compare-forecast-actual).
+    Nilai Origin City dan tanggal yang sudah ada diganti (koreksi); Origin City
+    yang tidak ada di file tetap memakai nilai lama. Metrik akurasi diperbarui
+    hanya untuk tanggal yang ada di file.
+    """
+    arrays = forecast_arrays.get(requested_analysis_id())
+    if arrays is None:
+        return jsonify({'error': 'No forecast data available. Please run analysis first.'}), 400
+
+    growth = arrays.read_state().get('growth')
+    actual_grouped, error = read_actual_upload()
+    if error is not None:
+        return error
+
+    # Hanya tanggal dalam periode forecast yang dipakai
+    new_values = actual_grouped.unstack('Date').reindex(index=arrays.keys)
+    columns = arrays.date_index().get_indexer(pd.DatetimeIndex(new_values.columns))
+    in_period = columns >= 0
+    if not in_period.any():
+        return jsonify({'error': "No dates in the actual data file fall within the forecast period."}), 400
+    columns = columns[in_period]
+    new_values = new_values.to_numpy(dtype=float)[:, in_period]
+
+    with actuals_lock:
+        existing = arrays.actual_values()
+        actual_values = np.full(arrays.values.shape, np.nan) if existing is None else np.array(existing)
+        sums = current_metric_sums(arrays, actual_values, growth)
+
+        # Kontribusi lama tanggal yang diganti dikurangi, kontribusi barunya ditambahkan
+        old_values = actual_values[:, columns]
+        new_values = np.where(np.isnan(new_values), old_values, new_values)
+        sums = update_sums(sums, growth_forecast(arrays, growth, columns), old_values, new_values)
+        actual_values[:, columns] = new_values
+        arrays.write_actuals(actual_values, metrics=actual_metrics_state(sums, growth))
+    return compare_response(arrays, actual_values, growth, sums)
+
+
+# Fungsi untuk membaca file data aktual dari request dan menjumlahkannya per Origin City dan tanggal
+def read_actual_upload():
+    """
+    Returns:
+    - Tuple (Series jumlah 'Actual Shipments' dengan index (Origin City, Date), None),
+      atau (None, respons error) jika file tidak valid.
+    """
     try:
         # Unggah file data aktual
         actual_data_file = request.files['actual_data']
         if actual_data_file.filename == '':
-            return jsonify({'error': "No file selected for actual data"}), 400
+            return None, (jsonify({'error': "No file selected for actual data"}), 400)
 
         if actual_data_file.filename.endswith('.csv'):
             actual_data = pd.read_csv(actual_data_file)
         elif actual_data_file.filename.endswith('.xlsx'):
             actual_data = pd.read_excel(actual_data_file)
         else:
-            return jsonify({'error': "Invalid file format. Please upload a CSV or Excel file."}), 400
+            return None, (jsonify({'error': "Invalid file format. Please upload a CSV or Excel file."}), 400)
     except Exception as e:
-        return jsonify({'error': f"Error reading actual data file: {e}"}), 400
+        return None, (jsonify({'error': f"Error reading actual data file: {e}"}), 400)
 
     # Pastikan kolom 'DATE' dan 'Connote' ada dalam data aktual
     if 'DATE' not in actual_data.columns or 'Connote' not in actual_data.columns:
-        return jsonify({'error': "Missing required columns in actual data file (DATE, Connote)."}), 400
+        return None, (jsonify({'error': "Missing required columns in actual data file (DATE, Connote)."}), 400)
 
     # Transformasi data aktual
     actual_data['DATE'] = pd.to_datetime(actual_data['DATE'], errors='coerce')
     actual_data.rename(columns={"DATE": "Date", "Connote": "Actual Shipments"}, inplace=True)
-
-    # Kelompokkan data aktual berdasarkan Date dan Origin City
-    actual_grouped = actual_data.groupby(['Date', 'Origin City'], as_index=False)['Actual Shipments'].sum()
-
-    # Filter data aktual hanya untuk kota-kota yang ada di comparison_data
-    actual_grouped = actual_grouped[actual_grouped['Origin City'].isin(comparison_data['Origin City'].unique())]
-
-    # Gabungkan data forecasting dan aktual
-    combined_data = pd.merge(
-        comparison_data,
-        actual_grouped,
-        on=['Date', 'Origin City'],
-        how='left'
-    )
-
-    # Membuat grafik dengan dropdown menu
-    fig = go.Figure()
-
-    # Tambahkan trace untuk "All Origin Cities"
-    all_forecast = combined_data.groupby('Date')['Forecasted Shipments'].sum().reset_index()
-    all_actual = combined_data.groupby('Date')['Actual Shipments'].sum().reset_index()
-
-    fig.add_trace(go.Scatter(
-        x=all_forecast['Date'],
-        y=all_forecast['Forecasted Shipments'],
-        mode='lines+markers',
-        name='All Origin Cities (Forecast)',
-        visible=True,
-        hovertemplate=("Date=%{x|%b %d, %Y}<br>"
-                       "Total Forecasted Shipments=%{y:,}<extra></extra>")
-    ))
-
-    if not all_actual.empty:
-        fig.add_trace(go.Scatter(
-            x=all_actual['Date'],
-            y=all_actual['Actual Shipments'],
-            mode='lines+markers',
-            name='All Origin Cities (Actual)',
-            visible=True,
-            line=dict(dash='dot'),
-            hovertemplate=("Date=%{x|%b %d, %Y}<br>"
-                           "Total Actual Shipments=%{y:,}<extra></extra>")
-        ))
-
-    # Tambahkan trace untuk setiap Origin City
-    for city in comparison_data['Origin City'].unique():
-        city_forecast = combined_data[combined_data['Origin City'] == city]
-
-        # Forecast trace untuk kota tertentu
-        fig.add_trace(go.Scatter(
-            x=city_forecast['Date'],
-            y=city_forecast['Forecasted Shipments'],
-            mode='lines+markers',
-            name=f"{city} (Forecast)",
-            visible=False,
-            hovertemplate=("Origin City=%{name}<br>"
-                           "Date=%{x|%b %d, %Y}<br>"
-                           "Forecasted Shipments=%{y:,}<extra></extra>")
-        ))
-
-        # Actual trace untuk kota tertentu jika data tersedia
-        if 'Actual Shipments' in city_forecast.columns:
-            fig.add_trace(go.Scatter(
-                x=city_forecast['Date'],
-                y=city_forecast['Actual Shipments'],
-                mode='lines+markers',
-                name=f"{city} (Actual)",
-                visible=False,
-                line=dict(dash='dot'),
-                hovertemplate=("Origin City=%{name}<br>"
-                               "Date=%{x|%b %d, %Y}<br>"
-                               "Actual Shipments=%{y:,}<extra></extra>")
-            ))
-
-    # Buat dropdown menu untuk memilih Origin City
-    buttons = []
-    # Tombol untuk "All Origin Cities"
-    buttons.append(dict(
-        label='All Origin Cities',
-        method='update',
-        args=[{'visible': [True, True] + [False] * (2 * len(comparison_data['Origin City'].unique()))},
-              {'title': "Forecast vs Actual Shipments for All Origin Cities"}]
-    ))
-
-    # Tombol untuk setiap Origin City
-    for i, city in enumerate(comparison_data['Origin City'].unique()):
-        visibility = [False, False] + [False] * (2 * len(comparison_data['Origin City'].unique()))
-        visibility[2 + 2 * i] = True  # Forecast trace untuk kota ini
-        visibility[2 + 2 * i + 1] = True  # Actual trace untuk kota ini
-        buttons.append(dict(
-            label=city,
-            method='update',
-            args=[{'visible': visibility},
-                  {'title': f"Forecast vs Actual Shipments for {city}"}]
-        ))
-
-    # Perbarui layout untuk dropdown menu
-    fig.update_layout(
-        updatemenus=[dict(
-            active=0,
-            buttons=buttons,
+    return actual_data.groupby(['Origin City', 'Date'])['Actual Shipments'].sum(), None
+
+
+# Fungsi untuk mengambil forecast harian dengan growth (opsional hanya kolom tanggal tertentu)
+def growth_forecast(arrays, growth, columns=None):
+    values = arrays.values if columns is None else arrays.values[:, columns]
+    return np.round(values * growth_scale(growth))
+
+
+# Fungsi untuk membuat isi actual_metrics.npz dari jumlah berjalan dan growth yang dipakai
+def actual_metrics_state(sums, growth):
+    return {'sums': sums, 'growth': np.array(np.nan if growth is None else growth)}
+
+
+# Fungsi untuk mengambil jumlah berjalan metrik akurasi untuk data aktual dan growth saat ini
+def current_metric_sums(arrays, actual_values, growth):
+    # Jumlah tersimpan hanya berlaku untuk growth yang sama; jika tidak, dihitung ulang penuh
+    stored = arrays.read_metrics()
+    if stored is not None:
+        stored_growth = float(stored['growth'])
+        if (np.isnan(stored_growth) and growth is None) or stored_growth == growth:
+            return stored['sums']
+    return metric_sums(growth_forecast(arrays, growth), actual_values)
+
+
+# Fungsi untuk membuat respons perbandingan forecast vs aktual (grafik, tabel hasil, dan tabel akurasi)
+def compare_response(arrays, actual_values, growth, sums):
+    dates = arrays.date_index()
+
+    # Total semua Origin City (tanggal tanpa data aktual = 0)
+    forecast_totals, actual_totals, error_totals = compare_values(arrays, actual_values, growth)
+
+    # Grafik forecast vs aktual: hanya total yang dikirim, data per Origin City diambil saat dipilih
+    graph_html = compact_chart_html(
+        dates, arrays.keys,
+        [chart_series(forecast_totals, None, field='forecast',
+                      names=('All Origin Cities (Forecast)', '{key} (Forecast)'),
+                      hovertemplates=("Date=%{x|%b %d, %Y}<br>"
+                                      "Total Forecasted Shipments=%{y:,}<extra></extra>",
+                                      "Origin City={key}<br>"
+                                      "Date=%{x|%b %d, %Y}<br>"
+                                      "Forecasted Shipments=%{y:,}<extra></extra>")),
+         chart_series(actual_totals, None, field='actual',
+                      names=('All Origin Cities (Actual)', '{key} (Actual)'),
+                      hovertemplates=("Date=%{x|%b %d, %Y}<br>"
+                                      "Total Actual Shipments=%{y:,}<extra></extra>",
+                                      "Origin City={key}<br>"
+                                      "Date=%{x|%b %d, %Y}<br>"
+                                      "Actual Shipments=%{y:,}<extra></extra>"),
+                      line=dict(dash='dot')),
+         chart_series(error_totals, None, field='error',
+                      names=('All Origin Cities (Error)', '{key} (Error)'),
+                      hovertemplates=("Date=%{x|%b %d, %Y}<br>"
+                                      "Actual - Forecast=%{y:,}<extra></extra>",
+                                      "Origin City={key}<br>"
+                                      "Date=%{x|%b %d, %Y}<br>"
+                                      "Actual - Forecast=%{y:,}<extra></extra>"),
+                      line=dict(dash='dash'), visible='legendonly')],
+        all_label='All Origin Cities',
+        titles=("Forecast vs Actual Shipments for All Origin Cities", "Forecast vs Actual Shipments for {key}"),
+        kind='compare',
+        menu=dict(
             x=0.5,
             xanchor='center',
             y=1.15,
             yanchor='top'
-        )],
+        ),
+        series_url=url_for('compare_series', analysis_id=requested_analysis_id()) + '?key=',
         title="Forecast vs Actual Shipments for All Origin Cities",
         xaxis_title="Date",
         yaxis_title="Shipments",
@@ -551,12 +1109,166 @@ def compare_forecast_actual():
         yaxis=dict(tickformat=',.0f')
     )
 
-    # Konversi grafik ke HTML
-    graph_html = fig.to_html(full_html=False)
+    # Kirim data tabel, grafik, dan tabel akurasi ke frontend
+    updated_table = growth_table_html(requested_analysis_id(), arrays, growth)
+    accuracy_html = accuracy_table(arrays.keys, sums).to_html(classes='table table-striped', index=False)
+    return jsonify({'updated_table': updated_table, 'graph_html': graph_html, 'accuracy_table': accuracy_html})
+
+
+@app.route('/compare-series/<analysis_id>')
+def compare_series(analysis_id):
+    # Forecast, aktual, dan error harian satu Origin City untuk grafik perbandingan (diambil saat dipilih)
+    arrays = forecast_arrays.get(analysis_id)
+    actual_values = arrays.actual_values() if arrays is not None else None
+    if actual_values is None:
+        return jsonify({'error': 'No actual data available. Please upload actual data first.'}), 404
+
+    # Key kosong: total semua Origin City (dipakai grafik panjang saat zoom)
+    key = request.args.get('key', '')
+    if key and key not in arrays.key_index:
+        return jsonify({'error': f"Unknown Origin City '{key}'"}), 404
+
+    growth = arrays.read_state().get('growth')
+    values = dict(zip(('forecast', 'actual', 'error'), compare_values(arrays, actual_values, growth, key or None)))
+    values, dates, error = visible_range(arrays.date_index(), values)
+    if error is not None:
+        return error
+
+    response = jsonify({
+        'key': key,
+        **({'dates': dates} if dates is not None else {}),
+        **{field: fast_json.pack_array(series) for field, series in values.items()},
+    })
+
+    # Browser cukup memvalidasi ulang: data hanya berubah jika forecast, growth, atau data aktual berubah
+    response.set_etag(f"{arrays.version}-{arrays.actual_version()}-{growth}")
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+# Fungsi untuk memotong series grafik panjang ke rentang yang terlihat (parameter 'start', 'end', 'points')
+def visible_range(date_index, values):
+    """
+    Parameters:
+    - date_index: Tanggal semua series.
+    - values: Dictionary nama field -> nilai per tanggal.
+
+    Returns:
+    - Tuple (values, dates, error). Tanpa parameter rentang, `values` dikembalikan
+      utuh dan `dates` None. Dengan rentang, hanya tanggal yang terlihat yang
+      dikirim, di-downsample (LTTB) jika melebihi 'points' titik. `error` berisi
+      respons 400 jika parameter tidak valid.
+    """
+    if not any(name in request.args for name in ('start', 'end', 'points')):
+        return values, None, None
+    try:
+        start = pd.Timestamp(request.args['start']) if request.args.get('start') else date_index[0]
+        end = pd.Timestamp(request.args['end']) if request.args.get('end') else date_index[-1]
+        points = int(request.args.get('points', MAX_POINTS))
+    except ValueError:
+        return None, None, (jsonify({'error': 'Invalid range'}), 400)
+    if points <= 0:
+        return None, None, (jsonify({'error': 'Points must be greater than 0'}), 400)
+
+    # Satu tanggal di luar kedua sisi ikut dikirim agar garis tidak terputus di tepi grafik
+    first = max(date_index.searchsorted(start) - 1, 0)
+    last = min(date_index.searchsorted(end, side='right') + 1, len(date_index))
+    selected = first + downsample_indices([series[first:last] for series in values.values()], points)
+    values = {field: np.asarray(series)[selected] for field, series in values.items()}
+    return values, date_index[selected].strftime('%Y-%m-%d').tolist(), None
+
+
+# Fungsi untuk membuat grafik data historis harian (data per Origin City diambil saat dipilih)
+def history_chart_html(analysis_id, arrays):
+    """
+    Data historis bisa bertahun-tahun: di atas WEBGL_THRESHOLD tanggal grafik
+    memakai Scattergl, dan di atas MAX_POINTS tanggal hanya total hasil LTTB
+    yang dikirim; zoom/pan mengambil rentang yang terlihat dari /history-series.
+    """
+    return render_cache.get_or_render(
+        RenderCache.key(analysis_id, arrays, 'history_chart'),
+        lambda: compact_chart_html(
+            arrays.history_index(), arrays.keys,
+            [chart_series(np.nansum(arrays.history, axis=0), None, field='history',
+                          names=('All Origin Cities', '{key}'),
+                          hovertemplates=("Date=%{x|%b %d, %Y}<br>"
+                                          "Total Shipments=%{y:,}<extra></extra>",
+                                          "Origin City={key}<br>"
+                                          "Date=%{x|%b %d, %Y}<br>"
+                                          "Shipments=%{y:,}<extra></extra>"))],
+            all_label='All Origin Cities',
+            titles=("Shipment History for All Origin Cities", "Shipment History for {key}"),
+            kind='history',
+            menu=dict(
+                x=0.5,
+                xanchor='center',
+                y=1.15,
+                yanchor='top'
+            ),
+            series_url=url_for('history_series', analysis_id=analysis_id) + '?key=',
+            title="Shipment History for All Origin Cities",
+            xaxis_title="Date",
+            yaxis_title="Shipments",
+            yaxis=dict(tickformat=',.0f')
+        )
+    )
+
+
+@app.route('/history-series/<analysis_id>')
+def history_series(analysis_id):
+    # Data historis harian satu Origin City (key kosong = total), per rentang yang terlihat pada grafik riwayat
+    arrays = forecast_arrays.get(analysis_id)
+    if arrays is None or arrays.history is None:
+        return jsonify({'error': 'No history data available. Please run analysis again.'}), 404
+
+    key = request.args.get('key', '')
+    if key and key not in arrays.key_index:
+        return jsonify({'error': f"Unknown Origin City '{key}'"}), 404
+
+    history = arrays.history[arrays.key_index[key]] if key else np.nansum(arrays.history, axis=0)
+    values, dates, error = visible_range(arrays.history_index(), {'history': history})
+    if error is not None:
+        return error
+
+    response = jsonify({
+        'key': key,
+        **({'dates': dates} if dates is not None else {}),
+        'history': compact_values(values['history']),
+    })
 
-    # Kirim data tabel dan grafik ke frontend
-    updated_table = result_df.to_html(classes='table table-striped', index=False)
-    return jsonify({'updated_table': updated_table, 'graph_html': graph_html})
+    # Data historis tidak berubah selama store analisis tidak ditulis ulang
+    response.set_etag(f"{arrays.version}-history")
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+# Fungsi untuk menghitung forecast, aktual, dan error harian (key None = total semua Origin City)
+def compare_values(arrays, actual_values, growth, key=None):
+    scale = growth_scale(growth)
+    if key is None:
+        forecast = arrays.total_series(scale)
+        actual = np.nansum(actual_values, axis=0)
+        # Tanggal tanpa data aktual sama sekali tidak punya error
+        error = np.where(np.isnan(actual_values).all(axis=0), np.nan, actual - forecast)
+    else:
+        forecast = np.round(arrays.row(key) * scale)
+        actual = np.asarray(actual_values[arrays.key_index[key]])
+        error = actual - forecast
+    return forecast, actual, error
+
+
+@app.route('/export/<analysis_id>')
+def export_forecast(analysis_id):
+    # Export forecast harian per Origin City (dengan growth terakhir) langsung dari store array
+    arrays = forecast_arrays.get(analysis_id)
+    if arrays is None:
+        return "Analysis not found or expired. Please run analysis again.", 404
+
+    export_data = arrays.to_frame('Origin City', 'Forecasted Shipments', growth_scale(arrays.read_state().get('growth')))
+    export_data['Date'] = export_data['Date'].dt.strftime('%Y-%m-%d')
+    export_data['Forecasted Shipments'] = export_data['Forecasted Shipments'].astype('int64')
+    return Response(export_data.to_csv(index=False), mimetype='text/csv',
+                    headers={'Content-Disposition': f"attachment; filename=forecast_{analysis_id}.csv"})
 
 
 @app.route('/download/<filename>')
@@ -0,0 +1,58 @@
+"""
+Helper bersama untuk script benchmark (data sintetis, events, metrik).
+"""
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Agar modul di root repo bisa di-import dari script benchmark
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Data sintetis multi-tahun dengan pola mingguan, tahunan, dan lonjakan event
+def synthetic_upload(n_series=10, start='2020-01-01', end='2023-12-31', seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, end)
+    frames = []
+    for i in range(n_series):
+        base = rng.uniform(50, 2000)
+        weekly = 1 + 0.3 * np.cos(2 * np.pi * (dates.dayofweek - rng.integers(7)) / 7)
+        yearly = 1 + 0.2 * np.sin(2 * np.pi * dates.dayofyear / 365.25)
+        trend = 1 + 0.1 * np.arange(len(dates)) / 365.25
+        event = np.where((dates.month == 12) & dates.day.isin([12, 25]), 1.8, 1.0)
+        y = base * weekly * yearly * trend * event * rng.normal(1, 0.05, len(dates))
+        frames.append(pd.DataFrame({'DATE': dates, 'Origin City': f'CITY {i:02d}', 'Connote': y.round()}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def wape(actual, forecast):
+    return np.abs(actual - forecast).sum() / actual.sum() * 100 if actual.sum() else np.nan
+
+
+def load_upload(path=None):
+    # Membaca file upload (CSV/Excel), atau data sintetis jika path kosong
+    if path is None:
+        data = synthetic_upload()
+    elif path.endswith('.xlsx'):
+        data = pd.read_excel(path)
+    else:
+        data = pd.read_csv(path)
+    data['DATE'] = pd.to_datetime(data['DATE'])
+    return data
+
+
+def make_events(year, days_before_event=2, days_after_event=1):
+    return pd.DataFrame({
+        'holiday': ['12.12', 'Hari Raya Natal'],
+        'ds': pd.to_datetime([f"{year}-12-12", f"{year}-12-25"]),
+        'lower_window': [-days_before_event, -days_before_event],
+        'upper_window': [days_after_event, days_after_event]
+    })
+
+
+def quiet_prophet_logs():
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
@@ -0,0 +1,143 @@
+"""
+Benchmark serialisasi JSON respons: encoder bawaan Flask vs fast_json (orjson).
+
+Membuat forecast Desember sintetis untuk banyak Origin City, lalu mengukur
+waktu encode dan ukuran payload untuk respons /forecast-baseline,
+/update-growth (format delta), /growth-scenarios, dan JSON figure Plotly.
+Jalur bawaan mengikuti cara lama (konversi `.tolist()` lalu `json.dumps`);
+jalur cepat mengirim array NumPy langsung ke `fast_json.dumps`. Ukuran
+`pack_array` (typed array biner) dibandingkan dengan list JSON.
+
+Contoh:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --cities 1000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Agar modul di root repo bisa di-import dari script benchmark
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_json
+
+
+# Forecast Desember sintetis [Origin City x tanggal], sebagian sel kosong (NaN)
+def synthetic_forecast(n_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2024-12-01', '2024-12-31')
+    yhat = rng.gamma(2.0, 300.0, (n_cities, len(dates)))
+    yhat[rng.random(yhat.shape) < 0.02] = np.nan
+    keys = [f"CITY {i:04d}" for i in range(n_cities)]
+    return keys, dates, yhat
+
+
+def legacy_dumps(obj):
+    # Encoder bawaan Flask (json standar, key diurutkan, tanpa spasi)
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'))
+
+
+def fast_dumps(obj):
+    return fast_json.dumps_bytes(obj, sort_keys=True)
+
+
+def to_list(values):
+    # Konversi lama: NaN -> None per elemen
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = function()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000, len(payload)
+
+
+def payloads(keys, dates, yhat, n_scenarios):
+    values = np.round(yhat)
+    november = np.nansum(values, axis=1) * 0.9
+    scale = 1.05
+    desember = np.round(np.nansum(values, axis=1) * scale)
+    all_cities = np.nansum(np.round(values * scale), axis=0)
+    growth = np.linspace(-10, 20, n_scenarios)[:, np.newaxis]
+    scenario_daily = np.nansum(np.round(values[np.newaxis] * (1 + growth[:, :, np.newaxis] / 100)), axis=1)
+    scenario_desember = np.round(np.nansum(values, axis=1) * (1 + growth / 100))
+    scenario_pct = (scenario_desember - november) / november * 100
+
+    # Setiap payload: (jalur lama, jalur cepat), bentuk respons sama
+    return {
+        '/forecast-baseline': (
+            lambda: legacy_dumps({'keys': keys, 'values': to_list(values)}),
+            lambda: fast_dumps({'keys': keys, 'values': values}),
+        ),
+        '/update-growth delta': (
+            lambda: legacy_dumps({'growth': 5.0, 'scale': scale, 'all_cities': all_cities.tolist(),
+                                  'desember': [f"{x:,.0f}" for x in desember]}),
+            lambda: fast_dumps({'growth': 5.0, 'scale': scale, 'all_cities': all_cities,
+                                'desember': [f"{x:,.0f}" for x in desember]}),
+        ),
+        f'/growth-scenarios ({n_scenarios})': (
+            lambda: legacy_dumps({'keys': keys, 'dates': [str(d.date()) for d in dates], 'scenarios': [
+                {'id': f"s{i}", 'daily': scenario_daily[i].tolist(), 'desember': scenario_desember[i].tolist(),
+                 'growth_pct': to_list(scenario_pct[i])} for i in range(n_scenarios)]}),
+            lambda: fast_dumps({'keys': keys, 'dates': [str(d.date()) for d in dates], 'scenarios': [
+                {'id': f"s{i}", 'daily': scenario_daily[i], 'desember': scenario_desember[i],
+                 'growth_pct': scenario_pct[i]} for i in range(n_scenarios)]}),
+        ),
+    }
+
+
+def figure_payloads(keys, dates, yhat, n_traces):
+    # Figure dengan satu trace per Origin City (bentuk grafik sebelum dataset kolumnar)
+    fig = go.Figure([go.Scatter(x=dates, y=yhat[i], name=keys[i], mode='lines+markers') for i in range(n_traces)])
+    return (
+        lambda: pio.to_json(fig, engine='json'),
+        lambda: pio.to_json(fig, engine='orjson'),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cities', type=int, default=500, help='Jumlah Origin City')
+    parser.add_argument('--scenarios', type=int, default=50, help='Jumlah skenario growth')
+    parser.add_argument('--figure-traces', type=int, default=100, help='Jumlah trace pada figure Plotly')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if fast_json.orjson is None:
+        print("orjson is not installed: fast_json falls back to the standard json module.")
+    keys, dates, yhat = synthetic_forecast(args.cities)
+
+    rows = []
+    cases = payloads(keys, dates, yhat, args.scenarios)
+    cases[f'Plotly figure ({args.figure_traces} traces)'] = figure_payloads(keys, dates, yhat, args.figure_traces)
+    for name, (legacy, fast) in cases.items():
+        legacy_ms, legacy_bytes = timed(legacy, args.repeat)
+        fast_ms, fast_bytes = timed(fast, args.repeat)
+        rows.append({'payload': name, 'legacy_ms': legacy_ms, 'fast_ms': fast_ms,
+                     'speedup': legacy_ms / fast_ms, 'legacy_bytes': legacy_bytes, 'fast_bytes': fast_bytes})
+
+    result = pd.DataFrame(rows)
+    pd.set_option('display.width', 160)
+    print(result.to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+    # Ukuran array biner (pack_array) dibandingkan list JSON untuk data grafik
+    print()
+    for label, values in (('rounded forecast', np.round(yhat)), ('raw yhat', yhat)):
+        list_bytes = len(fast_dumps(values))
+        packed_bytes = len(fast_dumps(fast_json.pack_array(values)))
+        print(f"{label:<17}: JSON list {list_bytes:,} bytes, pack_array {packed_bytes:,} bytes "
+              f"({packed_bytes / list_bytes:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark policy window training: waktu fitting vs error holdout.
+
+Untuk setiap policy, setiap series dilatih dengan data sebelum tanggal
+1 Desember (setelah dipotong sesuai policy), lalu dievaluasi terhadap data
+aktual Desember di file yang sama. Gunakan hasilnya untuk memilih window
+paling murah yang akurasinya masih terjaga.
+
+Contoh:
+    python benchmarks/bench_training_window.py data.csv --year 2023
+    python benchmarks/bench_training_window.py --policies all years:2 adaptive
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_common import load_upload, make_events, quiet_prophet_logs, wape
+from prophet_fits import fit_origin_city
+from training_window import TRAINING_WINDOW_CHOICES, apply_training_window, parse_training_window
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file', nargs='?', help='CSV/Excel upload (default: data sintetis)')
+    parser.add_argument('--year', type=int, default=2023, help='Tahun Desember yang dievaluasi')
+    parser.add_argument('--key-col', default='Origin City')
+    parser.add_argument('--value-col', default='Connote')
+    parser.add_argument('--max-series', type=int, default=None)
+    parser.add_argument('--policies', nargs='+', default=list(TRAINING_WINDOW_CHOICES))
+    args = parser.parse_args()
+
+    quiet_prophet_logs()
+    data = load_upload(args.file)
+    events = make_events(args.year)
+
+    daily = data.groupby([args.key_col, 'DATE'])[args.value_col].sum().reset_index()
+    daily = daily.rename(columns={'DATE': 'ds', args.value_col: 'y'})
+    keys = daily[args.key_col].unique()[:args.max_series]
+
+    december_start, december_end = f"{args.year}-12-01", f"{args.year}-12-31"
+    series_by_key = {}
+    for key in keys:
+        series = daily[daily[args.key_col] == key][['ds', 'y']]
+        train = series[series['ds'] < december_start].reset_index(drop=True)
+        actual = series[(series['ds'] >= december_start) & (series['ds'] <= december_end)].set_index('ds')['y']
+        series_by_key[key] = (train, actual)
+
+    rows = []
+    for policy_name in args.policies:
+        policy = parse_training_window(policy_name)
+        fit_seconds, train_days, errors, total_errors = 0.0, [], [], []
+
+        for train, actual in series_by_key.values():
+            windowed = apply_training_window(train, policy)
+            start = time.perf_counter()
+            forecast = fit_origin_city(windowed, events)
+            fit_seconds += time.perf_counter() - start
+
+            december = forecast.set_index('ds')['yhat'].reindex(actual.index)
+            train_days.append(len(windowed))
+            errors.append(wape(actual.to_numpy(), december.to_numpy()))
+            if actual.sum():
+                total_errors.append(abs(december.sum() - actual.sum()) / actual.sum() * 100)
+
+        rows.append({
+            'policy': policy_name,
+            'mean_train_days': np.mean(train_days),
+            'fit_time_s': fit_seconds,
+            'december_wape_%': np.nanmean(errors),
+            'abs_total_err_%': np.mean(total_errors) if total_errors else np.nan,
+        })
+
+    result = pd.DataFrame(rows)
+    baseline = result.loc[result['policy'] == 'all', 'fit_time_s']
+    if not baseline.empty:
+        result['relative_cost'] = result['fit_time_s'] / baseline.iloc[0]
+
+    pd.set_option('display.width', 160)
+    print(f"Series: {len(series_by_key)}")
+    print(result.to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+
+
+if __name__ == '__main__':
+    main()
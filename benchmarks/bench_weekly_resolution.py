@@ -0,0 +1,71 @@
+"""
+Benchmark fitting harian vs mingguan (dengan disagregasi harian).
+
+Melatih model untuk setiap Origin City dengan data sebelum tanggal 1 Desember,
+lalu membandingkan waktu fitting dan akurasi forecast Desember terhadap data
+aktual bulan Desember di file yang sama.
+
+Contoh:
+    python benchmarks/bench_weekly_resolution.py data.csv --year 2023
+    python benchmarks/bench_weekly_resolution.py            # data sintetis
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_common import load_upload, make_events, quiet_prophet_logs, wape
+from prophet_fits import fit_origin_city
+from weekly_forecast import forecast_weekly
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file', nargs='?', help='CSV/Excel upload (default: data sintetis)')
+    parser.add_argument('--year', type=int, default=2023, help='Tahun Desember yang dievaluasi')
+    parser.add_argument('--key-col', default='Origin City')
+    parser.add_argument('--value-col', default='Connote')
+    parser.add_argument('--max-series', type=int, default=None)
+    args = parser.parse_args()
+
+    quiet_prophet_logs()
+    data = load_upload(args.file)
+    events = make_events(args.year)
+
+    daily = data.groupby([args.key_col, 'DATE'])[args.value_col].sum().reset_index()
+    daily = daily.rename(columns={'DATE': 'ds', args.value_col: 'y'})
+    keys = daily[args.key_col].unique()[:args.max_series]
+
+    december_start, december_end = f"{args.year}-12-01", f"{args.year}-12-31"
+    rows = []
+    for key in keys:
+        series = daily[daily[args.key_col] == key][['ds', 'y']]
+        train = series[series['ds'] < december_start]
+        actual = series[(series['ds'] >= december_start) & (series['ds'] <= december_end)].set_index('ds')['y']
+
+        row = {'series': key, 'n_days': len(train)}
+        for mode, fit in (('daily', fit_origin_city), ('weekly', forecast_weekly)):
+            start = time.perf_counter()
+            forecast = fit(train, events)
+            row[f'{mode}_fit_s'] = time.perf_counter() - start
+
+            december = forecast.set_index('ds')['yhat'].reindex(actual.index)
+            row[f'{mode}_wape'] = wape(actual.to_numpy(), december.to_numpy())
+            row[f'{mode}_total_err'] = (december.sum() - actual.sum()) / actual.sum() * 100 if actual.sum() else np.nan
+        rows.append(row)
+
+    result = pd.DataFrame(rows)
+    pd.set_option('display.width', 160)
+    print(result.to_string(index=False, float_format=lambda x: f"{x:,.3f}"))
+    print()
+    print(f"Series                 : {len(result)}")
+    print(f"Daily fit time (s)     : {result['daily_fit_s'].sum():,.2f}")
+    print(f"Weekly fit time (s)    : {result['weekly_fit_s'].sum():,.2f}")
+    print(f"Speedup                : {result['daily_fit_s'].sum() / result['weekly_fit_s'].sum():,.2f}x")
+    print(f"Daily December WAPE %  : {result['daily_wape'].mean():,.2f}")
+    print(f"Weekly December WAPE % : {result['weekly_wape'].mean():,.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# Library untuk sinkronisasi antar thread
+import threading
+import weakref
+from contextlib import contextmanager
+
+# Library untuk membungkus proses cmdstan yang dijalankan oleh cmdstanpy
+import subprocess
+import types
+
+
+class JobCancelled(Exception):
+    """
+    Dilempar saat job dibatalkan oleh pengguna.
+    """
+
+
+class CancelToken:
+    """
+    Penanda pembatalan untuk satu job.
+
+    Proses cmdstan yang dijalankan di dalam `cancel_scope(token)` dicatat
+    oleh token, sehingga `cancel()` bisa langsung menghentikannya tanpa
+    menunggu fitting selesai.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._processes = weakref.WeakSet()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        # Tandai job dibatalkan lalu hentikan semua proses cmdstan yang masih berjalan
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+            callbacks = list(self._callbacks)
+        for process in processes:
+            _terminate(process)
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """
+        Mendaftarkan `callback()` yang dipanggil saat token dibatalkan (misalnya
+        untuk membangunkan thread yang sedang menunggu Condition).
+
+        Returns:
+        - Fungsi untuk melepas callback kembali.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+        def remove():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        return remove
+
+    def register(self, process):
+        with self._lock:
+            self._processes.add(process)
+        if self._cancelled.is_set():
+            _terminate(process)
+
+
+# Fungsi untuk menghentikan proses yang masih berjalan
+def _terminate(process):
+    if process.poll() is None:
+        try:
+            process.terminate()
+        except OSError:
+            pass
+
+
+# Token pembatalan untuk thread yang sedang menjalankan fitting
+_current = threading.local()
+
+
+@contextmanager
+def cancel_scope(token):
+    """
+    Menjalankan blok kode dengan `token` sebagai token pembatalan thread ini.
+    Proses cmdstan yang dibuat di dalam blok akan dihentikan saat token dibatalkan.
+    """
+    previous = getattr(_current, 'token', None)
+    _current.token = token
+    try:
+        yield token
+    finally:
+        _current.token = previous
+
+
+class _TrackedPopen(subprocess.Popen):
+    # Popen yang mendaftarkan prosesnya ke token pembatalan thread pemanggil
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        token = getattr(_current, 'token', None)
+        if token is not None:
+            token.register(self)
+
+
+_tracking_installed = False
+
+
+def track_cmdstan_processes():
+    """
+    Memasang pencatatan proses pada cmdstanpy (sekali per proses), sehingga
+    fitting Prophet yang sedang berjalan bisa dihentikan oleh `CancelToken.cancel()`.
+    Hanya modul cmdstanpy yang memakai Popen ini; modul lain tidak terpengaruh.
+
+    Bergantung pada `cmdstanpy.model` yang menjalankan cmdstan lewat
+    `subprocess.Popen` (versi cmdstanpy di-pin di requirements.txt).
+
+    Raises:
+    - RuntimeError jika versi cmdstanpy tidak lagi memakai `subprocess.Popen`,
+      karena pembatalan tidak akan bisa menghentikan proses cmdstan.
+    """
+    global _tracking_installed
+    if _tracking_installed:
+        return
+    import cmdstanpy
+    import cmdstanpy.model
+
+    if getattr(getattr(cmdstanpy.model, 'subprocess', None), 'Popen', None) is not subprocess.Popen:
+        raise RuntimeError(
+            f"cmdstanpy {cmdstanpy.__version__} does not start cmdstan through cmdstanpy.model.subprocess.Popen; "
+            "cancelling jobs cannot stop running fits. Install the cmdstanpy version pinned in requirements.txt."
+        )
+
+    tracked_subprocess = types.ModuleType('subprocess')
+    tracked_subprocess.__dict__.update(vars(subprocess))
+    tracked_subprocess.Popen = _TrackedPopen
+    cmdstanpy.model.subprocess = tracked_subprocess
+    _tracking_installed = True
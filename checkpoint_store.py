@@ -0,0 +1,94 @@
+# Library untuk menangani file dan folder checkpoint
+import os
+import shutil
+import pickle
+import time
+import uuid
+
+# Library untuk membuat key job dari isi upload dan parameter
+import hashlib
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+
+# Fungsi untuk membuat key job dari data upload dan parameter analisis
+def job_key(data, *params):
+    """
+    Membuat key yang sama untuk upload dan parameter yang sama, sehingga run
+    yang diulang setelah proses mati bisa melanjutkan checkpoint sebelumnya.
+
+    Parameters:
+    - data: DataFrame upload (sebelum preprocessing).
+    - params: Parameter analisis (misalnya tahun dan window event).
+
+    Returns:
+    - String hex key job.
+    """
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    digest.update(repr((list(data.columns),) + params).encode())
+    return digest.hexdigest()
+
+
+class SeriesCheckpoint:
+    """
+    Checkpoint per job: satu file per series yang selesai di-fit, berisi
+    forecast dan parameter model. Ditulis secara atomik setiap kali satu
+    series selesai, sehingga run yang terputus hanya kehilangan fitting yang
+    sedang berjalan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _series_path(self, fingerprint):
+        return os.path.join(self.path, f"{fingerprint}.pkl")
+
+    def load(self, fingerprint):
+        """
+        Mengembalikan dictionary {'forecast', 'params'} atau None jika belum ada.
+        """
+        try:
+            with open(self._series_path(fingerprint), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def save(self, fingerprint, forecast, params=None):
+        path = self._series_path(fingerprint)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'forecast': forecast, 'params': params}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def completed(self):
+        # Jumlah series yang sudah tersimpan
+        return sum(1 for name in os.listdir(self.path) if name.endswith('.pkl'))
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class CheckpointStore:
+    """
+    Folder checkpoint untuk semua job. Checkpoint yang tidak disentuh selama
+    `ttl_seconds` dihapus saat `purge_expired` dipanggil.
+    """
+
+    def __init__(self, folder, ttl_seconds=24 * 3600):
+        self.folder = folder
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(folder, exist_ok=True)
+
+    def job(self, key):
+        return SeriesCheckpoint(os.path.join(self.folder, key))
+
+    def purge_expired(self):
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            try:
+                if time.time() - os.stat(path).st_mtime > self.ttl_seconds:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
@@ -0,0 +1,266 @@
+# Library untuk mengirim dataset grafik ke browser
+import fast_json
+
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk membuat grafik interaktif
+import plotly.graph_objects as go
+
+# Jumlah tanggal minimal agar trace digambar dengan WebGL (Scattergl) alih-alih SVG
+WEBGL_THRESHOLD = 1000
+
+# Jumlah titik maksimal per tampilan grafik; data yang lebih panjang di-downsample (LTTB)
+MAX_POINTS = 2000
+
+
+# Script yang dijalankan setelah grafik dibuat: simpan dataset di elemen grafik
+# dan ganti data trace saat pilihan dropdown berubah (tanpa trace per key)
+_SELECT_SCRIPT = """
+// Decoder array biner dari fast_json.pack_array ({dtype, bdata, shape}, little-endian); NaN menjadi null.
+// Nilai lain (list JSON biasa) dikembalikan apa adanya. Juga dipakai script halaman (window.unpackArray).
+window.unpackArray = function(value) {
+  if (!value || value.bdata === undefined) { return value; }
+  var binary = atob(value.bdata);
+  var bytes = new Uint8Array(binary.length);
+  for (var i = 0; i < binary.length; i++) { bytes[i] = binary.charCodeAt(i); }
+  var typed = value.dtype === 'i4' ? new Int32Array(bytes.buffer) : new Float64Array(bytes.buffer);
+  var flat = Array.prototype.map.call(typed, function(v) { return isNaN(v) ? null : v; });
+  if (value.shape.length < 2) { return flat; }
+  var rows = [];
+  for (var row = 0; row < value.shape[0]; row++) {
+    rows.push(flat.slice(row * value.shape[1], (row + 1) * value.shape[1]));
+  }
+  return rows;
+};
+var graph = document.getElementById('{plot_id}');
+graph.compactData = %s;
+graph.selectedSeries = 0;
+graph.visibleRange = null;
+graph.rangeRequest = 0;
+graph.showSeries = function(index) {
+  var data = graph.compactData;
+  var key = index > 0 ? data.keys[index - 1] : null;
+  if (data.downsampled && (key !== null || graph.visibleRange)) {
+    // Data panjang: rentang yang terlihat diambil dari server (resolusi penuh sampai maxPoints titik)
+    var query = '&points=' + data.maxPoints;
+    if (graph.visibleRange) {
+      query += '&start=' + encodeURIComponent(graph.visibleRange[0]) + '&end=' + encodeURIComponent(graph.visibleRange[1]);
+    }
+    var request = ++graph.rangeRequest;
+    return fetch(data.seriesUrl + encodeURIComponent(key === null ? '' : key) + query).then(function(response) {
+      return response.json();
+    }).then(graph.unpackValues).then(function(values) {
+      // Abaikan respons lama jika pilihan atau zoom sudah berubah
+      if (request !== graph.rangeRequest) { return; }
+      return graph.renderSeries(index, key, values.dates, function(series) { return values[series.field]; });
+    });
+  }
+  if (key !== null && data.seriesUrl && !data.loaded.hasOwnProperty(key)) {
+    // Data per key diambil dari server saat pertama kali dipilih
+    return fetch(data.seriesUrl + encodeURIComponent(key)).then(function(response) {
+      return response.json();
+    }).then(graph.unpackValues).then(function(values) {
+      data.loaded[key] = values;
+      return graph.showSeries(index);
+    });
+  }
+  ++graph.rangeRequest;
+  return graph.renderSeries(index, key, data.dates, function(series) {
+    if (key === null) {
+      return series.totals;
+    }
+    return data.seriesUrl ? data.loaded[key][series.field] : series.values[index - 1];
+  });
+};
+graph.unpackValues = function(values) {
+  Object.keys(values).forEach(function(field) { values[field] = window.unpackArray(values[field]); });
+  return values;
+};
+graph.renderSeries = function(index, key, dates, valuesOf) {
+  var data = graph.compactData;
+  var label = function(texts) { return key === null ? texts[0] : texts[1].split('{key}').join(key); };
+  var update = {y: [], name: [], hovertemplate: []};
+  if (dates) {
+    update.x = data.series.map(function() { return dates; });
+  }
+  data.series.forEach(function(series) {
+    update.y.push(valuesOf(series));
+    update.name.push(label(series.names));
+    update.hovertemplate.push(label(series.hovertemplates));
+  });
+  graph.selectedSeries = index;
+  return Plotly.update(graph, update, {'title.text': label(data.titles)});
+};
+graph.on('plotly_buttonclicked', function(event) { graph.showSeries(event.active); });
+graph.on('plotly_relayout', function(event) {
+  // Zoom atau pan pada data panjang: ambil ulang rentang yang terlihat
+  if (!graph.compactData.downsampled) { return; }
+  if (event['xaxis.autorange']) {
+    graph.visibleRange = null;
+  } else if (event['xaxis.range[0]'] !== undefined) {
+    graph.visibleRange = [event['xaxis.range[0]'], event['xaxis.range[1]']];
+  } else if (event['xaxis.range']) {
+    graph.visibleRange = event['xaxis.range'];
+  } else {
+    return;
+  }
+  graph.showSeries(graph.selectedSeries);
+});
+"""
+
+
+# Fungsi untuk mengubah array menjadi list JSON yang ringkas (NaN = null, bilangan bulat tanpa desimal)
+def compact_values(values):
+    values = np.asarray(values, dtype=float)
+    compact = values.astype(object)
+    is_integer = np.isfinite(values) & (values == np.round(values))
+    compact[is_integer] = values[is_integer].astype(np.int64).astype(object)
+    compact[np.isnan(values)] = None
+    return compact.tolist()
+
+
+# Fungsi untuk memilih titik yang dipertahankan dengan LTTB (largest-triangle-three-buckets)
+def lttb_indices(values, n_out):
+    """
+    Memilih `n_out` titik yang paling menjaga bentuk series (titik pertama
+    dan terakhir selalu ikut). Tanggal dianggap berjarak sama, sehingga
+    sumbu x memakai posisi titik.
+
+    Parameters:
+    - values: Nilai series (NaN dianggap 0 saat memilih titik).
+    - n_out: Jumlah titik yang dipertahankan.
+
+    Returns:
+    - np.ndarray indeks titik terpilih (urut naik).
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Titik tengah dibagi ke n_out - 2 bucket; satu titik dipilih per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = (end + next_end - 1) / 2
+        next_y = values[end:next_end].mean()
+        # Titik dengan luas segitiga terbesar terhadap titik terpilih sebelumnya dan rata-rata bucket berikutnya
+        x = np.arange(start, end)
+        area = np.abs((previous - next_x) * (values[start:end] - values[previous])
+                      - (previous - x) * (next_y - values[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+# Fungsi untuk memilih titik bersama beberapa series (gabungan hasil LTTB per series)
+def downsample_indices(series_values, max_points):
+    """
+    Returns:
+    - np.ndarray indeks titik (paling banyak `max_points`) yang dipakai semua
+      series, sehingga semua trace tetap berbagi sumbu x yang sama.
+    """
+    series_values = [np.asarray(values, dtype=float) for values in series_values]
+    per_series = max(max_points // max(len(series_values), 1), 3)
+    return np.unique(np.concatenate([lttb_indices(values, per_series) for values in series_values]))
+
+
+# Fungsi untuk membuat spesifikasi satu series (misalnya forecast atau aktual)
+def chart_series(totals, values, names, hovertemplates, field=None, **trace_options):
+    """
+    Parameters:
+    - totals: Nilai total semua key per tanggal (ditampilkan saat pilihan "All").
+    - values: Matriks nilai [key x tanggal] (NaN jika kosong), atau None jika
+      data per key diambil dari `series_url` (lihat `compact_chart_html`).
+    - names: Tuple (nama trace untuk total, template nama per key dengan '{key}').
+    - hovertemplates: Tuple hovertemplate untuk total dan per key ('{key}' diganti nama key).
+    - field: Nama field series ini pada respons `series_url`.
+    - trace_options: Opsi tambahan go.Scatter (misalnya line=dict(dash='dot')).
+    """
+    return {'totals': totals, 'values': values, 'names': names, 'hovertemplates': hovertemplates,
+            'field': field, 'trace_options': trace_options}
+
+
+# Fungsi untuk membuat grafik dengan satu trace per series dan pilihan key di browser
+def compact_chart_html(dates, keys, series, all_label, titles, kind, menu=None, series_url=None,
+                       max_points=MAX_POINTS, webgl_threshold=WEBGL_THRESHOLD, **layout):
+    """
+    Membuat HTML grafik Plotly dengan dropdown key yang dipilih di browser.
+
+    Data semua key dikirim sekali sebagai dataset kolumnar (tanggal, key,
+    nilai) dan dipakai ulang oleh satu trace per series, sehingga ukuran
+    HTML tumbuh linear terhadap jumlah data (bukan trace dan daftar
+    visibility per key).
+
+    Parameters:
+    - dates: Tanggal (sumbu x) untuk semua series.
+    - keys: Daftar key pada dropdown (setelah pilihan total `all_label`).
+    - series: List spesifikasi dari `chart_series`.
+    - all_label: Label dropdown untuk total semua key.
+    - titles: Tuple (judul untuk total, template judul per key dengan '{key}').
+    - kind: Jenis grafik (misalnya 'forecast'), disimpan di dataset untuk script halaman.
+    - menu: Opsi posisi dropdown (x, xanchor, y, yanchor).
+    - series_url: URL opsional (diakhiri parameter key, misalnya '...?key=').
+      Jika diisi, hanya total yang dikirim; data per key diambil saat key
+      dipilih dan disimpan di browser (field per series sesuai `field`).
+    - max_points: Jumlah titik maksimal yang dikirim per tampilan. Jika tanggal
+      lebih banyak dan `series_url` diisi, total di-downsample dengan LTTB dan
+      setiap zoom/pan mengambil rentang yang terlihat dari `series_url`
+      (parameter 'start', 'end', 'points'; key kosong = total).
+    - webgl_threshold: Jumlah tanggal minimal agar trace memakai Scattergl.
+    - layout: Opsi layout tambahan (misalnya title, xaxis_title).
+
+    Returns:
+    - String HTML grafik (tanpa <html>), termasuk dataset dan script pemilihan key.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    totals = [np.asarray(spec['totals'], dtype=float) for spec in series]
+    scatter = go.Scattergl if len(dates) > webgl_threshold else go.Scatter
+
+    # Data panjang: kirim total hasil downsampling, resolusi penuh diambil per rentang saat zoom
+    downsampled = series_url is not None and max_points is not None and len(dates) > max_points
+    if downsampled:
+        points = downsample_indices(totals, max_points)
+        dates = dates[points]
+        totals = [values[points] for values in totals]
+
+    fig = go.Figure()
+    for spec, values in zip(series, totals):
+        fig.add_trace(scatter(
+            x=dates,
+            y=values,
+            mode='lines+markers',
+            name=spec['names'][0],
+            hovertemplate=spec['hovertemplates'][0],
+            **spec['trace_options']
+        ))
+
+    # Tombol dropdown hanya berisi label; perubahan data dilakukan oleh script
+    buttons = [dict(label=str(label), method='skip', args=[None]) for label in [all_label] + list(keys)]
+    fig.update_layout(updatemenus=[dict(active=0, buttons=buttons, **(menu or {}))], **layout)
+
+    dataset = {
+        'kind': kind,
+        'keys': [str(key) for key in keys],
+        'titles': list(titles),
+        'seriesUrl': series_url,
+        'loaded': {},
+        'downsampled': downsampled,
+        'maxPoints': max_points,
+        'dates': dates.astype(str).tolist() if downsampled else None,
+        'series': [{
+            'totals': compact_values(values),
+            'values': compact_values(spec['values']) if spec['values'] is not None and not downsampled else None,
+            'field': spec['field'],
+            'names': list(spec['names']),
+            'hovertemplates': list(spec['hovertemplates']),
+        } for spec, values in zip(series, totals)],
+    }
+    # Hindari '</script>' di dalam data agar tidak menutup tag script lebih awal
+    dataset_json = fast_json.dumps(dataset).replace('</', '<\\/')
+    return fig.to_html(full_html=False, include_plotlyjs=False, post_script=_SELECT_SCRIPT % dataset_json)
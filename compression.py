@@ -0,0 +1,145 @@
+"""
+Kompresi respons HTTP (gzip, atau brotli jika modul `brotli` terpasang).
+
+Encoding dipilih dari header Accept-Encoding (q-value dihormati). Respons di
+bawah `min_size` byte, respons streaming (misalnya SSE), dan tipe konten
+yang sudah terkompresi tidak diubah.
+
+Respons immutable (Cache-Control immutable, misalnya asset ber-fingerprint)
+dikompresi sekali lalu disimpan di cache per proses, sehingga permintaan
+berikutnya tidak mengompresi ulang beberapa megabyte yang sama.
+"""
+# Library untuk kompresi
+import gzip
+
+# Library untuk sinkronisasi antar thread dan cache LRU
+import threading
+from collections import OrderedDict
+
+# Library untuk membaca header permintaan
+from flask import request
+
+# Brotli opsional: tanpa modul ini hanya gzip yang dipakai
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipe konten berbasis teks yang layak dikompresi
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+
+# Fungsi untuk memilih encoding terbaik yang diterima klien
+def choose_encoding(accept_encoding, available):
+    """
+    Parameters:
+    - accept_encoding: Objek `request.accept_encodings` (Werkzeug).
+    - available: Encoding yang didukung server, urut dari yang paling disukai.
+
+    Returns:
+    - Nama encoding ('br' atau 'gzip'), atau None jika tidak ada yang diterima.
+    """
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accept_encoding[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# Fungsi untuk mengompresi isi respons
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class CompressedCache:
+    """
+    Cache hasil kompresi untuk respons immutable (LRU, dibatasi total byte).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+# Fungsi untuk memasang kompresi respons pada aplikasi Flask
+def init_app(app, min_size=1024, level=6, cache=None):
+    """
+    Parameters:
+    - app: Aplikasi Flask.
+    - min_size: Ukuran minimal respons (byte) yang dikompresi.
+    - level: Level kompresi gzip (1-9) / kualitas brotli.
+    - cache: CompressedCache untuk respons immutable (default 64 MB).
+    """
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    cache = cache if cache is not None else CompressedCache()
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_TYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        # Respons streaming (generator) tidak dibuffer; respons file tetap dikompresi
+        if response.is_streamed and not response.direct_passthrough:
+            return response
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings, available)
+        if encoding is None:
+            return response
+
+        # Respons immutable: ambil hasil kompresi dari cache (key = path, ETag, encoding)
+        etag, _ = response.get_etag()
+        cache_key = (request.path, etag, encoding) if response.cache_control.immutable and etag else None
+        compressed = cache.get(cache_key) if cache_key is not None else None
+
+        # Respons file (send_from_directory) dibaca dulu ke memori
+        response.direct_passthrough = False
+        if compressed is None:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compressed = compress(data, encoding, level)
+            if cache_key is not None:
+                cache.put(cache_key, compressed)
+        if hasattr(response.response, 'close'):
+            response.response.close()
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers.pop('Accept-Ranges', None)
+        if etag:
+            # Representasi terkompresi berbeda byte: ETag dijadikan weak (If-None-Match tetap cocok)
+            response.set_etag(etag, weak=True)
+        return response
+
+    return cache
@@ -0,0 +1,184 @@
+# Library untuk mencatat waktu dan sinkronisasi antar thread fitting
+import time
+import threading
+
+# Library untuk cache forecast dengan urutan akses terakhir
+from collections import OrderedDict
+
+# Library untuk melakukan manipulasi terhadap dataset
+import numpy as np
+import pandas as pd
+
+
+# Label metode yang menghasilkan forecast setiap series
+METHOD_PROPHET = 'prophet'
+METHOD_FLAT = 'flat'
+METHOD_CACHED = 'cached'
+METHOD_TOP_DOWN = 'top-down'
+METHOD_SEASONAL = 'seasonal-naive'
+
+
+class TimeBudget:
+    """
+    Batas waktu analisis. Durasi fitting dicatat untuk memperkirakan apakah
+    fitting berikutnya masih sempat selesai sebelum deadline.
+
+    `seconds=None` berarti tanpa batas waktu. `clock` adalah sumber waktu
+    (detik) untuk deadline dan durasi fitting.
+    """
+
+    def __init__(self, seconds=None, safety=1.5, clock=time.time):
+        self.clock = clock
+        self.deadline = clock() + seconds if seconds is not None else None
+        self.safety = safety
+        self._durations = []
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._durations.append(seconds)
+
+    def expected_fit_seconds(self):
+        # Perkiraan durasi satu fitting dari fitting yang sudah selesai
+        with self._lock:
+            return float(np.median(self._durations)) if self._durations else 0.0
+
+    def can_fit(self):
+        """
+        Mengembalikan True jika fitting baru diperkirakan selesai sebelum deadline.
+        """
+        if self.deadline is None:
+            return True
+        return self.clock() + self.expected_fit_seconds() * self.safety < self.deadline
+
+
+class ForecastCache:
+    """
+    Cache forecast terbaru per series (LRU, per proses), dipakai sebagai
+    sumber tercepat saat waktu analisis hampir habis.
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            forecast = self._entries.get(key)
+            if forecast is not None:
+                self._entries.move_to_end(key)
+        return forecast.copy() if forecast is not None else None
+
+    def put(self, key, forecast):
+        with self._lock:
+            self._entries[key] = forecast.copy()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Fungsi untuk membuat kerangka forecast (histori + tanggal ke depan)
+def _forecast_frame(series_data, future_values, periods):
+    history = series_data[['ds', 'y']].copy()
+    history['ds'] = pd.to_datetime(history['ds'])
+    future_dates = pd.date_range(history['ds'].max() + pd.Timedelta(days=1), periods=periods, freq='D')
+
+    values = np.concatenate([history['y'].to_numpy(dtype=float), np.asarray(future_values, dtype=float)])
+    return pd.DataFrame({
+        'ds': pd.concat([history['ds'], pd.Series(future_dates)], ignore_index=True),
+        'trend': values,
+        'yhat_lower': values,
+        'yhat_upper': values,
+        'yhat': values,
+    })
+
+
+# Fungsi untuk forecast seasonal naive (rata-rata hari yang sama dalam beberapa minggu terakhir)
+def seasonal_naive_forecast(series_data, periods=31, weeks=4):
+    """
+    Forecast baseline tanpa fitting: setiap tanggal ke depan diisi rata-rata
+    nilai pada hari yang sama (Senin, Selasa, ...) selama `weeks` minggu terakhir.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - periods: Jumlah hari ke depan untuk forecasting.
+    - weeks: Jumlah minggu terakhir yang dirata-rata.
+
+    Returns:
+    - DataFrame dengan kolom 'ds', 'trend', 'yhat_lower', 'yhat_upper', dan 'yhat'
+      (histori berisi nilai aktual).
+    """
+    history = series_data[['ds', 'y']].copy()
+    history['ds'] = pd.to_datetime(history['ds'])
+    recent = history[history['ds'] > history['ds'].max() - pd.Timedelta(weeks=weeks)]
+    by_weekday = recent.groupby(recent['ds'].dt.dayofweek)['y'].mean()
+
+    future_dates = pd.date_range(history['ds'].max() + pd.Timedelta(days=1), periods=periods, freq='D')
+    fallback = recent['y'].mean() if not recent.empty else 0.0
+    future_values = [by_weekday.get(date.dayofweek, fallback) for date in future_dates]
+    return _forecast_frame(series_data, future_values, periods)
+
+
+# Fungsi untuk forecast top-down dari total series yang sudah di-fit
+def top_down_forecast(series_data, pooled_series, pooled_forecasts, periods=31, window=28):
+    """
+    Forecast tanpa fitting dengan membagi total forecast series lain yang sudah
+    di-fit, sesuai porsi volume series ini selama `window` hari terakhir.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - pooled_series: List DataFrame histori ('ds', 'y') series yang sudah di-fit.
+    - pooled_forecasts: List DataFrame forecast Prophet untuk series tersebut.
+    - periods: Jumlah hari ke depan untuk forecasting.
+    - window: Jumlah hari terakhir untuk menghitung porsi volume.
+
+    Returns:
+    - DataFrame forecast, atau None jika belum ada series yang bisa dipakai.
+    """
+    if not pooled_forecasts:
+        return None
+
+    history = series_data[['ds', 'y']].copy()
+    history['ds'] = pd.to_datetime(history['ds'])
+    end = history['ds'].max()
+    start = end - pd.Timedelta(days=window)
+    future_dates = pd.date_range(end + pd.Timedelta(days=1), periods=periods, freq='D')
+
+    # Total volume terakhir dan total forecast dari series yang sudah di-fit
+    pooled_recent = 0.0
+    pooled_future = np.zeros(periods)
+    for pooled, forecast in zip(pooled_series, pooled_forecasts):
+        pooled_dates = pd.to_datetime(pooled['ds'])
+        pooled_recent += pooled.loc[(pooled_dates > start) & (pooled_dates <= end), 'y'].sum()
+        pooled_future += forecast.set_index('ds')['yhat'].reindex(future_dates).fillna(0).to_numpy()
+
+    if pooled_recent <= 0:
+        return None
+
+    share = history.loc[history['ds'] > start, 'y'].sum() / pooled_recent
+    return _forecast_frame(series_data, pooled_future * share, periods)
+
+
+# Fungsi untuk memilih forecast tercepat saat budget waktu hampir habis
+def fallback_forecast(series_data, cached_forecast, pooled_series, pooled_forecasts, periods=31):
+    """
+    Forecast tanpa fitting dengan urutan: forecast cache, top-down dari series
+    yang sudah di-fit, lalu seasonal naive.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - cached_forecast: Forecast dari `ForecastCache` untuk series ini, atau None.
+    - pooled_series: List DataFrame histori series yang sudah di-fit.
+    - pooled_forecasts: List DataFrame forecast Prophet untuk series tersebut.
+    - periods: Jumlah hari ke depan untuk forecasting.
+
+    Returns:
+    - DataFrame forecast dengan kolom 'method' berisi metode yang dipakai.
+    """
+    if cached_forecast is not None:
+        return cached_forecast.assign(method=METHOD_CACHED)
+    forecast = top_down_forecast(series_data, pooled_series, pooled_forecasts, periods=periods)
+    if forecast is not None:
+        return forecast.assign(method=METHOD_TOP_DOWN)
+    return seasonal_naive_forecast(series_data, periods=periods).assign(method=METHOD_SEASONAL)
@@ -0,0 +1,126 @@
+"""
+Serialisasi JSON cepat untuk respons aplikasi (orjson jika terpasang).
+
+`init_app(app)` mengganti JSON provider Flask, sehingga semua `jsonify`
+memakai orjson: array NumPy, skalar NumPy, dan datetime64 diserialisasi
+langsung tanpa dikonversi per elemen, dan NaN menjadi null. Tanpa modul
+`orjson`, provider bawaan Flask tetap dipakai (NumPy harus dikonversi
+dengan `.tolist()` seperti sebelumnya).
+
+Grafik Plotly memakai engine JSON 'auto' yang juga memilih orjson jika
+terpasang.
+
+`pack_array` menyediakan array biner (base64, format typed array
+Plotly.js {dtype, bdata}) untuk data grafik berisi banyak angka desimal
+(lihat benchmarks/bench_serialization.py). Dipakai oleh /forecast-baseline
+dan /compare-series; browser men-decode-nya dengan `unpackArray` dari
+script grafik (compact_chart.py).
+"""
+# Library untuk encoding array biner dan JSON cadangan
+import base64
+import json
+
+# Library untuk operasi array dan tipe data pandas
+import numpy as np
+import pandas as pd
+
+# Library JSON provider Flask
+from flask.json.provider import DefaultJSONProvider
+
+# orjson opsional: tanpa modul ini dipakai encoder JSON bawaan Flask
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+# Fungsi untuk mengubah tipe yang tidak dikenal orjson (pandas, memmap, set) menjadi tipe JSON
+def _default(obj):
+    if isinstance(obj, np.ndarray):
+        # Array memory-map atau potongan kolom (tidak C-contiguous) disalin ke ndarray biasa
+        return obj.tolist() if obj.dtype == object else np.ascontiguousarray(obj)
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.to_numpy()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Fungsi untuk serialisasi objek menjadi bytes JSON
+def dumps_bytes(obj, sort_keys=False):
+    if orjson is None:
+        return dumps(obj, sort_keys).encode()
+    return orjson.dumps(obj, default=_default, option=OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+
+
+# Fungsi untuk serialisasi objek menjadi string JSON (ringkas, tanpa spasi)
+def dumps(obj, sort_keys=False):
+    if orjson is None:
+        return json.dumps(obj, default=_fallback_default, sort_keys=sort_keys, separators=(',', ':'))
+    return dumps_bytes(obj, sort_keys).decode()
+
+
+# Tanpa orjson: array dan skalar NumPy dikonversi lewat `.tolist()` (NaN dalam array menjadi null)
+def _fallback_default(obj):
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        return np.where(np.isnan(obj), None, obj).tolist()
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'M':
+        return np.datetime_as_string(obj, unit='s').tolist()
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return _default(obj)
+
+
+# Fungsi untuk mengemas array angka menjadi typed array biner (format Plotly.js)
+def pack_array(values):
+    """
+    Parameters:
+    - values: Array angka (NaN = kosong).
+
+    Returns:
+    - Dictionary {'dtype', 'bdata', 'shape'}: 'i4' jika semua nilai bulat
+      dan muat di int32, selain itu 'f8' (NaN tetap NaN). 'bdata' berisi
+      byte little-endian dalam base64.
+    """
+    values = np.asarray(values, dtype=float)
+    is_int32 = (np.isfinite(values).all() and (values == np.round(values)).all()
+                and (np.abs(values) < 2 ** 31).all())
+    packed = values.astype('<i4') if is_int32 else values.astype('<f8')
+    return {
+        'dtype': 'i4' if is_int32 else 'f8',
+        'bdata': base64.b64encode(packed.tobytes()).decode('ascii'),
+        'shape': list(values.shape),
+    }
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider Flask berbasis orjson (dipakai oleh `jsonify` dan filter `tojson`).
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys))
+
+    def loads(self, s, **kwargs):
+        # Opsi json.loads (misalnya object_hook) tidak dikenal orjson: pakai parser bawaan Flask
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj, sort_keys=self.sort_keys) + b"\n", mimetype=self.mimetype)
+
+
+# Fungsi untuk memasang serialisasi JSON cepat pada aplikasi Flask
+def init_app(app):
+    if orjson is not None:
+        app.json = FastJSONProvider(app)
+    return app.json
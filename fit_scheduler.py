@@ -0,0 +1,112 @@
+# Library untuk membaca jumlah core CPU
+import os
+
+# Library untuk sinkronisasi antar thread
+import threading
+import itertools
+from contextlib import contextmanager
+
+# Pembatalan fitting yang masih menunggu slot
+from cancellation import JobCancelled
+
+
+class FitScheduler:
+    """
+    Scheduler global untuk fitting model (Prophet/cmdstan).
+
+    Jumlah fitting yang berjalan bersamaan dibatasi sebanyak `slots`
+    (default: jumlah core CPU); fitting lainnya menunggu di antrian. Saat slot
+    kosong, fitting berikutnya dipilih dengan urutan:
+
+    1. Job kecil/interaktif (total series <= `interactive_series`) lebih dulu.
+    2. Job dengan fitting berjalan paling sedikit (pembagian slot yang adil).
+    3. Urutan masuk antrian.
+    """
+
+    def __init__(self, slots=None, interactive_series=20):
+        self.slots = max(1, slots or os.cpu_count() or 1)
+        self.interactive_series = interactive_series
+        self._changed = threading.Condition()
+        self._running = 0
+        self._running_by_job = {}
+        self._waiting = {}
+        self._tickets = itertools.count()
+
+    def _priority(self, ticket):
+        job_id, size = self._waiting[ticket]
+        return (size > self.interactive_series, self._running_by_job.get(job_id, 0), ticket)
+
+    def _next_ticket(self):
+        return min(self._waiting, key=self._priority) if self._waiting else None
+
+    @contextmanager
+    def slot(self, job_id, size, on_wait=None, cancel_token=None):
+        """
+        Menunggu slot fitting untuk satu series milik job `job_id`.
+
+        Parameters:
+        - job_id: ID job pemilik fitting.
+        - size: Total series pada job (untuk prioritas job kecil).
+        - on_wait: Fungsi opsional `on_wait(status)` yang dipanggil sekali jika
+          fitting harus menunggu slot (status dari `status(job_id)`).
+        - cancel_token: CancelToken opsional. Jika job dibatalkan saat masih
+          menunggu, antrian dilepas dan `JobCancelled` dilempar.
+        """
+        with self._changed:
+            ticket = next(self._tickets)
+            self._waiting[ticket] = (job_id, size)
+            must_wait = self._running >= self.slots or self._next_ticket() != ticket
+            waiting_status = self._status(job_id) if must_wait else None
+
+        if waiting_status is not None and on_wait is not None:
+            on_wait(waiting_status)
+
+        # Thread yang menunggu dibangunkan oleh notify_all saat slot dilepas atau job dibatalkan
+        remove_wakeup = cancel_token.on_cancel(self._wake) if cancel_token is not None else None
+        try:
+            with self._changed:
+                while self._running >= self.slots or self._next_ticket() != ticket:
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        del self._waiting[ticket]
+                        self._changed.notify_all()
+                        raise JobCancelled()
+                    self._changed.wait()
+                del self._waiting[ticket]
+                self._running += 1
+                self._running_by_job[job_id] = self._running_by_job.get(job_id, 0) + 1
+                self._changed.notify_all()
+        finally:
+            if remove_wakeup is not None:
+                remove_wakeup()
+
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._running -= 1
+                self._running_by_job[job_id] -= 1
+                if not self._running_by_job[job_id]:
+                    del self._running_by_job[job_id]
+                self._changed.notify_all()
+
+    def _wake(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def status(self, job_id=None):
+        """
+        Mengembalikan kondisi antrian fitting (untuk ditampilkan di UI).
+
+        Returns:
+        - Dictionary 'slots', 'running', 'queued', serta 'job_running' dan
+          'job_queued' jika `job_id` diberikan.
+        """
+        with self._changed:
+            return self._status(job_id)
+
+    def _status(self, job_id=None):
+        status = {'slots': self.slots, 'running': self._running, 'queued': len(self._waiting)}
+        if job_id is not None:
+            status['job_running'] = self._running_by_job.get(job_id, 0)
+            status['job_queued'] = sum(1 for owner, _ in self._waiting.values() if owner == job_id)
+        return status
@@ -0,0 +1,327 @@
+# Library untuk menangani file dan folder store
+import os
+import json
+import shutil
+import threading
+import time
+import uuid
+
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+
+class ForecastArrays:
+    """
+    Store kolumnar hasil forecast yang dibaca lewat memory-map (read-only).
+
+    Isi satu versi store (subfolder versi di dalam folder analisis, lihat
+    `ForecastArrayStore`):
+    - keys.json: daftar key (misalnya Origin City) sebagai index baris, beserta
+      label teks per key (misalnya metode forecast).
+    - dates.npy: tanggal forecast (datetime64[D]) sebagai index kolom.
+    - values.npy: matriks forecast harian [key x tanggal] (NaN jika kosong).
+    - table_<kolom>.npy: nilai per key untuk tabel hasil (misalnya November, Desember).
+    - history.npy, history_dates.npy: data historis harian [key x tanggal] dari
+      upload (opsional, bisa bertahun-tahun; tanggal sendiri, bukan dates.npy).
+    - state.json: versi store ('version', naik setiap kali store ditulis ulang)
+      dan state kecil yang bisa berubah (misalnya growth terakhir).
+    - actual.npy: matriks data aktual [key x tanggal] dari upload terakhir (opsional).
+    - actual_metrics.npz: agregat yang dihitung dari actual.npy (opsional, misalnya
+      jumlah berjalan metrik akurasi), berlaku selama actual.npy tidak berubah.
+
+    Karena array dibuka dengan `np.load(mmap_mode='r')`, semua worker proses
+    berbagi page cache OS yang sama: data ditulis sekali, lalu dibaca
+    zero-copy oleh worker mana pun tanpa menjalankan ulang analisis.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Versi store: naik setiap kali store ditulis ulang (misalnya hasil akhir menggantikan
+        # preview), dipakai sebagai key cache render dan ETag
+        with open(os.path.join(path, 'state.json')) as f:
+            self.version = int(json.load(f)['version'])
+        with open(os.path.join(path, 'keys.json')) as f:
+            meta = json.load(f)
+        self.keys = meta['keys']
+        self.table_columns = meta['table_columns']
+        self.labels = meta.get('labels', {})
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self.dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+        self.values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        self.table = {
+            column: np.load(os.path.join(path, f"table_{i}.npy"), mmap_mode='r')
+            for i, column in enumerate(self.table_columns)
+        }
+        if os.path.exists(os.path.join(path, 'history.npy')):
+            self.history_dates = np.load(os.path.join(path, 'history_dates.npy'), mmap_mode='r')
+            self.history = np.load(os.path.join(path, 'history.npy'), mmap_mode='r')
+        else:
+            self.history_dates = self.history = None
+        self._actual = None
+
+    def date_index(self):
+        return pd.DatetimeIndex(self.dates.astype('datetime64[ns]'))
+
+    def history_index(self):
+        return pd.DatetimeIndex(self.history_dates.astype('datetime64[ns]'))
+
+    def row(self, key):
+        # View (tanpa copy) forecast harian untuk satu key
+        return self.values[self.key_index[key]]
+
+    def total_series(self, scale=1.0):
+        # Total harian semua key, dengan pembulatan per key seperti tabel hasil
+        return np.nansum(np.round(self.values * scale), axis=0)
+
+    def to_frame(self, key_name, value_name, scale=1.0):
+        """
+        Mengembalikan forecast dalam bentuk long DataFrame (tanggal, key, nilai).
+        """
+        values = np.round(self.values * scale)
+        frame = pd.DataFrame({
+            'Date': np.tile(self.date_index(), len(self.keys)),
+            key_name: np.repeat(np.array(self.keys, dtype=object), len(self.dates)),
+            value_name: values.reshape(-1),
+        })
+        return frame.dropna(subset=[value_name]).reset_index(drop=True)
+
+    def actual_values(self):
+        """
+        Matriks data aktual [key x tanggal] (memory-map, NaN jika kosong), atau
+        None jika belum ada. Dibuka ulang jika file ditulis ulang oleh worker lain.
+        """
+        version = self.actual_version()
+        if version is None:
+            return None
+        if self._actual is None or self._actual[0] != version:
+            self._actual = (version, np.load(os.path.join(self.path, 'actual.npy'), mmap_mode='r'))
+        return self._actual[1]
+
+    def actual_version(self):
+        # Versi data aktual (inode dan waktu tulis, berubah setiap kali ditulis ulang), None jika belum ada
+        try:
+            stat = os.stat(os.path.join(self.path, 'actual.npy'))
+        except OSError:
+            return None
+        return f"{stat.st_ino}-{stat.st_mtime_ns}"
+
+    def write_actuals(self, values, metrics=None):
+        """
+        Menulis data aktual secara atomik (urutan baris dan kolom sama dengan values.npy).
+
+        Parameters:
+        - values: Matriks data aktual [key x tanggal].
+        - metrics: Dictionary opsional nama -> array yang dihitung dari `values`.
+          Disimpan bersama versi data aktual, sehingga `read_metrics` hanya
+          mengembalikannya selama actual.npy belum ditulis ulang.
+        """
+        path = os.path.join(self.path, 'actual.npy')
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(values, dtype=np.float64))
+
+        # Inode file lama bisa langsung dipakai ulang oleh file baru; waktu tulis
+        # dibuat selalu naik agar versi (inode, waktu tulis) tetap berbeda
+        try:
+            previous = os.stat(path).st_mtime_ns
+        except OSError:
+            previous = 0
+        mtime = max(time.time_ns(), previous + 1)
+        os.utime(tmp_path, ns=(mtime, mtime))
+        os.replace(tmp_path, path)
+        if metrics is None:
+            return
+
+        path = os.path.join(self.path, 'actual_metrics.npz')
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, actual_version=self.actual_version(), **metrics)
+        os.replace(tmp_path, path)
+
+    def read_metrics(self):
+        # Agregat dari `write_actuals`, atau None jika belum ada atau data aktual sudah berubah
+        try:
+            with np.load(os.path.join(self.path, 'actual_metrics.npz')) as f:
+                metrics = {name: f[name] for name in f.files}
+        except (OSError, ValueError):
+            return None
+        if str(metrics.pop('actual_version')) != self.actual_version():
+            return None
+        return metrics
+
+    def read_state(self):
+        # State tanpa versi store
+        try:
+            with open(os.path.join(self.path, 'state.json')) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        state.pop('version', None)
+        return state
+
+    def write_state(self, state):
+        # Tulis state secara atomik agar worker lain tidak membaca file setengah jadi; versi store tetap
+        _write_json(os.path.join(self.path, 'state.json'), {**state, 'version': self.version})
+
+
+# Fungsi untuk menulis file JSON secara atomik (tulis ke file sementara lalu `os.replace`)
+def _write_json(path, obj):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+class ForecastArrayStore:
+    """
+    Kumpulan ForecastArrays per ID analisis di dalam satu folder.
+
+    Setiap analisis punya folder `<ID>/` berisi subfolder per versi
+    (`<ID>/<versi>/`) dan file `current` berisi versi yang aktif. Penulisan
+    ulang membuat subfolder versi baru lalu mengganti `current` dengan
+    `os.replace` (atomik), sehingga pembaca selalu melihat versi lama atau
+    versi baru yang lengkap. Versi sebelumnya disimpan sampai penulisan
+    berikutnya agar pembaca yang sedang membukanya tidak kehilangan file.
+
+    Seperti AnalysisStore, store yang tidak diakses selama `ttl_seconds`
+    dihapus saat `purge_expired` dipanggil.
+    """
+
+    def __init__(self, folder, ttl_seconds=6 * 3600):
+        self.folder = folder
+        self.ttl_seconds = ttl_seconds
+        self._open = {}
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, analysis_id):
+        if not analysis_id or not all(c in '0123456789abcdef' for c in analysis_id):
+            raise KeyError(analysis_id)
+        return os.path.join(self.folder, analysis_id)
+
+    def write(self, analysis_id, forecast_data, key_col, date_col, value_col, table, labels=None, history=None):
+        """
+        Menulis forecast ke store sebagai versi baru. Store yang sudah ada
+        (misalnya hasil sementara mode preview) diganti secara atomik; state
+        (misalnya growth) dipertahankan.
+
+        Parameters:
+        - forecast_data: Long DataFrame forecast harian.
+        - key_col, date_col, value_col: Nama kolom key, tanggal, dan nilai.
+        - table: DataFrame per key (index = key) berisi kolom numerik tabel hasil.
+        - labels: Dictionary opsional nama kolom -> list label teks per key
+          (urutan sama dengan `table`).
+        - history: DataFrame opsional data historis harian [key x tanggal].
+        """
+        path = self._path(analysis_id)
+        matrix = forecast_data.pivot_table(index=key_col, columns=date_col, values=value_col, aggfunc='sum')
+        matrix = matrix.reindex(table.index)
+
+        # Versi baru selalu lebih besar dari versi sebelumnya, juga jika store pernah dihapus lalu
+        # ditulis lagi dengan ID yang sama (cache per proses tidak memakai fragmen versi lama)
+        os.makedirs(path, exist_ok=True)
+        previous = self._current_version(analysis_id)
+        version = max(time.time_ns(), (previous or 0) + 1)
+        tmp_path = os.path.join(path, f"{version}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(tmp_path)
+        with open(os.path.join(tmp_path, 'keys.json'), 'w') as f:
+            json.dump({
+                'keys': [str(key) for key in matrix.index],
+                'table_columns': list(table.columns),
+                'labels': {column: [str(label) for label in values] for column, values in (labels or {}).items()},
+            }, f)
+        np.save(os.path.join(tmp_path, 'dates.npy'), pd.to_datetime(matrix.columns).values.astype('datetime64[D]'))
+        np.save(os.path.join(tmp_path, 'values.npy'), matrix.to_numpy(dtype=np.float64))
+        for i, column in enumerate(table.columns):
+            np.save(os.path.join(tmp_path, f"table_{i}.npy"), table[column].to_numpy(dtype=np.float64))
+        if history is not None:
+            history = history.reindex(table.index)
+            np.save(os.path.join(tmp_path, 'history_dates.npy'),
+                    pd.to_datetime(history.columns).values.astype('datetime64[D]'))
+            np.save(os.path.join(tmp_path, 'history.npy'), history.to_numpy(dtype=np.float64))
+
+        # Pertahankan state (misalnya growth) dari versi sebelumnya
+        state = {}
+        if previous is not None:
+            try:
+                with open(os.path.join(path, str(previous), 'state.json')) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                pass
+        _write_json(os.path.join(tmp_path, 'state.json'), {**state, 'version': version})
+
+        # Versi baru aktif saat `current` diganti; folder versi lama tidak pernah dipindah
+        os.rename(tmp_path, os.path.join(path, str(version)))
+        _write_json(os.path.join(path, 'current'), version)
+
+        # Buang versi yang lebih lama dari versi sebelumnya (dan folder sementara yang tertinggal)
+        for name in os.listdir(path):
+            if name not in ('current', str(version), str(previous)):
+                entry = os.path.join(path, name)
+                if os.path.isdir(entry):
+                    shutil.rmtree(entry, ignore_errors=True)
+        with self._lock:
+            self._open.pop(analysis_id, None)
+
+    def _current_version(self, analysis_id):
+        # Versi aktif dari file `current`, atau None jika store belum ada
+        try:
+            with open(os.path.join(self._path(analysis_id), 'current')) as f:
+                return int(json.load(f))
+        except (KeyError, OSError, ValueError):
+            return None
+
+    def get(self, analysis_id):
+        """
+        Membuka store untuk satu analisis (di-cache per proses), atau None jika tidak ada.
+        Cache dibuka ulang jika store sudah ditulis ulang oleh worker mana pun.
+        """
+        with self._lock:
+            arrays = self._open.get(analysis_id)
+        version = self._current_version(analysis_id)
+        if version is None:
+            return None
+        if arrays is None or arrays.version != version:
+            try:
+                arrays = ForecastArrays(os.path.join(self._path(analysis_id), str(version)))
+            except (OSError, ValueError, KeyError):
+                # Versi ini sudah dibuang oleh dua penulisan berikutnya: buka versi yang aktif sekarang
+                version = self._current_version(analysis_id)
+                try:
+                    arrays = ForecastArrays(os.path.join(self._path(analysis_id), str(version)))
+                except (OSError, ValueError, KeyError):
+                    return None
+
+        # Tandai waktu akses terakhir (dipakai untuk masa hidup store)
+        try:
+            os.utime(self._path(analysis_id))
+        except OSError:
+            return None
+        with self._lock:
+            self._open[analysis_id] = arrays
+        return arrays
+
+    def delete(self, analysis_id):
+        with self._lock:
+            self._open.pop(analysis_id, None)
+        try:
+            shutil.rmtree(self._path(analysis_id))
+        except (KeyError, OSError):
+            pass
+
+    def purge_expired(self):
+        # Hapus semua store yang sudah melewati masa hidupnya
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            try:
+                if time.time() - os.stat(path).st_mtime <= self.ttl_seconds:
+                    continue
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                self.delete(name)
@@ -0,0 +1,142 @@
+# Library untuk membuat key cache dari definisi skenario
+import json
+import hashlib
+
+# Library untuk sinkronisasi antar thread dan cache LRU
+import threading
+from collections import OrderedDict
+
+# Library untuk operasi array
+import numpy as np
+
+
+# Fungsi untuk membuat matriks growth [skenario x key] dari definisi skenario
+def growth_matrix(keys, scenarios, groups=None):
+    """
+    Membuat matriks growth (persen) untuk semua skenario.
+
+    Parameters:
+    - keys: Daftar key (misalnya Origin City) sesuai urutan baris store.
+    - scenarios: List dictionary skenario, masing-masing berisi 'id', 'growth'
+      (growth global, default 0), 'group_overrides' (opsional, grup -> growth)
+      dan 'overrides' (opsional, key -> growth). Urutan prioritas: override
+      key, lalu override grup, lalu growth global.
+    - groups: Dictionary opsional key -> grup (misalnya AREA) untuk 'group_overrides'.
+
+    Returns:
+    - np.ndarray [jumlah skenario x jumlah key] berisi growth dalam persen.
+    """
+    key_index = {key: i for i, key in enumerate(keys)}
+    key_groups = np.array([(groups or {}).get(key) for key in keys], dtype=object)
+
+    matrix = np.empty((len(scenarios), len(keys)))
+    for row, scenario in zip(matrix, scenarios):
+        row[:] = float(scenario.get('growth', 0))
+        for group, growth in (scenario.get('group_overrides') or {}).items():
+            if not (key_groups == group).any():
+                raise ValueError(f"Unknown group '{group}' in scenario '{scenario['id']}'")
+            row[key_groups == group] = float(growth)
+        for key, growth in (scenario.get('overrides') or {}).items():
+            if key not in key_index:
+                raise ValueError(f"Unknown key '{key}' in scenario '{scenario['id']}'")
+            row[key_index[key]] = float(growth)
+    return matrix
+
+
+# Fungsi untuk menghitung semua skenario sekaligus terhadap baseline di store
+def evaluate_scenarios(arrays, growth):
+    """
+    Menghitung hasil semua skenario dalam satu operasi array.
+
+    Pembulatan sama dengan /update-growth: Desember per key dibulatkan, dan
+    forecast harian dibulatkan per key sebelum dijumlahkan.
+
+    Parameters:
+    - arrays: ForecastArrays hasil analisis (kolom tabel 'November' dan 'Desember').
+    - growth: Matriks growth [skenario x key] dari `growth_matrix`.
+
+    Returns:
+    - Dictionary berisi array 'desember' dan 'growth_pct' [skenario x key],
+      'daily' (total harian semua key, [skenario x tanggal]) dan 'total'
+      (total forecast per skenario).
+    """
+    scale = 1 + growth / 100
+    november = np.asarray(arrays.table['November'])
+    desember = np.round(np.asarray(arrays.table['Desember']) * scale)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth_pct = (desember - november) / november * 100
+
+    daily = np.nansum(np.round(np.asarray(arrays.values)[np.newaxis] * scale[:, :, np.newaxis]), axis=1)
+    return {'desember': desember, 'growth_pct': growth_pct, 'daily': daily, 'total': daily.sum(axis=1)}
+
+
+class ScenarioCache:
+    """
+    Cache hasil skenario (LRU, per proses).
+
+    Key cache terdiri dari ID analisis, ID skenario, dan isi definisi
+    skenario, sehingga skenario dengan ID sama tetapi isi berbeda (atau
+    analisis yang ditulis ulang) tidak memakai hasil lama.
+    """
+
+    def __init__(self, max_entries=200):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(analysis_id, version, scenario, groups=None):
+        spec = json.dumps([scenario, groups or {}], sort_keys=True, default=str)
+        return (analysis_id, version, scenario['id'], hashlib.sha1(spec.encode()).hexdigest())
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Fungsi untuk mengambil hasil skenario dari cache dan menghitung sisanya sekaligus
+def scenario_results(arrays, analysis_id, scenarios, groups=None, cache=None):
+    """
+    Mengembalikan hasil setiap skenario (urutan sama dengan `scenarios`).
+
+    Skenario yang sudah ada di `cache` tidak dihitung ulang; skenario sisanya
+    dihitung bersama dalam satu panggilan `evaluate_scenarios`.
+
+    Returns:
+    - List dictionary per skenario: 'id', 'total_december_forecast', dan array
+      'daily', 'desember', serta 'growth_pct' (NaN, menjadi null di JSON).
+    """
+    ids = [scenario.get('id') for scenario in scenarios]
+    if any(not isinstance(scenario_id, str) or not scenario_id for scenario_id in ids):
+        raise ValueError("Every scenario needs a non-empty string 'id'")
+    if len(set(ids)) != len(ids):
+        raise ValueError("Scenario IDs must be unique")
+
+    keys = [ScenarioCache.key(analysis_id, arrays.version, scenario, groups) for scenario in scenarios]
+    results = [cache.get(key) if cache is not None else None for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        growth = growth_matrix(arrays.keys, [scenarios[i] for i in missing], groups)
+        evaluated = evaluate_scenarios(arrays, growth)
+        for row, i in enumerate(missing):
+            results[i] = {
+                'id': scenarios[i]['id'],
+                'total_december_forecast': float(evaluated['total'][row]),
+                'daily': evaluated['daily'][row].copy(),
+                'desember': evaluated['desember'][row].copy(),
+                'growth_pct': evaluated['growth_pct'][row].copy(),
+            }
+            if cache is not None:
+                cache.put(keys[i], results[i])
+    return results
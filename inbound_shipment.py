@@ -8,8 +8,23 @@ from flask import Flask, render_template, request, redirect, url_for, send_file,
 # Library untuk melakukan manipulasi terhadap dataset
 import pandas as pd
 
-# Library yang mengunggah model Prophet untuk melakukan forecasting
-from prophet import Prophet
+# Fitting Prophet per series, bisa dijalankan lokal maupun di worker task queue
+from prophet_fits import fit_prophet_group
+
+# Task queue untuk mengirim fitting ke worker di mesin lain (opsional)
+from task_queue import executor_from_env, wait_result
+
+# Deduplikasi series sebelum fitting
+from series_dedup import forecast_unique_series, series_fingerprint
+
+# Checkpoint per series agar run yang terputus bisa dilanjutkan
+from checkpoint_store import CheckpointStore, job_key
+
+# Penyimpanan hasil breakdown untuk API tabel dengan paginasi
+from result_store import ResultStore, ResultTable
+
+# Cube agregasi untuk semua rollup dashboard
+from rollup_cube import RollupCube
 
 import random
 
@@ -20,8 +35,20 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 
 
+# Asset UI (Plotly.js, jQuery, Bootstrap) disajikan lokal dengan nama ber-fingerprint
+import static_assets
+
+# Kompresi respons (gzip/brotli) untuk HTML dan JSON yang besar
+import compression
+
+# Serialisasi JSON cepat (orjson) untuk jsonify, termasuk array NumPy
+import fast_json
+
 
 app = Flask(__name__)
+static_assets.init_app(app)
+compression.init_app(app, min_size=int(os.environ.get('FORECAST_COMPRESS_MIN_BYTES', 1024)))
+fast_json.init_app(app)
 UPLOAD_FOLDER = 'uploads'
 RESULT_FOLDER = 'results'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -32,6 +59,26 @@ forecast_results = {}
 result_df = None
 base_forecast_df = None
 
+# Penyimpanan tabel breakdown (AREA, AREA 2, Destname) per hasil analisis
+breakdown_store = ResultStore()
+
+# Jika FORECAST_TASK_QUEUE diisi (folder shared filesystem), fitting dikirim ke worker
+# (`python task_queue.py <folder>`) alih-alih dijalankan di proses ini
+remote_fits = executor_from_env()
+
+# Checkpoint forecast per series, dengan key dari isi upload dan parameter analisis
+checkpoint_store = CheckpointStore(
+    os.path.join(RESULT_FOLDER, 'checkpoints'),
+    ttl_seconds=int(os.environ.get('FORECAST_CHECKPOINT_TTL', 24 * 3600))
+)
+
+# Format angka untuk tabel hasil
+TABLE_FORMATTERS = {
+    'November': lambda x: f"{x:,.0f}" if pd.notnull(x) else "0",
+    'Desember': lambda x: f"{x:,.0f}" if pd.notnull(x) else "0",
+    'Growth %': lambda x: f"{x:.2f}%" if pd.notnull(x) else "N/A",
+}
+
 @app.route('/')
 def index():
     return render_template('index.html')  # Menampilkan halaman upload
@@ -53,26 +100,49 @@ def adjust_growth_decimal(value):
 
 # --- 1. Fungsi Forecasting yang Telah Digabungkan ---
 
-def forecast_group(group_data, events, periods=31):
+def fit_group(group_data, events, periods=31, checkpoint=None):
     """
-    Melakukan forecasting menggunakan Prophet untuk data yang diberikan.
+    Melatih model Prophet untuk data yang diberikan.
     
     Parameters:
     - group_data: DataFrame dengan kolom 'ds' dan 'y'.
     - events: DataFrame events untuk Prophet.
     - periods: Jumlah hari ke depan untuk forecasting.
+    - checkpoint: SeriesCheckpoint opsional. Series yang sudah ada di
+      checkpoint tidak di-fit ulang; series baru disimpan setelah di-fit.
     
     Returns:
-    - DataFrame hasil forecast dengan kolom tambahan 'week'.
+    - DataFrame hasil `model.predict` untuk histori dan periode ke depan.
     """
-    # Inisialisasi dan melatih model Prophet
-    model = Prophet(holidays=events, changepoint_prior_scale=0.1)
-    model.fit(group_data)
+    # Lanjutkan dari checkpoint jika series ini sudah pernah selesai
+    if checkpoint is not None:
+        fingerprint = series_fingerprint(group_data)
+        saved = checkpoint.load(fingerprint)
+        if saved is not None:
+            return saved['forecast']
+
+    # Melatih model Prophet (di worker task queue jika tersedia)
+    if remote_fits is not None:
+        forecast, params = wait_result(remote_fits.submit(fit_prophet_group, group_data, events, periods))
+    else:
+        forecast, params = fit_prophet_group(group_data, events, periods)
+
+    # Simpan forecast dan parameter model yang sudah di-fit
+    if checkpoint is not None:
+        checkpoint.save(fingerprint, forecast, params)
+    return forecast
+
+def adjust_event_weeks(forecast, events):
+    """
+    Menyesuaikan forecast pada minggu yang memiliki event lalu mengambil bulan Desember.
     
-    # Membuat dataframe future
-    future = model.make_future_dataframe(periods=periods)
-    forecast = model.predict(future)
+    Parameters:
+    - forecast: DataFrame hasil `model.predict`.
+    - events: DataFrame events untuk Prophet.
     
+    Returns:
+    - DataFrame hasil forecast Desember dengan kolom tambahan 'week'.
+    """
     # Tambahkan kolom 'week' untuk identifikasi mingguan
     forecast['week'] = forecast['ds'].dt.isocalendar().week
     
@@ -108,13 +178,44 @@ def forecast_group(group_data, events, periods=31):
                         )
     
     # Filter data untuk bulan Desember
-    december_forecast = forecast[(forecast['ds'] >= f"{events['ds'].dt.year.unique()[0]}-12-01") & 
-                                 (forecast['ds'] <= f"{events['ds'].dt.year.unique()[0]}-12-31")]
+    # (events['ds'] bisa masih berupa string jika belum ada model Prophet yang di-fit)
+    event_year = pd.to_datetime(events['ds']).dt.year.unique()[0]
+    december_forecast = forecast[(forecast['ds'] >= f"{event_year}-12-01") & 
+                                 (forecast['ds'] <= f"{event_year}-12-31")]
     
     # Kembalikan dataframe forecast Desember
     return december_forecast
 
-def forecast_per_area_area2_destname(shipment_forecasting, events):
+def forecast_group(group_data, events, periods=31):
+    """
+    Melakukan forecasting menggunakan Prophet untuk data yang diberikan.
+    
+    Parameters:
+    - group_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - events: DataFrame events untuk Prophet.
+    - periods: Jumlah hari ke depan untuk forecasting.
+    
+    Returns:
+    - DataFrame hasil forecast dengan kolom tambahan 'week'.
+    """
+    return adjust_event_weeks(fit_group(group_data, events, periods), events)
+
+def forecast_unique_groups(series_by_key, events, periods=31, checkpoint=None):
+    """
+    Melakukan forecasting sekali per series unik (lihat `forecast_unique_series`).
+    
+    Returns:
+    - Dictionary key -> DataFrame hasil forecast Desember.
+    """
+    return forecast_unique_series(
+        series_by_key,
+        lambda group_data: fit_group(group_data, events, periods, checkpoint),
+        lambda forecast: adjust_event_weeks(forecast, events),
+        periods=periods,
+        max_workers=remote_fits.max_inflight if remote_fits is not None else 1
+    )
+
+def forecast_per_area_area2_destname(shipment_forecasting, events, checkpoint=None):
     """
     Melakukan forecasting per kombinasi AREA, AREA 2, dan Destname.
     
@@ -127,34 +228,27 @@ def forecast_per_area_area2_destname(shipment_forecasting, events):
     # Mendapatkan unique combinations
     combinations = shipment_forecasting_group[['AREA', 'AREA 2', 'Destname']].drop_duplicates()
     
-    december_forecasts = {}
+    # Group dan sum 'y' per tanggal untuk semua kombinasi sekaligus
+    group_daily = shipment_forecasting_group.groupby(['AREA', 'AREA 2', 'Destname', 'ds'])['y'].sum().reset_index()
+    group_series = {
+        key: group[['ds', 'y']].reset_index(drop=True)
+        for key, group in group_daily.groupby(['AREA', 'AREA 2', 'Destname'], sort=False)
+    }
+    group_series = {
+        key: group_series[key]
+        for key in combinations.itertuples(index=False, name=None) if key in group_series
+    }
     
-    for idx, row in combinations.iterrows():
-        area = row['AREA']
-        area2 = row['AREA 2']
-        destname = row['Destname']
-        
-        # Filter data per kombinasi
-        group_data = shipment_forecasting_group[
-            (shipment_forecasting_group['AREA'] == area) &
-            (shipment_forecasting_group['AREA 2'] == area2) &
-            (shipment_forecasting_group['Destname'] == destname)
-        ]
-        
-        # Group dan sum 'y' per tanggal
-        group_data = group_data.groupby('ds').agg({"y": "sum"}).reset_index()
-        
-        # Forecast
-        december_forecast = forecast_group(group_data, events)
+    # Forecast sekali per series unik
+    december_forecasts = forecast_unique_groups(group_series, events, checkpoint=checkpoint)
+    
+    for key, december_forecast in december_forecasts.items():
+        area, area2, destname = key
         
         # Tambahkan informasi grup
         december_forecast['AREA'] = area
         december_forecast['AREA 2'] = area2
         december_forecast['Destname'] = destname
-        
-        # Simpan ke dictionary
-        key = (area, area2, destname)
-        december_forecasts[key] = december_forecast
     
     # Gabungkan semua forecast
     forecast_data = pd.DataFrame()
@@ -167,7 +261,7 @@ def forecast_per_area_area2_destname(shipment_forecasting, events):
     
     return forecast_data
 
-def forecast_per_area(shipment_forecasting, events):
+def forecast_per_area(shipment_forecasting, events, checkpoint=None):
     """
     Melakukan forecasting per AREA dengan mengagregasi data dari AREA 2 dan Destname.
     
@@ -180,25 +274,22 @@ def forecast_per_area(shipment_forecasting, events):
     # Mendapatkan unique AREA
     areas = shipment_forecasting_area['AREA'].unique()
     
-    december_forecasts = {}
+    # Group dan sum 'y' per tanggal untuk semua AREA sekaligus
+    area_daily = shipment_forecasting_area.groupby(['AREA', 'ds'])['y'].sum().reset_index()
+    area_series = {
+        area: group[['ds', 'y']].reset_index(drop=True)
+        for area, group in area_daily.groupby('AREA', sort=False)
+    }
+    area_series = {area: area_series[area] for area in areas if area in area_series}
     
-    for area in areas:
-        # Filter data per AREA
-        area_data = shipment_forecasting_area[shipment_forecasting_area['AREA'] == area]
-        
-        # Group dan sum 'y' per tanggal
-        area_data = area_data.groupby('ds').agg({"y": "sum"}).reset_index()
-        
-        # Forecast
-        december_forecast = forecast_group(area_data, events)
-        
+    # Forecast sekali per series unik
+    december_forecasts = forecast_unique_groups(area_series, events, checkpoint=checkpoint)
+    
+    for area, december_forecast in december_forecasts.items():
         # Tambahkan informasi AREA
         december_forecast['AREA'] = area
         december_forecast['AREA 2'] = None
         december_forecast['Destname'] = None
-        
-        # Simpan ke dictionary
-        december_forecasts[area] = december_forecast
     
     # Gabungkan semua forecast
     forecast_data = pd.DataFrame()
@@ -244,6 +335,17 @@ def analyze():
         except (ValueError, KeyError):
             return "Invalid input for year or days", 400
 
+        # Checkpoint job: upload dan parameter yang sama memakai checkpoint yang sama, sehingga run yang
+        # terputus (proses mati atau redeploy) hanya mem-fit series yang belum selesai.
+        # /analyze di aplikasi inbound berjalan sinkron (tidak melalui JobQueue seperti app.py), jadi
+        # tidak ada job yang dilanjutkan otomatis: run dilanjutkan saat pengguna meng-upload ulang file
+        # yang identik dengan parameter yang sama (checkpoint disimpan selama FORECAST_CHECKPOINT_TTL)
+        checkpoint_store.purge_expired()
+        checkpoint = checkpoint_store.job(job_key(data, year, days_before_event, days_after_event))
+        resumed = checkpoint.completed()
+        if resumed:
+            app.logger.info("Resuming forecast from checkpoint: %d series already fitted", resumed)
+
         # --- 3.3. Preprocessing Data ---
         data['DATE'] = pd.to_datetime(data['DATE'])
         shipment_forecasting = data[data['DATE'] <= f'{year}-12-01']
@@ -259,28 +361,29 @@ def analyze():
 
         # --- 3.5. Forecasting per Group dan per AREA ---
         # Forecast per AREA, AREA 2, Destname
-        forecast_per_group = forecast_per_area_area2_destname(data, events)
+        forecast_per_group = forecast_per_area_area2_destname(data, events, checkpoint)
         
         # Forecast per AREA
-        forecast_per_area_df = forecast_per_area(data, events)
+        forecast_per_area_df = forecast_per_area(data, events, checkpoint)
+        
+        # --- 3.6. Membangun Cube Agregasi (Histori dan Forecast) ---
+        # Cube dibangun sekali, semua tabel, total, dan grafik membaca dari cube ini
+        cube = RollupCube(['AREA', 'AREA 2', 'Destname'])
+        cube.add('history', data, 'Cnote', date_col='DATE')
+        cube.add('forecast', forecast_per_group, 'Forecasted Shipments')
+        cube.add('area_forecast', forecast_per_area_df, 'Forecasted Shipments', depth=1)
         
-        # --- 3.6. Menggabungkan Hasil Forecasting ---
         # Forecast per Group
-        forecast_per_group_grouped = forecast_per_group.groupby(['AREA', 'AREA 2', 'Destname'])['Forecasted Shipments'].sum().reset_index()
+        forecast_per_group_grouped = cube.totals('forecast', level=3)
         
         # Forecast per AREA
-        forecast_per_area_grouped = forecast_per_area_df.groupby('AREA')['Forecasted Shipments'].sum().reset_index()
+        forecast_per_area_grouped = cube.totals('area_forecast', level=1)
         
         # --- 3.7. Mengambil Data November ---
-        november_data_group = data[
-            (data['DATE'] >= f"{year}-11-01") & 
-            (data['DATE'] <= f"{year}-11-30")
-        ].groupby(['AREA', 'AREA 2', 'Destname'])['Cnote'].sum().reset_index()
-        
-        november_data_area = data[
-            (data['DATE'] >= f"{year}-11-01") & 
-            (data['DATE'] <= f"{year}-11-30")
-        ].groupby(['AREA'])['Cnote'].sum().reset_index()
+        november_start = f"{year}-11-01"
+        november_end = f"{year}-11-30"
+        november_data_group = cube.totals('history', level=3, start=november_start, end=november_end)
+        november_data_area = cube.totals('history', level=1, start=november_start, end=november_end)
 
         # --- 3.8. Menggabungkan Data November dan Forecast Desember per Group ---
         result_df_group = pd.merge(november_data_group, forecast_per_group_grouped, on=['AREA', 'AREA 2', 'Destname'], how='left')
@@ -330,10 +433,12 @@ def analyze():
         )
         
         # --- 3.11. Format Angka Agar Lebih Rapi ---
-        # Format untuk Group
-        result_df_group['November'] = result_df_group['November'].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "0")
-        result_df_group['Desember'] = result_df_group['Desember'].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "0")
-        result_df_group['Growth %'] = result_df_group['Growth %'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "N/A")
+        # Tabel breakdown disimpan dalam bentuk numerik dan diformat per halaman oleh /breakdown
+        breakdown_id = breakdown_store.add(
+            ResultTable(result_df_group, key_columns=['AREA', 'AREA 2', 'Destname'], formatters=TABLE_FORMATTERS)
+        )
+        breakdown_areas = sorted(result_df_group['AREA'].dropna().astype(str).unique())
+        breakdown_areas2 = sorted(result_df_group['AREA 2'].dropna().astype(str).unique())
         
         # Format untuk AREA
         result_df_area['November'] = result_df_area['November'].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "0")
@@ -342,13 +447,13 @@ def analyze():
         
         # --- 3.12. Membuat Tabel HTML ---
         area_table = result_df_area.to_html(classes='table table-striped table-hover', index=False)
-        breakdown_table = result_df_group.to_html(classes='table table-striped table-hover', index=False)
         
         # --- 3.13. Membuat Visualisasi Line Graph Berdasarkan Tanggal dan AREA ---
         fig = go.Figure()
         
         # Data untuk All AREA
-        all_area_data = forecast_per_area_df.groupby('Date')['Forecasted Shipments'].sum().reset_index()
+        all_area_data = cube.series('area_forecast', level=0)
+        area_series = cube.series_by_key('area_forecast', level=1)
         fig.add_trace(go.Scatter(
             x=all_area_data['Date'],
             y=all_area_data['Forecasted Shipments'],
@@ -361,7 +466,7 @@ def analyze():
         for area in result_df_area['AREA']:
             if area == 'Total':
                 continue  # Skip total if exists
-            area_data = forecast_per_area_df[forecast_per_area_df['AREA'] == area].groupby('Date')['Forecasted Shipments'].sum().reset_index()
+            area_data = area_series.get(area, all_area_data.iloc[0:0])
             fig.add_trace(go.Scatter(
                 x=area_data['Date'],
                 y=area_data['Forecasted Shipments'],
@@ -403,15 +508,12 @@ def analyze():
             yaxis=dict(tickformat=',.0f')
         )
         
-        graph_html = fig.to_html(full_html=False)
+        graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
         
         # --- 3.14. Menambahkan Baris Total ---
         # Hitung total November dan Desember untuk AREA
-        total_november = data[
-            (data['DATE'] >= f"{year}-11-01") & 
-            (data['DATE'] <= f"{year}-11-30")
-        ]['Cnote'].sum()
-        total_desember = forecast_per_area_grouped['Forecasted Shipments'].sum()
+        total_november = cube.totals('history', level=0, start=november_start, end=november_end)
+        total_desember = cube.totals('area_forecast', level=0)
         
         # Hitung Growth % untuk total
         if total_november != 0:
@@ -439,10 +541,14 @@ def analyze():
         area_table = result_df_area.to_html(classes='table table-striped table-hover', index=False)
         
         # --- 3.15. Render Template dengan Hasil ---
+        # Analisis selesai: checkpoint tidak diperlukan lagi
+        checkpoint.clear()
         return render_template(
             'resultin.html',
             area_table=area_table,
-            breakdown_table=breakdown_table,
+            breakdown_id=breakdown_id,
+            breakdown_areas=breakdown_areas,
+            breakdown_areas2=breakdown_areas2,
             graph_html=graph_html
         )
     
@@ -451,6 +557,36 @@ def analyze():
 
 
 
+@app.route('/breakdown/<breakdown_id>')
+def breakdown_rows(breakdown_id):
+    # Ambil tabel breakdown dari result store; hanya `max_results` analisis terakhir yang disimpan
+    # (dan hilang saat server restart), jadi ID yang tidak ditemukan berarti analisisnya kedaluwarsa
+    table = breakdown_store.get(breakdown_id)
+    if table is None:
+        return jsonify({'error': 'Analysis expired. Please run the analysis again.', 'expired': True}), 410
+
+    # Ambil parameter paginasi, sorting, dan filter
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 50)), 500)
+    except ValueError:
+        return jsonify({'error': 'Invalid page or per_page'}), 400
+
+    filters = {
+        'AREA': request.args.get('area'),
+        'AREA 2': request.args.get('area2'),
+    }
+
+    return jsonify(table.query(
+        page=page,
+        per_page=per_page,
+        sort=request.args.get('sort'),
+        ascending=request.args.get('order', 'asc') != 'desc',
+        filters=filters,
+        search=request.args.get('q')
+    ))
+
+
 @app.route('/update-growth', methods=['POST'])
 def update_growth():
     global result_df, base_forecast_df, forecast_data  # Akses base_forecast_df dan forecast_data
@@ -556,7 +692,7 @@ def update_growth():
         )
 
         # Konversi grafik ke HTML
-        graph_html = fig.to_html(full_html=False)
+        graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
 
         # Kirim data tabel dan grafik ke frontend
         updated_table = result_df.to_html(classes='table table-striped', index=False)
@@ -717,7 +853,7 @@ def compare_forecast_actual():
     )
 
     # Konversi grafik ke HTML
-    graph_html = fig.to_html(full_html=False)
+    graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
 
     # Kirim data tabel dan grafik ke frontend
     updated_table = result_df.to_html(classes='table table-striped', index=False)
@@ -0,0 +1,200 @@
+# Library untuk membuat ID job
+import uuid
+
+# Library untuk thread pool dan sinkronisasi
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Library untuk mencatat waktu job
+import time
+
+# Library untuk menyimpan job dengan urutan waktu masuk
+from collections import OrderedDict
+
+# Token pembatalan job
+from cancellation import CancelToken, JobCancelled
+
+
+# Status job
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Job:
+    """
+    Satu job analisis yang dijalankan di background.
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        # Index event pertama yang masih disimpan di `events` (event sebelumnya sudah dibuang)
+        self.events_offset = 0
+        self.cancel_token = CancelToken()
+        self._events_changed = threading.Condition()
+
+    def publish(self, event, data):
+        """
+        Menambahkan event progress (misalnya 'progress' atau 'series') ke job.
+        """
+        with self._events_changed:
+            self.events.append((event, data))
+            self._events_changed.notify_all()
+
+    def release_events(self):
+        """
+        Membuang event yang sudah tersimpan kecuali event terakhir (status akhir job).
+        Index event tidak berubah, sehingga klien yang reconnect tetap menerima status akhir.
+        """
+        with self._events_changed:
+            if len(self.events) > 1:
+                self.events_offset += len(self.events) - 1
+                self.events = self.events[-1:]
+
+    def iter_events(self, start=0, keepalive=15):
+        """
+        Mengiterasi event job mulai dari index `start` sampai job selesai.
+
+        Menghasilkan tuple (index, event, data). Jika tidak ada event baru
+        selama `keepalive` detik, menghasilkan (None, None, None) agar koneksi
+        streaming tetap hidup. Event yang sudah dibuang (`release_events`) dilewati.
+        """
+        index = start
+        while True:
+            with self._events_changed:
+                index = max(index, self.events_offset)
+                if index >= self.events_offset + len(self.events) and self.finished_at is None:
+                    self._events_changed.wait(timeout=keepalive)
+                    index = max(index, self.events_offset)
+                pending = self.events[index - self.events_offset:]
+                finished = self.finished_at is not None
+
+            if not pending and not finished:
+                yield None, None, None
+            for event, data in pending:
+                yield index, event, data
+                index += 1
+            if finished and not pending:
+                return
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Antrian job lokal: job dijalankan oleh thread pool sehingga request HTTP
+    bisa langsung mengembalikan job ID. Fitting Prophet berjalan di proses
+    cmdstan terpisah, jadi thread tidak saling menahan GIL terlalu lama.
+
+    Fungsi job dipanggil dengan keyword tambahan `progress(event, data)`
+    untuk mengirim progress yang bisa di-stream ke browser, dan
+    `cancel_token` (CancelToken) yang ditandai saat job dibatalkan.
+
+    Hanya `max_jobs` job terakhir yang disimpan; job selesai yang paling lama
+    dibuang lebih dulu.
+    """
+
+    def __init__(self, max_workers=2, max_jobs=50):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, job_id=None, **kwargs):
+        """
+        Memasukkan job ke antrian.
+
+        Parameters:
+        - fn: Fungsi job, dipanggil dengan `*args`, `**kwargs`, `progress`, dan `cancel_token`.
+        - job_id: ID job (opsional, default: ID acak).
+
+        Returns:
+        - ID job.
+        """
+        job = Job(job_id or uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Membatalkan job yang masih menunggu atau berjalan.
+
+        Job yang masih di antrian langsung berstatus 'cancelled' dan tidak akan
+        dijalankan; job yang berjalan berhenti menjadwalkan fitting baru dan
+        proses cmdstan-nya dihentikan. Setelah job berhenti, event progress yang
+        tersimpan dibuang (hanya event 'cancelled' yang disimpan).
+
+        Returns:
+        - Job yang dibatalkan, atau None jika job tidak ditemukan.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job._events_changed:
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.publish(CANCELLED, {'job_id': job.id})
+                job.finished_at = time.time()
+        if job.status in (RUNNING, CANCELLED):
+            job.cancel_token.cancel()
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        # Fungsi job menerima keyword `progress` untuk melaporkan progress
+        # dan `cancel_token` untuk berhenti saat job dibatalkan
+        with job._events_changed:
+            if job.status != QUEUED:
+                # Job sudah dibatalkan selagi menunggu di antrian
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.publish, cancel_token=job.cancel_token, **kwargs)
+            job.status = DONE
+            job.publish(DONE, {'job_id': job.id})
+        except Exception as e:
+            if isinstance(e, JobCancelled) or job.cancel_token.is_cancelled():
+                # Error dari proses cmdstan yang dihentikan juga dianggap pembatalan
+                job.status = CANCELLED
+                job.publish(CANCELLED, {'job_id': job.id})
+                # Progress dan hasil sementara job yang dibatalkan tidak diperlukan lagi
+                job.result = None
+                job.release_events()
+            else:
+                job.error = str(e)
+                job.status = FAILED
+                job.publish(FAILED, {'job_id': job.id, 'error': job.error})
+        finally:
+            with job._events_changed:
+                job.finished_at = time.time()
+                job._events_changed.notify_all()
+
+    def _evict(self):
+        # Buang job selesai yang paling lama jika melebihi batas
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (DONE, FAILED, CANCELLED)]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
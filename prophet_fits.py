@@ -0,0 +1,59 @@
+# Library yang mengunggah model Prophet untuk melakukan forecasting
+from prophet import Prophet
+
+# Forecasting pada resolusi mingguan dengan disagregasi harian
+from weekly_forecast import forecast_weekly
+
+
+# Fungsi-fungsi fitting per series yang bisa dijalankan di proses lain (worker
+# task queue). Fungsi harus berada di level modul (bukan di dalam fungsi lain)
+# agar bisa dikirim ke worker dengan pickle.
+
+
+# Fungsi untuk melatih Prophet pada satu series Origin City (app.py)
+def fit_origin_city(city_data, events, resolution='daily', periods=31):
+    """
+    Melatih model pada satu series Origin City.
+
+    Parameters:
+    - city_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - events: DataFrame events untuk Prophet.
+    - resolution: 'daily' (Prophet harian) atau 'weekly' (fit mingguan lalu dibagi ke harian).
+    - periods: Jumlah hari ke depan untuk forecasting.
+
+    Returns:
+    - DataFrame hasil `model.predict` untuk histori dan periode ke depan.
+    """
+    # Mode mingguan: fit pada total mingguan lalu dibagi ke harian
+    if resolution == 'weekly':
+        return forecast_weekly(city_data, events, periods=periods)
+
+    # Inisialisasi Prophet
+    model = Prophet(holidays=events, changepoint_prior_scale=0.1)
+    model.fit(city_data)
+
+    # Forecast Desember
+    future = model.make_future_dataframe(periods=periods)
+    return model.predict(future)
+
+
+# Fungsi untuk melatih Prophet pada satu series AREA/AREA 2/Destname (inbound_shipment.py)
+def fit_prophet_group(group_data, events, periods=31):
+    """
+    Melatih model Prophet untuk data yang diberikan.
+
+    Parameters:
+    - group_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - events: DataFrame events untuk Prophet.
+    - periods: Jumlah hari ke depan untuk forecasting.
+
+    Returns:
+    - Tuple (DataFrame hasil `model.predict`, dictionary parameter model hasil fitting).
+    """
+    # Inisialisasi dan melatih model Prophet
+    model = Prophet(holidays=events, changepoint_prior_scale=0.1)
+    model.fit(group_data)
+
+    # Membuat dataframe future
+    future = model.make_future_dataframe(periods=periods)
+    return model.predict(future), model.params
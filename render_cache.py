@@ -0,0 +1,48 @@
+# Library untuk sinkronisasi antar thread dan cache LRU
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """
+    Cache fragmen hasil render (tabel HTML dan grafik), LRU per proses.
+
+    Key cache terdiri dari ID analisis, versi store array, view
+    (misalnya 'table' atau 'forecast_chart') dan skenario growth. Saat
+    forecast analisis ditulis ulang (misalnya hasil preview diganti hasil
+    akhir), versinya naik sehingga fragmen lama tidak pernah dipakai lagi
+    dan akhirnya tergeser keluar dari cache.
+    """
+
+    def __init__(self, max_entries=100):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(analysis_id, arrays, view, growth=None, *extra):
+        return (analysis_id, arrays.version, view, growth) + extra
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+        return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        """
+        Mengembalikan fragmen dari cache, atau memanggil `render()` lalu menyimpannya.
+        """
+        fragment = self.get(key)
+        if fragment is None:
+            fragment = render()
+            self.put(key, fragment)
+        return fragment
@@ -0,0 +1,258 @@
+# Library untuk membuat ID hasil analisis
+import uuid
+
+# Library untuk menyimpan hasil analisis ke file dan mengatur masa hidupnya
+import os
+import pickle
+import threading
+import time
+
+# Library untuk menyimpan hasil dengan urutan waktu masuk
+from collections import OrderedDict
+
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+
+class ResultTable:
+    """
+    Tabel hasil forecast (numerik) dengan index untuk sorting dan filtering.
+
+    Index sort per kolom dan index posisi per nilai kolom kategori dibuat
+    sekali saat pertama kali dibutuhkan, sehingga query berikutnya hanya
+    memotong array posisi tanpa men-scan ulang seluruh DataFrame.
+    """
+
+    def __init__(self, df, key_columns, formatters=None):
+        self.df = df.reset_index(drop=True)
+        self.key_columns = list(key_columns)
+        self.formatters = formatters or {}
+        self._sort_index = {}
+        self._value_index = {}
+
+    def sorted_positions(self, column, ascending=True):
+        # Index sort per kolom dan arah sorting (stabil, NaN di akhir)
+        key = (column, ascending)
+        if key not in self._sort_index:
+            values = self.df[column]
+            if values.dtype == object:
+                values = values.where(values.isna(), values.astype(str).str.lower())
+            self._sort_index[key] = values.sort_values(
+                ascending=ascending, kind='stable', na_position='last'
+            ).index.to_numpy()
+        return self._sort_index[key]
+
+    def value_positions(self, column, value):
+        # Index posisi baris untuk setiap nilai kolom kategori
+        if column not in self._value_index:
+            self._value_index[column] = {
+                str(key): np.asarray(positions)
+                for key, positions in self.df.groupby(column, sort=False).indices.items()
+            }
+        return self._value_index[column].get(str(value), np.array([], dtype=np.intp))
+
+    def query(self, page=1, per_page=50, sort=None, ascending=True, filters=None, search=None):
+        """
+        Mengambil satu halaman baris hasil.
+
+        Parameters:
+        - page: Nomor halaman (mulai dari 1).
+        - per_page: Jumlah baris per halaman.
+        - sort: Nama kolom untuk sorting (None = urutan asli).
+        - ascending: Urutan sorting.
+        - filters: Dictionary kolom -> nilai untuk filter kesamaan.
+        - search: Teks yang dicari (case-insensitive) pada kolom key.
+
+        Returns:
+        - Dictionary berisi 'columns', 'rows', 'total', 'page', dan 'per_page'.
+        """
+        mask = None
+
+        # Filter kesamaan menggunakan index posisi
+        for column, value in (filters or {}).items():
+            if column not in self.df.columns or value in (None, ''):
+                continue
+            column_mask = np.zeros(len(self.df), dtype=bool)
+            column_mask[self.value_positions(column, value)] = True
+            mask = column_mask if mask is None else mask & column_mask
+
+        # Pencarian teks pada kolom key
+        if search:
+            search_mask = np.zeros(len(self.df), dtype=bool)
+            for column in self.key_columns:
+                search_mask |= self.df[column].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+            mask = search_mask if mask is None else mask & search_mask
+
+        # Urutan baris berdasarkan index sort
+        if sort in self.df.columns:
+            positions = self.sorted_positions(sort, ascending)
+        else:
+            positions = np.arange(len(self.df))
+
+        if mask is not None:
+            positions = positions[mask[positions]]
+
+        total = len(positions)
+        per_page = max(1, int(per_page))
+        page = max(1, int(page))
+        page_positions = positions[(page - 1) * per_page:page * per_page]
+
+        rows = self.df.iloc[page_positions]
+        formatted = rows.copy()
+        for column, formatter in self.formatters.items():
+            if column in formatted.columns:
+                formatted[column] = formatted[column].apply(formatter)
+
+        return {
+            'columns': list(self.df.columns),
+            'rows': formatted.astype(object).where(pd.notnull(formatted), None).values.tolist(),
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+        }
+
+
+class ResultStore:
+    """
+    Penyimpanan hasil analisis di memori, dengan batas jumlah hasil yang disimpan.
+    Aman dipakai dari beberapa thread request sekaligus.
+    """
+
+    def __init__(self, max_results=20):
+        self.max_results = max_results
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, table):
+        # Simpan tabel dan buang hasil paling lama jika melebihi batas
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._tables[result_id] = table
+            while len(self._tables) > self.max_results:
+                self._tables.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        """
+        Mengambil tabel hasil, atau None jika sudah dibuang (kedaluwarsa).
+        """
+        with self._lock:
+            return self._tables.get(result_id)
+
+
+class AnalysisStore:
+    """
+    Penyimpanan hasil analisis per job/sesi, menggantikan variabel global.
+
+    Setiap hasil disimpan dengan key (ID analisis) ke file pickle di `folder`
+    sehingga worker proses lain (misalnya di bawah server WSGI multi-proses)
+    bisa membaca hasil yang sama. Salinan di memori dipakai sebagai cache.
+
+    Masa hidup hasil diatur oleh `ttl_seconds` sejak terakhir diakses; hasil
+    yang kedaluwarsa dihapus saat `purge_expired` dipanggil. Penulisan file
+    bersifat atomik (tulis ke file sementara lalu `os.replace`), dan lock
+    dibuat per key sehingga analisis yang berbeda tidak saling menunggu.
+    Cache di memori dijaga lock tersendiri (hanya selama operasi cache,
+    bukan selama membaca file).
+    """
+
+    def __init__(self, folder, ttl_seconds=6 * 3600, max_cached=20):
+        self.folder = folder
+        self.ttl_seconds = ttl_seconds
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, analysis_id):
+        # ID hanya boleh berisi karakter hex agar tidak bisa keluar dari folder
+        if not analysis_id or not all(c in '0123456789abcdef' for c in analysis_id):
+            raise KeyError(analysis_id)
+        return os.path.join(self.folder, f"{analysis_id}.pkl")
+
+    def lock(self, analysis_id):
+        """
+        Lock untuk satu analisis (dipakai saat membaca-mengubah-menyimpan).
+        """
+        with self._locks_guard:
+            return self._locks.setdefault(analysis_id, threading.RLock())
+
+    def put(self, analysis_id, analysis):
+        path = self._path(analysis_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(analysis, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._remember(analysis_id, analysis, os.stat(path).st_mtime_ns)
+
+    def get(self, analysis_id):
+        """
+        Mengambil hasil analisis, atau None jika tidak ada / sudah kedaluwarsa.
+        """
+        try:
+            path = self._path(analysis_id)
+            stat = os.stat(path)
+        except (KeyError, OSError):
+            with self._cache_lock:
+                self._cache.pop(analysis_id, None)
+            return None
+
+        if self._expired(stat):
+            self.delete(analysis_id)
+            return None
+
+        # Perpanjang masa hidup (atime) tanpa mengubah versi hasil (mtime)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+        with self._cache_lock:
+            cached = self._cache.get(analysis_id)
+            if cached is not None and cached[0] == stat.st_mtime_ns:
+                self._cache.move_to_end(analysis_id)
+                return cached[1]
+
+        # File diubah oleh worker lain (atau belum ada di cache): baca ulang
+        with open(path, 'rb') as f:
+            analysis = pickle.load(f)
+        self._remember(analysis_id, analysis, stat.st_mtime_ns)
+        return analysis
+
+    def delete(self, analysis_id):
+        with self._cache_lock:
+            self._cache.pop(analysis_id, None)
+        with self._locks_guard:
+            self._locks.pop(analysis_id, None)
+        try:
+            os.remove(self._path(analysis_id))
+        except (KeyError, OSError):
+            pass
+
+    def purge_expired(self):
+        # Hapus semua hasil yang sudah melewati masa hidupnya
+        for name in os.listdir(self.folder):
+            if not name.endswith('.pkl'):
+                continue
+            try:
+                if self._expired(os.stat(os.path.join(self.folder, name))):
+                    self.delete(name[:-len('.pkl')])
+            except OSError:
+                pass
+
+    def _expired(self, stat):
+        # Masa hidup dihitung dari akses atau penulisan terakhir
+        return time.time() - max(stat.st_atime, stat.st_mtime) > self.ttl_seconds
+
+    def _remember(self, analysis_id, analysis, version):
+        with self._cache_lock:
+            # Jangan timpa versi yang lebih baru yang sudah disimpan thread lain
+            cached = self._cache.get(analysis_id)
+            if cached is not None and cached[0] > version:
+                return
+            self._cache[analysis_id] = (version, analysis)
+            self._cache.move_to_end(analysis_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
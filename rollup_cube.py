@@ -0,0 +1,114 @@
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+
+class RollupCube:
+    """
+    Cube agregasi harian untuk setiap level hierarki grouping.
+
+    Level 0 adalah total seluruh data per tanggal, level 1 adalah per dimensi
+    pertama per tanggal, dan seterusnya sampai level terdalam (misalnya
+    tanggal x AREA x AREA 2 x Destname, atau tanggal x Origin City).
+
+    Cube dibangun sekali per analisis. Setiap level diagregasi dari level yang
+    lebih detail, sehingga data mentah hanya di-scan satu kali per source.
+    Semua tabel, baris total, dan grafik membaca dari cube ini.
+    """
+
+    def __init__(self, dims, date_col='Date'):
+        self.dims = list(dims)
+        self.date_col = date_col
+        self._levels = {}
+        self._value_cols = {}
+        self._cache = {}
+
+    def add(self, source, frame, value_col, date_col=None, depth=None):
+        """
+        Menambahkan satu source (misalnya 'history' atau 'forecast') ke cube.
+
+        Parameters:
+        - source: Nama source.
+        - frame: DataFrame mentah dengan kolom tanggal, dimensi, dan nilai.
+        - value_col: Nama kolom nilai yang dijumlahkan.
+        - date_col: Nama kolom tanggal di frame (default: date_col cube).
+        - depth: Jumlah dimensi yang tersedia di frame (default: semua dimensi).
+        """
+        date_col = date_col or self.date_col
+        depth = len(self.dims) if depth is None else depth
+
+        frame = frame.rename(columns={date_col: self.date_col})
+        # dropna=False: baris dengan dimensi kosong (misalnya AREA 2 atau Destname NaN)
+        # tetap ikut dijumlahkan ke level yang lebih kasar
+        level_data = frame.groupby(self.dims[:depth] + [self.date_col], dropna=False)[value_col].sum().reset_index()
+
+        # Agregasi dari level paling detail ke level total
+        for level in range(depth, -1, -1):
+            if level < depth:
+                level_data = level_data.groupby(self.dims[:level] + [self.date_col], dropna=False)[value_col] \
+                                       .sum().reset_index()
+            # Pada level ini, hanya baris dengan dimensi level ini kosong yang tidak ditampilkan
+            # (sama seperti groupby langsung per dimensi tersebut)
+            self._levels[(source, level)] = level_data.dropna(subset=self.dims[:level] + [self.date_col]) \
+                                                      .reset_index(drop=True)
+
+        self._value_cols[source] = value_col
+
+        # Hapus cache lama untuk source ini
+        self._cache = {key: value for key, value in self._cache.items() if key[1] != source}
+        return self
+
+    def value_col(self, source):
+        return self._value_cols[source]
+
+    def series(self, source, level=0):
+        """
+        Mengambil series harian pada level tertentu.
+
+        Returns:
+        - DataFrame dengan kolom dims[:level], tanggal, dan kolom nilai.
+        """
+        return self._levels[(source, level)]
+
+    def series_by_key(self, source, level=1):
+        """
+        Mengambil series harian per key pada level tertentu dengan satu kali groupby.
+
+        Returns:
+        - Dictionary key -> DataFrame series harian.
+        """
+        cache_key = ('series_by_key', source, level)
+        if cache_key not in self._cache:
+            keys = self.dims[:level]
+            self._cache[cache_key] = {
+                key: group.reset_index(drop=True)
+                for key, group in self.series(source, level).groupby(keys[0] if level == 1 else keys, sort=False)
+            }
+        return self._cache[cache_key]
+
+    def totals(self, source, level=0, start=None, end=None):
+        """
+        Menjumlahkan nilai dalam rentang tanggal (inklusif) pada level tertentu.
+
+        Returns:
+        - Angka total untuk level 0, atau DataFrame dims[:level] + kolom nilai.
+        """
+        cache_key = ('totals', source, level, start, end)
+        if cache_key not in self._cache:
+            level_data = self.series(source, level)
+            value_col = self.value_col(source)
+
+            mask = pd.Series(True, index=level_data.index)
+            if start is not None:
+                mask &= level_data[self.date_col] >= pd.to_datetime(start)
+            if end is not None:
+                mask &= level_data[self.date_col] <= pd.to_datetime(end)
+            period_data = level_data[mask]
+
+            if level == 0:
+                result = period_data[value_col].sum()
+            else:
+                result = period_data.groupby(self.dims[:level])[value_col].sum().reset_index()
+            self._cache[cache_key] = result
+
+        result = self._cache[cache_key]
+        return result.copy() if isinstance(result, pd.DataFrame) else result
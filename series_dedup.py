@@ -0,0 +1,138 @@
+# Library untuk membuat hash dari isi series
+import hashlib
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+# Library untuk menjalankan fitting secara paralel
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# Fungsi untuk membuat sidik jari (hash) dari sebuah series hasil agregasi
+def series_fingerprint(series_data):
+    """
+    Membuat hash dari kolom 'ds' dan 'y' sebuah series.
+
+    Dua series yang identik byte per byte setelah agregasi (misalnya hub yang
+    di-mirror atau Destname yang ditulis ganda) akan menghasilkan hash yang sama.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+
+    Returns:
+    - String hex hash dari series.
+    """
+    hashed = pd.util.hash_pandas_object(series_data[['ds', 'y']], index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()
+
+
+# Fungsi untuk mengecek apakah series bernilai nol semua atau konstan
+def is_flat_series(series_data):
+    """
+    Mengecek apakah nilai 'y' seluruhnya nol atau konstan pada window training.
+
+    Returns:
+    - True jika series tidak perlu di-fit dengan Prophet.
+    """
+    return series_data['y'].nunique(dropna=True) <= 1
+
+
+# Fungsi untuk membuat forecast konstan tanpa fitting Prophet
+def flat_forecast(series_data, periods=31):
+    """
+    Membuat DataFrame forecast dengan bentuk yang sama seperti output
+    `model.predict(model.make_future_dataframe(periods))`, tetapi berisi nilai
+    konstan dari series (0 untuk series yang nol semua).
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - periods: Jumlah hari ke depan untuk forecasting.
+
+    Returns:
+    - DataFrame dengan kolom 'ds', 'trend', 'yhat_lower', 'yhat_upper', dan 'yhat'.
+    """
+    history_dates = pd.to_datetime(series_data['ds']).drop_duplicates().sort_values()
+    future_dates = pd.date_range(history_dates.max() + pd.Timedelta(days=1), periods=periods, freq='D')
+    dates = pd.concat([history_dates, pd.Series(future_dates)], ignore_index=True)
+
+    value = series_data['y'].dropna()
+    value = float(value.iloc[0]) if not value.empty else 0.0
+
+    return pd.DataFrame({
+        'ds': dates,
+        'trend': value,
+        'yhat_lower': value,
+        'yhat_upper': value,
+        'yhat': value,
+    })
+
+
+# Fungsi untuk melakukan forecasting hanya sekali per series yang unik
+def forecast_unique_series(series_by_key, fit_fn, finalize_fn=None, periods=31, on_complete=None, max_workers=1):
+    """
+    Melakukan forecasting satu kali untuk setiap series unik, lalu menyalin
+    hasilnya ke semua key yang memiliki series yang sama.
+
+    Series yang nol semua atau konstan tidak di-fit sama sekali dan langsung
+    menggunakan `flat_forecast`.
+
+    Parameters:
+    - series_by_key: Dictionary key -> DataFrame dengan kolom 'ds' dan 'y'.
+    - fit_fn: Fungsi yang menerima DataFrame series dan mengembalikan hasil
+      `model.predict(...)` Prophet.
+    - finalize_fn: Fungsi opsional untuk memproses hasil forecast (misalnya
+      penyesuaian event dan filter Desember), dijalankan sekali per series unik.
+    - periods: Jumlah hari ke depan untuk forecasting.
+    - on_complete: Fungsi opsional `on_complete(keys, forecast)` yang dipanggil
+      setiap kali satu series unik selesai (untuk laporan progress).
+    - max_workers: Jumlah `fit_fn` yang boleh berjalan paralel (thread).
+      `finalize_fn` dan `on_complete` tetap dijalankan di thread pemanggil.
+
+    Returns:
+    - Dictionary key -> DataFrame hasil forecast (salinan untuk setiap key).
+    """
+    # Kelompokkan key berdasarkan hash series
+    keys_by_fingerprint = {}
+    for key, series_data in series_by_key.items():
+        fingerprint = series_fingerprint(series_data)
+        keys_by_fingerprint.setdefault(fingerprint, []).append(key)
+
+    forecasts = {}
+
+    def finish(keys, forecast):
+        if finalize_fn is not None:
+            forecast = finalize_fn(forecast)
+
+        # Salin hasil forecast ke setiap key yang memiliki series yang sama
+        for key in keys:
+            forecasts[key] = forecast.copy()
+
+        if on_complete is not None:
+            on_complete(keys, forecast)
+
+    # Series nol/konstan tidak perlu di-fit
+    to_fit = []
+    for keys in keys_by_fingerprint.values():
+        series_data = series_by_key[keys[0]]
+        if is_flat_series(series_data):
+            finish(keys, flat_forecast(series_data, periods=periods))
+        else:
+            to_fit.append(keys)
+
+    if max_workers <= 1 or len(to_fit) <= 1:
+        for keys in to_fit:
+            finish(keys, fit_fn(series_by_key[keys[0]]))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fit)), thread_name_prefix='forecast-fit') as executor:
+            futures = {executor.submit(fit_fn, series_by_key[keys[0]]): keys for keys in to_fit}
+            try:
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+            except BaseException:
+                # Satu fitting gagal (atau job dibatalkan): jangan mulai fitting yang belum berjalan
+                for future in futures:
+                    future.cancel()
+                raise
+
+    # Kembalikan dengan urutan key yang sama seperti input
+    return {key: forecasts[key] for key in series_by_key}
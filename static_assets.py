@@ -0,0 +1,121 @@
+"""
+Asset UI (Plotly.js, jQuery, Bootstrap) yang disajikan langsung oleh aplikasi.
+
+File di static/vendor/ disajikan dengan nama ber-fingerprint (hash isi file),
+misalnya /assets/plotly.min.3f9c2a1b7d.js, dengan header cache satu tahun
+(immutable). Isi file berubah = nama berubah, sehingga browser tidak pernah
+memakai versi lama. Template memanggil `asset_url('plotly.min.js')`.
+
+Semua asset disimpan di repo. Jika ada file vendor yang hilang, aplikasi
+gagal start (RuntimeError) kecuali cadangan CDN diaktifkan secara eksplisit
+dengan FORECAST_ASSET_CDN_FALLBACK=1; `asset_url` lalu memakai URL CDN
+asalnya untuk asset tersebut. Untuk memperbarui asset, jalankan dari mesin
+yang terhubung ke internet lalu commit folder static/vendor/:
+    python static_assets.py fetch
+"""
+# Library untuk menangani file asset dan fingerprint
+import os
+import hashlib
+import logging
+
+# Library untuk menyajikan file asset
+from flask import abort, send_from_directory, url_for
+
+VENDOR_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'vendor')
+
+# Masa cache asset ber-fingerprint (satu tahun)
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Sumber asli setiap asset (dipakai oleh `fetch` dan sebagai cadangan jika file vendor belum ada)
+ASSET_SOURCES = {
+    'bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',
+    'jquery.min.js': 'https://ajax.googleapis.com/ajax/libs/jquery/3.6.1/jquery.min.js',
+    'plotly.min.js': 'https://cdn.plot.ly/plotly-4.1.1.min.js',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class AssetManifest:
+    """
+    Daftar asset di `folder` beserta nama ber-fingerprint-nya (dibuat sekali saat start).
+    """
+
+    def __init__(self, folder=VENDOR_FOLDER):
+        self.folder = folder
+        self.urls = {}
+        self.files = {}
+        if not os.path.isdir(folder):
+            return
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path) or name.startswith('.'):
+                continue
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:10]
+            stem, ext = os.path.splitext(name)
+            fingerprinted = f"{stem}.{digest}{ext}"
+            self.urls[name] = fingerprinted
+            self.files[fingerprinted] = name
+
+
+# Fungsi untuk mendaftarkan route asset dan fungsi template `asset_url` ke aplikasi Flask
+def init_app(app, manifest=None, cdn_fallback=None):
+    """
+    Parameters:
+    - manifest: AssetManifest (default: folder static/vendor/).
+    - cdn_fallback: Izinkan URL CDN untuk asset yang tidak ada di folder vendor
+      (default: env FORECAST_ASSET_CDN_FALLBACK=1).
+
+    Returns:
+    - AssetManifest yang dipakai.
+    """
+    manifest = manifest or AssetManifest()
+    if cdn_fallback is None:
+        cdn_fallback = os.environ.get('FORECAST_ASSET_CDN_FALLBACK') == '1'
+    missing = [name for name in ASSET_SOURCES if name not in manifest.urls]
+    if missing and not cdn_fallback:
+        raise RuntimeError(f"Missing UI assets in {manifest.folder}: {', '.join(missing)}. "
+                           "Run `python static_assets.py fetch` or set FORECAST_ASSET_CDN_FALLBACK=1.")
+    for name in missing:
+        logger.warning("Asset %s not found in %s; falling back to %s", name, manifest.folder, ASSET_SOURCES[name])
+
+    def asset_url(name):
+        if name in manifest.urls:
+            return url_for('vendor_asset', filename=manifest.urls[name])
+        return ASSET_SOURCES[name]
+
+    def vendor_asset(filename):
+        # Hanya nama ber-fingerprint yang valid; isi file tidak berubah selama nama sama
+        if filename not in manifest.files:
+            abort(404)
+        response = send_from_directory(manifest.folder, manifest.files[filename], max_age=ASSET_MAX_AGE)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.add_url_rule('/assets/<filename>', 'vendor_asset', vendor_asset)
+    app.add_template_global(asset_url, 'asset_url')
+    return manifest
+
+
+# Fungsi untuk mengunduh semua asset ke folder vendor (dijalankan dari mesin yang terhubung ke internet)
+def fetch_assets(folder=VENDOR_FOLDER):
+    from urllib.request import urlopen
+
+    os.makedirs(folder, exist_ok=True)
+    for name, url in ASSET_SOURCES.items():
+        with urlopen(url) as response:
+            content = response.read()
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(content)
+        print(f"{name}: {len(content):,} bytes from {url}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kelola asset UI yang disajikan aplikasi")
+    parser.add_argument('command', choices=['fetch'], help='fetch: unduh semua asset ke static/vendor/')
+    args = parser.parse_args()
+    fetch_assets()
@@ -0,0 +1,396 @@
+"""
+Task queue sederhana berbasis shared filesystem untuk fitting terdistribusi.
+
+Coordinator (app.py / inbound_shipment.py) menulis task ke folder antrian;
+worker di mesin mana pun yang me-mount folder yang sama mengambil task,
+menjalankan fitting, lalu menulis hasilnya kembali. Struktur folder:
+
+- pending/<task_id>-<attempt>.task : task yang menunggu worker.
+- running/<task_id>-<attempt>.task : task yang sedang dikerjakan (mtime = heartbeat).
+- done/<task_id>-<attempt>.result  : hasil (atau error) dari worker.
+- cancelled/<task_id>              : penanda pembatalan untuk task yang sudah diambil worker.
+- tmp/                             : file sementara sebelum `os.replace` (atomik).
+
+Worker mengambil task dengan `os.rename` dari pending/ ke running/ (atomik,
+hanya satu worker yang berhasil). Task yang heartbeat-nya berhenti lebih lama
+dari `lease_seconds` (worker mati) atau yang gagal dikirim ulang sampai
+`max_attempts` kali. Hasil pertama untuk satu task yang dipakai; hasil duplikat
+dari percobaan lain dibuang.
+
+Task yang dibatalkan coordinator (Future dibatalkan, misalnya job dibatalkan)
+dihapus dari pending/; jika sudah diambil worker, coordinator menulis penanda
+di cancelled/. Worker memeriksa penanda tersebut sebelum dan selama task
+berjalan, menghentikan proses cmdstan-nya, dan tidak menulis hasil. Penanda
+dihapus saat task selesai di worker; jika worker mati, coordinator menghapus
+penanda dan file running/ task tersebut setelah lease-nya habis.
+
+Menjalankan worker lokal (misalnya 4 proses sebagai pengganti node):
+    python task_queue.py /shared/forecast-queue --processes 4
+"""
+# Library untuk menangani file dan folder antrian
+import os
+import pickle
+import uuid
+import time
+import traceback
+
+# Library untuk thread collector, heartbeat, dan Future hasil task
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# Pembatalan task yang masih menunggu atau sedang dikerjakan worker
+from cancellation import CancelToken, JobCancelled, cancel_scope, track_cmdstan_processes
+
+QUEUE_DIRS = ('pending', 'running', 'done', 'cancelled', 'tmp')
+
+
+class RemoteTaskError(Exception):
+    """
+    Dilempar saat task tetap gagal setelah `max_attempts` percobaan.
+    """
+
+
+# Fungsi untuk menulis pickle secara atomik (tulis ke tmp/ lalu pindahkan)
+def _write_atomic(root, path, obj):
+    tmp_path = os.path.join(root, 'tmp', uuid.uuid4().hex)
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+# Fungsi untuk menghapus file antrian yang mungkin sudah dihapus proses lain
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+# Fungsi untuk memisahkan nama file menjadi task_id dan attempt
+def _parse_name(name):
+    stem = name.rsplit('.', 1)[0]
+    task_id, attempt = stem.rsplit('-', 1)
+    return task_id, int(attempt)
+
+
+class TaskQueueExecutor:
+    """
+    Executor (mirip `concurrent.futures.Executor`) yang mengirim setiap
+    pemanggilan fungsi ke worker melalui folder antrian.
+
+    `fn` harus fungsi di level modul (misalnya dari prophet_fits) dan semua
+    argumen harus bisa di-pickle. Hasil dikembalikan sebagai Future yang
+    selesai segera setelah hasil dari worker masuk (streaming).
+
+    `max_inflight` adalah saran jumlah task yang dikirim bersamaan oleh
+    pemanggil (misalnya `max_workers` pada `forecast_unique_series`).
+    """
+
+    def __init__(self, root, lease_seconds=120, max_attempts=3, poll_interval=0.2, max_inflight=32):
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.max_inflight = max_inflight
+        for name in QUEUE_DIRS:
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+        self._tasks = {}
+        self._finished = OrderedDict()
+        # Penanda pembatalan yang ditulis coordinator ini: task_id -> attempt yang sedang di worker
+        self._cancel_markers = {}
+        self._lock = threading.Lock()
+        self._collector = None
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Memasukkan satu pemanggilan `fn(*args, **kwargs)` ke antrian.
+
+        Returns:
+        - Future berisi hasil fungsi dari worker.
+        """
+        task = {'id': uuid.uuid4().hex, 'fn': fn, 'args': args, 'kwargs': kwargs}
+        future = Future()
+        with self._lock:
+            self._tasks[task['id']] = {'task': task, 'future': future, 'attempt': 1}
+            if self._collector is None or not self._collector.is_alive():
+                self._collector = threading.Thread(target=self._collect, name='task-queue-collector', daemon=True)
+                self._collector.start()
+        self._enqueue(task, 1)
+        return future
+
+    def _enqueue(self, task, attempt):
+        path = os.path.join(self.root, 'pending', f"{task['id']}-{attempt}.task")
+        _write_atomic(self.root, path, task)
+
+    def _collect(self):
+        # Kumpulkan hasil dari worker selama masih ada task yang belum selesai
+        while True:
+            with self._lock:
+                if not self._tasks and not self._cancel_markers:
+                    self._collector = None
+                    return
+            self._collect_results()
+            self._drop_cancelled()
+            self._reclaim_expired()
+            self._sweep_cancel_markers()
+            time.sleep(self.poll_interval)
+
+    def _collect_results(self):
+        done_dir = os.path.join(self.root, 'done')
+        for name in os.listdir(done_dir):
+            try:
+                task_id, attempt = _parse_name(name)
+            except ValueError:
+                continue
+            path = os.path.join(done_dir, name)
+            with self._lock:
+                entry = self._tasks.get(task_id)
+                duplicate = task_id in self._finished
+            if duplicate:
+                # Hasil duplikat dari percobaan lain untuk task yang sudah selesai (atau dibatalkan)
+                _remove(path)
+                _remove(os.path.join(self.root, 'cancelled', task_id))
+                continue
+            if entry is None:
+                # Bukan task milik coordinator ini
+                continue
+
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+            os.remove(path)
+
+            if 'error' not in result:
+                # Hasil pertama yang dipakai; hasil duplikat berikutnya diabaikan
+                self._finish(task_id, result=result['result'])
+            elif attempt >= self.max_attempts:
+                self._finish(task_id, error=RemoteTaskError(result['error']))
+            elif attempt == entry['attempt']:
+                self._retry(task_id)
+
+    def _drop_cancelled(self):
+        # Task yang Future-nya dibatalkan tidak perlu dikerjakan worker
+        with self._lock:
+            cancelled = [(task_id, entry['attempt']) for task_id, entry in self._tasks.items()
+                         if entry['future'].cancelled()]
+            for task_id, _ in cancelled:
+                del self._tasks[task_id]
+                self._finished[task_id] = True
+        for task_id, attempt in cancelled:
+            if not _remove(os.path.join(self.root, 'pending', f"{task_id}-{attempt}.task")):
+                # Task sudah diambil worker: tulis penanda pembatalan yang diperiksa worker
+                with open(os.path.join(self.root, 'cancelled', task_id), 'wb'):
+                    pass
+                with self._lock:
+                    self._cancel_markers[task_id] = attempt
+
+    def _sweep_cancel_markers(self):
+        # Penanda pembatalan tidak diperlukan lagi setelah task selesai di worker (file running/
+        # sudah hilang) atau setelah lease habis (worker mati sebelum sempat menghapusnya)
+        with self._lock:
+            markers = list(self._cancel_markers.items())
+        for task_id, attempt in markers:
+            running_path = os.path.join(self.root, 'running', f"{task_id}-{attempt}.task")
+            try:
+                if time.time() - os.stat(running_path).st_mtime <= self.lease_seconds:
+                    continue
+                _remove(running_path)
+            except OSError:
+                pass
+            _remove(os.path.join(self.root, 'cancelled', task_id))
+            with self._lock:
+                self._cancel_markers.pop(task_id, None)
+
+    def _reclaim_expired(self):
+        # Worker yang berhenti mengirim heartbeat dianggap mati: kirim ulang task-nya
+        running_dir = os.path.join(self.root, 'running')
+        for name in os.listdir(running_dir):
+            try:
+                task_id, attempt = _parse_name(name)
+                expired = time.time() - os.stat(os.path.join(running_dir, name)).st_mtime > self.lease_seconds
+            except (ValueError, OSError):
+                continue
+            with self._lock:
+                entry = self._tasks.get(task_id)
+            if entry is None or not expired or attempt != entry['attempt']:
+                continue
+            try:
+                os.remove(os.path.join(running_dir, name))
+            except OSError:
+                continue
+            _remove(os.path.join(self.root, 'cancelled', task_id))
+            if attempt >= self.max_attempts:
+                self._finish(task_id, error=RemoteTaskError(f"Task {task_id} lost after {attempt} attempts"))
+            else:
+                self._retry(task_id)
+
+    def _retry(self, task_id):
+        with self._lock:
+            entry = self._tasks[task_id]
+            entry['attempt'] += 1
+            attempt = entry['attempt']
+        self._enqueue(entry['task'], attempt)
+
+    def _finish(self, task_id, result=None, error=None):
+        with self._lock:
+            entry = self._tasks.pop(task_id, None)
+            self._finished[task_id] = True
+            while len(self._finished) > 10000:
+                self._finished.popitem(last=False)
+        if entry is None:
+            return
+
+        # Percobaan lain yang belum diambil worker tidak perlu dikerjakan lagi
+        _remove(os.path.join(self.root, 'pending', f"{task_id}-{entry['attempt']}.task"))
+        _remove(os.path.join(self.root, 'cancelled', task_id))
+        if entry['future'].done():
+            return
+        if error is not None:
+            entry['future'].set_exception(error)
+        else:
+            entry['future'].set_result(result)
+
+
+# Fungsi untuk menunggu hasil task sambil memeriksa pembatalan job
+def wait_result(future, cancel_token=None, poll_interval=0.5):
+    """
+    Menunggu hasil Future dari TaskQueueExecutor.
+
+    Jika `cancel_token` dibatalkan, task yang belum diambil worker dihapus
+    dari antrian (task yang sedang dikerjakan dihentikan worker) dan
+    `JobCancelled` dilempar.
+    """
+    while True:
+        try:
+            return future.result(timeout=poll_interval)
+        except FutureTimeoutError:
+            if cancel_token is not None and cancel_token.is_cancelled():
+                future.cancel()
+                raise JobCancelled()
+
+
+# Fungsi untuk membuat executor dari environment variable (None = fitting lokal)
+def executor_from_env(variable='FORECAST_TASK_QUEUE'):
+    root = os.environ.get(variable)
+    if not root:
+        return None
+    return TaskQueueExecutor(
+        root,
+        lease_seconds=float(os.environ.get('FORECAST_TASK_LEASE', 120)),
+        max_attempts=int(os.environ.get('FORECAST_TASK_ATTEMPTS', 3)),
+        max_inflight=int(os.environ.get('FORECAST_TASK_INFLIGHT', 32)),
+    )
+
+
+# Fungsi worker: ambil task dari antrian, jalankan, dan tulis hasilnya
+def run_worker(root, worker_id=None, poll_interval=0.5, heartbeat_seconds=10, max_tasks=None):
+    """
+    Menjalankan worker sampai dihentikan (atau sampai `max_tasks` task selesai).
+
+    Parameters:
+    - root: Folder antrian (shared filesystem).
+    - worker_id: Nama worker untuk log (default: host dan PID).
+    - poll_interval: Jeda antar pengecekan task baru (detik).
+    - heartbeat_seconds: Interval pembaruan heartbeat task yang sedang dikerjakan.
+    - max_tasks: Jumlah task maksimal sebelum worker berhenti (None = tanpa batas).
+    """
+    worker_id = worker_id or f"{os.uname().nodename}:{os.getpid()}"
+    for name in QUEUE_DIRS:
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+    try:
+        # Proses cmdstan dari task yang dibatalkan bisa dihentikan di tengah fitting
+        track_cmdstan_processes()
+    except ImportError:
+        pass
+
+    completed = 0
+    while max_tasks is None or completed < max_tasks:
+        claimed = None
+        for name in sorted(os.listdir(os.path.join(root, 'pending'))):
+            running_path = os.path.join(root, 'running', name)
+            try:
+                # Rename bersifat atomik: hanya satu worker yang berhasil mengambil task ini
+                os.rename(os.path.join(root, 'pending', name), running_path)
+            except OSError:
+                continue
+            claimed = name
+            try:
+                # Lease dihitung sejak task diambil, bukan sejak task ditulis
+                os.utime(running_path)
+            except OSError:
+                pass
+            break
+
+        if claimed is None:
+            time.sleep(poll_interval)
+            continue
+
+        task_id, attempt = _parse_name(claimed)
+        cancel_path = os.path.join(root, 'cancelled', task_id)
+        cancel_token = CancelToken()
+        if os.path.exists(cancel_path):
+            cancel_token.cancel()
+
+        # Heartbeat: perbarui mtime file task selama fitting berjalan dan periksa penanda pembatalan
+        stop_heartbeat = threading.Event()
+
+        def heartbeat():
+            last_beat = time.time()
+            while not stop_heartbeat.wait(min(poll_interval, heartbeat_seconds)):
+                if os.path.exists(cancel_path):
+                    cancel_token.cancel()
+                if time.time() - last_beat < heartbeat_seconds:
+                    continue
+                try:
+                    os.utime(running_path)
+                except OSError:
+                    return
+                last_beat = time.time()
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            cancel_token.raise_if_cancelled()
+            with open(running_path, 'rb') as f:
+                task = pickle.load(f)
+            with cancel_scope(cancel_token):
+                result = {'result': task['fn'](*task['args'], **task['kwargs']), 'worker': worker_id}
+        except Exception:
+            result = {'error': traceback.format_exc(), 'worker': worker_id}
+        finally:
+            stop_heartbeat.set()
+
+        if cancel_token.is_cancelled() or os.path.exists(cancel_path):
+            # Task dibatalkan coordinator: hasilnya tidak diperlukan
+            _remove(cancel_path)
+        else:
+            _write_atomic(root, os.path.join(root, 'done', f"{task_id}-{attempt}.result"), result)
+        _remove(running_path)
+        completed += 1
+
+
+if __name__ == '__main__':
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="Worker fitting untuk task queue berbasis shared filesystem")
+    parser.add_argument('root', help='Folder antrian (shared filesystem)')
+    parser.add_argument('--processes', type=int, default=1, help='Jumlah proses worker lokal')
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(args.root, poll_interval=args.poll_interval)
+    else:
+        workers = [
+            multiprocessing.Process(target=run_worker, args=(args.root,), kwargs={'poll_interval': args.poll_interval})
+            for _ in range(args.processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -20,8 +20,12 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 
 
+# Asset UI (Plotly.js, jQuery, Bootstrap) disajikan lokal dengan nama ber-fingerprint
+import static_assets
+
 
 app = Flask(__name__)
+static_assets.init_app(app)
 UPLOAD_FOLDER = 'uploads'
 RESULT_FOLDER = 'results'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -278,7 +282,7 @@ def analyze():
     )
 
     # Menampilkan grafik di halaman web Flask
-    graph_html = fig.to_html(full_html=False)
+    graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
 
     # Tampilkan hasil
     return render_template('result.html', \
@@ -392,7 +396,7 @@ def update_growth():
         )
 
         # Konversi grafik ke HTML
-        graph_html = fig.to_html(full_html=False)
+        graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
 
         # Kirim data tabel dan grafik ke frontend
         updated_table = result_df.to_html(classes='table table-striped', index=False)
@@ -552,7 +556,7 @@ def compare_forecast_actual():
     )
 
     # Konversi grafik ke HTML
-    graph_html = fig.to_html(full_html=False)
+    graph_html = fig.to_html(full_html=False, include_plotlyjs=False)
 
     # Kirim data tabel dan grafik ke frontend
     updated_table = result_df.to_html(classes='table table-striped', index=False)
@@ -0,0 +1,5 @@
+# Agar modul di root repo bisa di-import dari test
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
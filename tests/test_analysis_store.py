@@ -0,0 +1,52 @@
+import threading
+
+from result_store import AnalysisStore
+
+
+def test_put_get_and_delete(tmp_path):
+    store = AnalysisStore(str(tmp_path), max_cached=2)
+    store.put('abc', {'total': 1})
+    assert store.get('abc') == {'total': 1}
+    store.put('abc', {'total': 2})
+    assert store.get('abc') == {'total': 2}
+    store.delete('abc')
+    assert store.get('abc') is None
+    assert store.get('../etc') is None
+
+
+def test_older_read_does_not_replace_newer_cached_version(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    store.put('abc', {'total': 2})
+    version = store._cache['abc'][0]
+    store._remember('abc', {'total': 1}, version - 1)
+    assert store.get('abc') == {'total': 2}
+
+
+def test_cache_is_thread_safe(tmp_path):
+    store = AnalysisStore(str(tmp_path), max_cached=3)
+    ids = [f"{i:x}" * 4 for i in range(10, 16)]
+    for analysis_id in ids:
+        store.put(analysis_id, {'id': analysis_id})
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(300):
+                analysis_id = ids[(i + offset) % len(ids)]
+                if i % 7 == 0:
+                    store.put(analysis_id, {'id': analysis_id})
+                    # Paksa baca ulang dari file oleh thread lain
+                    with store._cache_lock:
+                        store._cache.pop(analysis_id, None)
+                assert store.get(analysis_id) == {'id': analysis_id}
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store._cache) <= 3
@@ -0,0 +1,36 @@
+import subprocess
+
+import cmdstanpy.model
+import pytest
+
+import cancellation
+
+
+@pytest.fixture
+def fresh_tracking(monkeypatch):
+    monkeypatch.setattr(cancellation, '_tracking_installed', False)
+    monkeypatch.setattr(cmdstanpy.model, 'subprocess', cmdstanpy.model.subprocess)
+
+
+def test_tracking_wraps_cmdstanpy_popen(fresh_tracking, monkeypatch):
+    monkeypatch.setattr(cmdstanpy.model, 'subprocess', subprocess)
+    cancellation.track_cmdstan_processes()
+    assert cmdstanpy.model.subprocess.Popen is cancellation._TrackedPopen
+    assert subprocess.Popen is not cancellation._TrackedPopen
+
+
+def test_tracking_fails_loudly_when_cmdstanpy_changes(fresh_tracking, monkeypatch):
+    monkeypatch.delattr(cmdstanpy.model, 'subprocess')
+    with pytest.raises(RuntimeError, match='cmdstanpy'):
+        cancellation.track_cmdstan_processes()
+    assert cancellation._tracking_installed is False
+
+
+def test_cancel_terminates_processes_started_in_scope(fresh_tracking, monkeypatch):
+    monkeypatch.setattr(cmdstanpy.model, 'subprocess', subprocess)
+    cancellation.track_cmdstan_processes()
+    token = cancellation.CancelToken()
+    with cancellation.cancel_scope(token):
+        process = cmdstanpy.model.subprocess.Popen(['sleep', '30'])
+    token.cancel()
+    assert process.wait(10) != 0
@@ -0,0 +1,92 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as forecast_app
+from compact_chart import MAX_POINTS, compact_chart_html, chart_series, lttb_indices
+from forecast_arrays import ForecastArrayStore
+
+N_DATES = 3000
+SPIKE = 1234
+
+
+def chart_dataset(html):
+    return json.loads(re.search(r"graph\.compactData = (.*?);\n", html).group(1).replace('<\\/', '</'))
+
+
+def long_series(seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 + 10 * np.sin(np.arange(N_DATES) / 30) + rng.normal(0, 1, N_DATES)
+    values[SPIKE] = 1000
+    return values
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    values = long_series()
+    selected = lttb_indices(values, 200)
+    assert len(selected) == 200
+    assert (np.diff(selected) > 0).all()
+    assert selected[0] == 0 and selected[-1] == N_DATES - 1
+    assert SPIKE in selected
+
+
+def test_long_chart_is_downsampled_and_uses_webgl():
+    dates = pd.date_range('2016-01-01', periods=N_DATES)
+    html = compact_chart_html(dates, ['A'], [chart_series(long_series(), None, names=('All', '{key}'),
+                                                          hovertemplates=('', ''), field='history')],
+                              all_label='All', titles=('All', '{key}'), kind='history', series_url='/series?key=')
+    dataset = chart_dataset(html)
+    assert '"scattergl"' in html
+    assert dataset['downsampled'] is True
+    assert len(dataset['dates']) <= MAX_POINTS
+    assert len(dataset['dates']) == len(dataset['series'][0]['totals'])
+    assert dataset['dates'][0] == '2016-01-01' and dataset['dates'][-1] == str(dates[-1].date())
+    assert str(dates[SPIKE].date()) in dataset['dates']
+    assert 1000 in dataset['series'][0]['totals']
+
+
+@pytest.fixture
+def history_store(tmp_path, monkeypatch):
+    store = ForecastArrayStore(str(tmp_path / 'arrays'))
+    monkeypatch.setattr(forecast_app, 'forecast_arrays', store)
+    december = pd.date_range('2024-12-01', '2024-12-31')
+    forecast_data = pd.DataFrame({'Origin City': np.repeat(['A', 'B'], len(december)),
+                                  'Date': np.tile(december, 2), 'Forecasted Shipments': 1.0})
+    table = pd.DataFrame({'November': [1.0, 2.0], 'Desember': [31.0, 31.0]}, index=['A', 'B'])
+    dates = pd.date_range('2016-08-01', periods=N_DATES)
+    history = pd.DataFrame([long_series(0), long_series(1)], index=['A', 'B'], columns=dates)
+    store.write('abcdef', forecast_data, 'Origin City', 'Date', 'Forecasted Shipments', table, history=history)
+    return history
+
+
+def test_history_chart_sends_downsampled_totals(history_store):
+    arrays = forecast_app.forecast_arrays.get('abcdef')
+    with forecast_app.app.test_request_context('/jobs/abcdef/result'):
+        dataset = chart_dataset(forecast_app.history_chart_html('abcdef', arrays))
+    assert dataset['seriesUrl'] == '/history-series/abcdef?key='
+    assert dataset['downsampled'] is True
+    assert len(dataset['dates']) <= MAX_POINTS
+
+
+def test_history_series_returns_visible_range(history_store):
+    client = forecast_app.app.test_client()
+    response = client.get('/history-series/abcdef?key=B&start=2018-01-01&end=2019-12-31&points=100')
+    assert response.status_code == 200
+    data = response.json
+    dates = pd.DatetimeIndex(data['dates'])
+    # Rentang yang terlihat, ditambah satu tanggal di luar kedua sisi
+    assert dates[0] == pd.Timestamp('2017-12-31') and dates[-1] == pd.Timestamp('2020-01-01')
+    assert len(dates) <= 100
+    assert data['history'] == [round(x) if x == round(x) else x for x in history_store.loc['B', dates]]
+
+    # Tanpa rentang: series penuh tanpa tanggal; key kosong = total semua Origin City
+    total = client.get('/history-series/abcdef?key=').json
+    assert 'dates' not in total and len(total['history']) == N_DATES
+    assert np.allclose(total['history'], history_store.sum().to_numpy())
+
+    assert client.get('/history-series/abcdef?key=C').status_code == 404
+    assert client.get('/history-series/abcdef?key=A&start=nope').status_code == 400
+    assert client.get('/history-series/abcdef?key=A&points=0').status_code == 400
@@ -0,0 +1,120 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as forecast_app
+from fallback_forecast import (METHOD_CACHED, METHOD_PROPHET, METHOD_SEASONAL, METHOD_TOP_DOWN, ForecastCache,
+                               TimeBudget, fallback_forecast, seasonal_naive_forecast)
+from fit_scheduler import FitScheduler
+
+FIT_SECONDS = 10
+DATES = pd.date_range('2024-06-01', '2024-11-30')
+# Volume per Origin City: urutan fitting A, B, C, D
+LEVELS = {'A': 400.0, 'B': 300.0, 'C': 200.0, 'D': 100.0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_budget_stops_fitting_before_deadline():
+    clock = FakeClock()
+    budget = TimeBudget(35, safety=1.5, clock=clock)
+    assert budget.can_fit()  # Belum ada durasi fitting yang tercatat
+
+    for seconds in (8, 10, 30):
+        clock.now += seconds
+        budget.record(seconds)
+    assert budget.expected_fit_seconds() == 10
+
+    # Sisa 35 - 48 < 0; lalu dengan deadline baru: sisa waktu 16 > 10 x 1.5, sisa waktu 15 tidak cukup
+    assert not budget.can_fit()
+    budget.deadline = clock.now + 16
+    assert budget.can_fit()
+    budget.deadline = clock.now + 15
+    assert not budget.can_fit()
+
+    assert TimeBudget(None, clock=clock).can_fit()
+
+
+def series(level, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'ds': DATES, 'y': level + rng.normal(0, level / 10, len(DATES)).round()})
+
+
+def test_fallback_order_cached_then_top_down_then_seasonal():
+    data = series(100.0, 0)
+    pooled = [series(300.0, 1)]
+    pooled_forecast = [seasonal_naive_forecast(pooled[0], periods=31)]
+    cached = seasonal_naive_forecast(data, periods=31).assign(yhat=1.0)
+
+    assert fallback_forecast(data, cached, pooled, pooled_forecast)['method'].iloc[0] == METHOD_CACHED
+    assert fallback_forecast(data, None, pooled, pooled_forecast)['method'].iloc[0] == METHOD_TOP_DOWN
+    assert fallback_forecast(data, None, [], [])['method'].iloc[0] == METHOD_SEASONAL
+    # Series lain tanpa volume terakhir tidak bisa dipakai untuk top-down
+    silent = [pooled[0].assign(y=0.0)]
+    assert fallback_forecast(data, None, silent, pooled_forecast)['method'].iloc[0] == METHOD_SEASONAL
+
+
+@pytest.fixture
+def fake_fits(monkeypatch):
+    """
+    Fitting palsu: setiap fitting memajukan jam palsu 10 detik dan mengembalikan
+    rata-rata series sebagai forecast. Fitting berjalan berurutan (satu slot).
+    """
+    clock = FakeClock()
+    fitted = []
+
+    def fit_origin_city(city_data, events, resolution='daily'):
+        clock.now += FIT_SECONDS
+        fitted.append(float(city_data['y'].mean()))
+        future = pd.date_range(city_data['ds'].max() + pd.Timedelta(days=1), periods=31)
+        ds = pd.concat([city_data['ds'], pd.Series(future)], ignore_index=True)
+        return pd.DataFrame({'ds': ds, 'yhat': float(city_data['y'].mean())})
+
+    monkeypatch.setattr(forecast_app, 'fit_origin_city', fit_origin_city)
+    monkeypatch.setattr(forecast_app, 'TimeBudget', functools.partial(TimeBudget, clock=clock))
+    monkeypatch.setattr(forecast_app, 'fit_scheduler', FitScheduler(slots=1))
+    monkeypatch.setattr(forecast_app, 'forecast_cache', ForecastCache())
+    monkeypatch.setattr(forecast_app, 'remote_fits', None)
+    return fitted
+
+
+def upload():
+    frames = [series(level, seed).assign(**{'Origin City': city})
+              for seed, (city, level) in enumerate(LEVELS.items())]
+    return pd.concat(frames).rename(columns={'ds': 'DATE', 'y': 'Connote'}).reset_index(drop=True)
+
+
+def run(time_budget):
+    analysis = forecast_app.run_analysis(upload(), 2024, 3, 3, time_budget=time_budget)
+    return dict(zip(analysis['result_df']['Origin City'], analysis['methods'])), analysis
+
+
+def test_run_analysis_falls_back_when_budget_runs_out(fake_fits):
+    # Budget 35 detik: A (t=10) dan B (t=20) di-fit; C perlu 20 + 10 x 1.5 = 35, tidak sempat
+    methods, analysis = run(time_budget=35)
+    assert methods == {'A': METHOD_PROPHET, 'B': METHOD_PROPHET, 'C': METHOD_TOP_DOWN, 'D': METHOD_TOP_DOWN}
+    assert len(fake_fits) == 2
+
+    # Top-down: total forecast A + B dibagi sesuai porsi volume 28 hari terakhir
+    forecast = analysis['forecast_data'].groupby('Origin City')['Forecasted Shipments'].sum()
+    share_c = upload().pipe(lambda d: d[d['DATE'] > DATES[-1] - pd.Timedelta(days=28)]) \
+                      .groupby('Origin City')['Connote'].sum()
+    expected_c = (forecast['A'] + forecast['B']) * share_c['C'] / (share_c['A'] + share_c['B'])
+    assert forecast['C'] == pytest.approx(expected_c, abs=31)
+
+    # Tanpa waktu: A dan B dari cache run sebelumnya, C dan D seasonal naive (belum ada yang di-fit)
+    methods, _ = run(time_budget=0)
+    assert methods == {'A': METHOD_CACHED, 'B': METHOD_CACHED, 'C': METHOD_SEASONAL, 'D': METHOD_SEASONAL}
+    assert len(fake_fits) == 2
+
+    methods, _ = run(time_budget=None)
+    assert set(methods.values()) == {METHOD_PROPHET}
+    assert len(fake_fits) == 6
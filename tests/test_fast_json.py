@@ -0,0 +1,77 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as forecast_app
+import fast_json
+from forecast_arrays import ForecastArrayStore
+
+
+def unpack(packed):
+    # Sama dengan unpackArray di browser (compact_chart.py)
+    dtype = '<i4' if packed['dtype'] == 'i4' else '<f8'
+    return np.frombuffer(base64.b64decode(packed['bdata']), dtype=dtype).astype(float).reshape(packed['shape'])
+
+
+def test_pack_array_picks_int32_or_float64():
+    whole = fast_json.pack_array([1.0, -2.0, 300000.0])
+    assert whole['dtype'] == 'i4' and whole['shape'] == [3]
+    np.testing.assert_array_equal(unpack(whole), [1, -2, 300000])
+
+    matrix = np.array([[1.5, np.nan], [2 ** 40, 3.0]])
+    packed = fast_json.pack_array(matrix)
+    assert packed['dtype'] == 'f8' and packed['shape'] == [2, 2]
+    np.testing.assert_array_equal(unpack(packed), matrix)
+
+
+def test_loads_passes_options_through():
+    provider = forecast_app.app.json
+    assert isinstance(provider, fast_json.FastJSONProvider)
+    assert provider.loads('{"a": [1, 2]}') == {'a': [1, 2]}
+    hooked = provider.loads('{"a": 1}', object_hook=lambda obj: sorted(obj))
+    assert hooked == ['a']
+    assert provider.loads('{"a": 1.5}', parse_float=str) == {'a': '1.5'}
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    store = ForecastArrayStore(str(tmp_path / 'arrays'))
+    monkeypatch.setattr(forecast_app, 'forecast_arrays', store)
+    december = pd.date_range('2024-12-01', '2024-12-31')
+    keys = ['A', 'B']
+    values = np.arange(62, dtype=float) * 1.25
+    forecast_data = pd.DataFrame({'Origin City': np.repeat(keys, 31), 'Date': np.tile(december, 2),
+                                  'Forecasted Shipments': values})
+    table = pd.DataFrame({'November': [1.0, 2.0], 'Desember': [1.0, 2.0], 'Growth %': [0.0, 0.0]}, index=keys)
+    store.write('abcdef', forecast_data, 'Origin City', 'Date', 'Forecasted Shipments', table)
+    arrays = store.get('abcdef')
+    actual = np.full(arrays.values.shape, np.nan)
+    actual[:, :10] = 7.0
+    arrays.write_actuals(actual)
+    return arrays
+
+
+def test_forecast_baseline_sends_packed_matrix(stored):
+    data = forecast_app.app.test_client().get('/forecast-baseline/abcdef').json
+    assert data['keys'] == ['A', 'B']
+    assert data['values']['dtype'] == 'f8'
+    np.testing.assert_array_equal(unpack(data['values']), stored.values)
+
+
+def test_compare_series_sends_packed_fields(stored):
+    client = forecast_app.app.test_client()
+    data = client.get('/compare-series/abcdef?key=B').json
+    expected = forecast_app.compare_values(stored, stored.actual_values(), None, 'B')
+    for field, values in zip(('forecast', 'actual', 'error'), expected):
+        np.testing.assert_array_equal(unpack(data[field]), values)
+    # Aktual kosong setelah 10 hari tetap NaN (null di browser)
+    assert np.isnan(unpack(data['actual'])[10:]).all()
+
+
+def test_chart_script_decodes_packed_values():
+    from compact_chart import _SELECT_SCRIPT
+    assert 'window.unpackArray = function' in _SELECT_SCRIPT
+    assert _SELECT_SCRIPT.count('.then(graph.unpackValues)') == 2
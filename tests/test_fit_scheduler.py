@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from cancellation import CancelToken, JobCancelled
+from fit_scheduler import FitScheduler
+
+
+class Fit:
+    """
+    Satu fitting di thread terpisah: menunggu slot, mencatat urutan masuk, lalu
+    menahan slot sampai `finish()`.
+    """
+
+    def __init__(self, scheduler, job_id, size, order, cancel_token=None):
+        self.job_id = job_id
+        self.queued = threading.Event()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(scheduler, size, order, cancel_token))
+        self.thread.start()
+
+    def run(self, scheduler, size, order, cancel_token):
+        try:
+            with scheduler.slot(self.job_id, size, on_wait=lambda status: self.queued.set(),
+                                cancel_token=cancel_token):
+                order.append(self.job_id)
+                self.started.set()
+                self.release.wait(10)
+        except JobCancelled as error:
+            self.error = error
+
+    def finish(self):
+        self.release.set()
+        self.thread.join(10)
+        assert not self.thread.is_alive()
+
+
+def start(scheduler, job_id, size, order, cancel_token=None):
+    fit = Fit(scheduler, job_id, size, order, cancel_token)
+    assert fit.started.wait(10)
+    return fit
+
+
+def queue(scheduler, job_id, size, order, cancel_token=None):
+    fit = Fit(scheduler, job_id, size, order, cancel_token)
+    assert fit.queued.wait(10)
+    return fit
+
+
+def test_freed_slot_goes_to_job_with_fewer_running_fits():
+    scheduler = FitScheduler(slots=2)
+    order = []
+    running = [start(scheduler, 'large', 500, order), start(scheduler, 'large', 500, order)]
+
+    # Fitting 'large' masuk antrian lebih dulu, tetapi 'other' belum punya fitting berjalan
+    large_waiting = queue(scheduler, 'large', 500, order)
+    other_waiting = queue(scheduler, 'other', 500, order)
+    assert scheduler.status('other') == {'slots': 2, 'running': 2, 'queued': 2,
+                                         'job_running': 0, 'job_queued': 1}
+
+    running[0].finish()
+    assert other_waiting.started.wait(10)
+    assert not large_waiting.started.is_set()
+
+    running[1].finish()
+    assert large_waiting.started.wait(10)
+    assert order == ['large', 'large', 'other', 'large']
+
+    other_waiting.finish()
+    large_waiting.finish()
+    assert scheduler.status() == {'slots': 2, 'running': 0, 'queued': 0}
+
+
+def test_interactive_job_jumps_the_queue():
+    scheduler = FitScheduler(slots=1, interactive_series=20)
+    order = []
+    running = start(scheduler, 'large', 500, order)
+    large_waiting = queue(scheduler, 'large', 500, order)
+    small_waiting = queue(scheduler, 'small', 3, order)
+
+    running.finish()
+    assert small_waiting.started.wait(10)
+    small_waiting.finish()
+    assert large_waiting.started.wait(10)
+    large_waiting.finish()
+    assert order == ['large', 'small', 'large']
+
+
+def test_cancel_wakes_waiting_fit_without_polling():
+    scheduler = FitScheduler(slots=1)
+    order = []
+    running = start(scheduler, 'large', 500, order)
+    token = CancelToken()
+    waiting = queue(scheduler, 'other', 500, order, cancel_token=token)
+
+    cancelled_at = time.monotonic()
+    token.cancel()
+    waiting.thread.join(10)
+    assert time.monotonic() - cancelled_at < 0.25
+    assert isinstance(waiting.error, JobCancelled)
+    assert scheduler.status()['queued'] == 0
+    assert token._callbacks == []
+
+    running.finish()
+    assert order == ['large']
+
+
+@pytest.mark.parametrize('slots', [1, 3])
+def test_released_slot_wakes_waiter_without_polling(slots):
+    scheduler = FitScheduler(slots=slots)
+    order = []
+    running = [start(scheduler, 'a', 500, order) for _ in range(slots)]
+    waiting = queue(scheduler, 'b', 500, order)
+
+    released_at = time.monotonic()
+    running[0].finish()
+    assert waiting.started.wait(10)
+    assert time.monotonic() - released_at < 0.25
+
+    for fit in running[1:] + [waiting]:
+        fit.finish()
@@ -0,0 +1,89 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_arrays import ForecastArrayStore
+from render_cache import RenderCache
+
+DECEMBER = pd.date_range('2024-12-01', '2024-12-31')
+
+
+def write(store, level, analysis_id='abcdef'):
+    keys = ['A', 'B', 'C']
+    forecast_data = pd.DataFrame({'Origin City': np.repeat(keys, len(DECEMBER)),
+                                  'Date': np.tile(DECEMBER, len(keys)), 'Forecasted Shipments': float(level)})
+    table = pd.DataFrame({'November': [1.0, 2.0, 3.0], 'Desember': [31.0 * level] * 3}, index=keys)
+    store.write(analysis_id, forecast_data, 'Origin City', 'Date', 'Forecasted Shipments', table)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ForecastArrayStore(str(tmp_path / 'arrays'))
+
+
+def test_rewrite_bumps_version_and_keeps_state(store):
+    write(store, 1)
+    preview = store.get('abcdef')
+    preview.write_state({'growth': 5.0})
+    assert preview.read_state() == {'growth': 5.0}
+
+    write(store, 2)
+    final = store.get('abcdef')
+    assert final.version > preview.version
+    assert final.read_state() == {'growth': 5.0}
+    assert RenderCache.key('abcdef', final, 'table') != RenderCache.key('abcdef', preview, 'table')
+    assert final.values[0, 0] == 2.0
+
+    # Versi sebelumnya tetap bisa dibaca oleh pembaca yang sudah membukanya
+    assert preview.values[0, 0] == 1.0
+    assert store.get('abcdef') is final
+
+
+def test_version_is_monotonic_after_delete(store):
+    write(store, 1)
+    first = store.get('abcdef').version
+    store.delete('abcdef')
+    assert store.get('abcdef') is None
+    write(store, 1)
+    assert store.get('abcdef').version > first
+
+
+def test_only_current_and_previous_versions_are_kept(store):
+    for level in range(1, 5):
+        write(store, level)
+    folder = os.path.join(store.folder, 'abcdef')
+    versions = sorted(int(name) for name in os.listdir(folder) if name != 'current')
+    assert len(versions) == 2
+    assert store.get('abcdef').version == versions[-1]
+
+
+def test_concurrent_reads_never_see_missing_store(store):
+    write(store, 1)
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        # Store lain di proses lain: tanpa cache, setiap get membaca folder dari disk
+        other = ForecastArrayStore(store.folder)
+        while not stop.is_set():
+            arrays = other.get('abcdef')
+            if arrays is None:
+                errors.append('missing')
+            elif not (arrays.values == arrays.values[0, 0]).all():
+                errors.append('torn')
+            other._open.clear()
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for level in range(2, 60):
+        write(store, level)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert store.get('abcdef').values[0, 0] == 59.0
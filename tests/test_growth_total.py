@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as forecast_app
+from forecast_arrays import ForecastArrayStore
+
+DECEMBER = pd.date_range('2024-12-01', '2024-12-31')
+
+
+def test_december_total_matches_rounded_daily_forecast(tmp_path):
+    dates = pd.date_range('2024-10-01', '2024-11-30')
+    data = pd.DataFrame({'DATE': np.tile(dates, 2), 'Origin City': np.repeat(['A', 'B'], len(dates)),
+                         'Connote': 10})
+    # Nilai harian berakhiran .4: jumlah per hari yang dibulatkan berbeda dari pembulatan jumlah mentah
+    december_forecasts = {city: pd.DataFrame({'ds': DECEMBER, 'yhat': 12.4}) for city in ['A', 'B']}
+
+    analysis = forecast_app.build_analysis(data, 2024, ['A', 'B'], december_forecasts)
+
+    assert analysis['total_december_forecast'] == 2 * 31 * 12
+    store = ForecastArrayStore(str(tmp_path / 'arrays'))
+    store.write('abcdef', analysis['forecast_data'], 'Origin City', 'Date', 'Forecasted Shipments',
+                analysis['base_table'], history=analysis['history'])
+    arrays = store.get('abcdef')
+    assert forecast_app.december_total(arrays) == analysis['total_december_forecast']
+    assert forecast_app.growth_delta(arrays, 0.0)['total_december_forecast'] == '744'
+    assert forecast_app.december_total(arrays, 10.0) == pytest.approx(2 * 31 * round(12 * 1.1))
@@ -0,0 +1,56 @@
+import threading
+
+import pandas as pd
+
+import inbound_shipment
+from result_store import ResultStore, ResultTable
+
+
+def table(n=3):
+    df = pd.DataFrame({'AREA': ['JAWA'] * n, 'AREA 2': ['JABAR'] * n, 'Destname': [f"KOTA {i}" for i in range(n)],
+                       'November': range(n), 'Desember': range(n), 'Growth %': [0.0] * n})
+    return ResultTable(df, key_columns=['AREA', 'AREA 2', 'Destname'])
+
+
+def test_expired_breakdown_returns_gone(monkeypatch):
+    store = ResultStore(max_results=2)
+    monkeypatch.setattr(inbound_shipment, 'breakdown_store', store)
+    client = inbound_shipment.app.test_client()
+
+    first = store.add(table())
+    assert client.get(f'/breakdown/{first}').json['total'] == 3
+
+    # Analisis paling lama dibuang setelah dua analisis baru
+    store.add(table())
+    store.add(table())
+    response = client.get(f'/breakdown/{first}')
+    assert response.status_code == 410
+    assert response.json == {'error': 'Analysis expired. Please run the analysis again.', 'expired': True}
+
+
+def test_result_store_is_thread_safe():
+    store = ResultStore(max_results=5)
+    added = []
+
+    def worker():
+        for _ in range(500):
+            result_id = store.add(table(1))
+            added.append(result_id)
+            store.get(result_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(added) == 4000
+    assert sum(store.get(result_id) is not None for result_id in added) == 5
+
+
+def test_result_page_has_breakdown_error_banner():
+    with inbound_shipment.app.test_request_context('/analyze'):
+        html = inbound_shipment.render_template('resultin.html', area_table='', breakdown_id='abc',
+                                                breakdown_areas=[], breakdown_areas2=[], graph_html='')
+    assert 'id="breakdown_error"' in html
+    assert 'responseJSON.expired' in html
@@ -0,0 +1,97 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import inbound_shipment
+from checkpoint_store import CheckpointStore
+from series_dedup import series_fingerprint
+
+DATES = pd.date_range('2024-09-01', '2024-11-30')
+GROUPS = [('JAWA', 'JABAR', 'BANDUNG'), ('JAWA', 'JABAR', 'BOGOR'),
+          ('JAWA', 'JATIM', 'MALANG'), ('SUMATERA', 'SUMUT', 'MEDAN')]
+
+
+class InterruptedFits:
+    """
+    Pengganti fit_prophet_group: mencatat fingerprint setiap series yang di-fit
+    dan gagal (seperti proses yang mati) pada fitting ke-`fail_at`.
+    """
+
+    def __init__(self):
+        self.fitted = []
+        self.fail_at = None
+
+    def __call__(self, group_data, events, periods=31):
+        if self.fail_at is not None and len(self.fitted) + 1 == self.fail_at:
+            self.fail_at = None
+            raise RuntimeError('worker killed')
+        self.fitted.append(series_fingerprint(group_data))
+        future = pd.date_range(group_data['ds'].max() + pd.Timedelta(days=1), periods=periods)
+        ds = pd.concat([group_data['ds'], pd.Series(future)], ignore_index=True)
+        return pd.DataFrame({'ds': ds, 'yhat': float(group_data['y'].mean())}), {'k': 0.0}
+
+
+@pytest.fixture
+def fits(tmp_path, monkeypatch):
+    fits = InterruptedFits()
+    monkeypatch.setattr(inbound_shipment, 'fit_prophet_group', fits)
+    monkeypatch.setattr(inbound_shipment, 'remote_fits', None)
+    monkeypatch.setattr(inbound_shipment, 'checkpoint_store', CheckpointStore(str(tmp_path / 'checkpoints')))
+    return fits
+
+
+def upload_csv():
+    rng = np.random.default_rng(0)
+    frames = [pd.DataFrame({'DATE': DATES, 'AREA': area, 'AREA 2': area2, 'Destname': destname,
+                            'Cnote': rng.poisson(20 * (i + 1), len(DATES))})
+              for i, (area, area2, destname) in enumerate(GROUPS)]
+    return pd.concat(frames).to_csv(index=False).encode()
+
+
+def analyze(client, csv):
+    return client.post('/analyze', data={'file': (io.BytesIO(csv), 'inbound.csv'), 'year': '2024',
+                                         'days_before_event': '2', 'days_after_event': '2'},
+                       content_type='multipart/form-data')
+
+
+def test_interrupted_run_refits_only_missing_series(fits):
+    client = inbound_shipment.app.test_client()
+    csv = upload_csv()
+
+    # Run pertama terputus pada fitting ke-3: dua series sudah tersimpan di checkpoint
+    fits.fail_at = 3
+    response = analyze(client, csv)
+    assert response.status_code == 500
+    first_run = list(fits.fitted)
+    assert len(first_run) == 2
+    checkpoint_dirs = os.listdir(inbound_shipment.checkpoint_store.folder)
+    assert len(checkpoint_dirs) == 1
+
+    # Upload ulang file dan parameter yang sama: hanya series yang belum selesai di-fit
+    response = analyze(client, csv)
+    assert response.status_code == 200
+    second_run = fits.fitted[len(first_run):]
+    # 4 series AREA/AREA 2/Destname + 2 series AREA; AREA SUMATERA identik dengan MEDAN (di-fit sekali)
+    assert len(first_run) + len(second_run) == 5
+    assert not set(first_run) & set(second_run)
+
+    # Analisis selesai: checkpoint dihapus, run berikutnya mem-fit ulang semua series
+    assert os.listdir(inbound_shipment.checkpoint_store.folder) == []
+    analyze(client, csv)
+    assert len(fits.fitted) == 10
+
+
+def test_changed_parameters_do_not_reuse_checkpoint(fits):
+    client = inbound_shipment.app.test_client()
+    csv = upload_csv()
+    fits.fail_at = 3
+    assert analyze(client, csv).status_code == 500
+
+    response = client.post('/analyze', data={'file': (io.BytesIO(csv), 'inbound.csv'), 'year': '2024',
+                                             'days_before_event': '3', 'days_after_event': '2'},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert len(fits.fitted) == 2 + 5
@@ -0,0 +1,63 @@
+import threading
+
+from job_queue import CANCELLED, DONE, QUEUED, JobQueue
+
+
+def test_cancel_releases_buffered_events():
+    queue = JobQueue(max_workers=1)
+    started = threading.Event()
+
+    def job(progress=None, cancel_token=None):
+        for i in range(100):
+            progress('series', {'i': i})
+        started.set()
+        cancel_token._cancelled.wait(10)
+        cancel_token.raise_if_cancelled()
+
+    job_id = queue.submit(job)
+    started.wait(10)
+    job = queue.get(job_id)
+    assert len(job.events) == 100
+
+    queue.cancel(job_id)
+    # Menunggu job berhenti (stream dari event terakhir selesai saat job selesai)
+    assert list(job.iter_events(100)) == [(100, CANCELLED, {'job_id': job_id})]
+    assert list(job.iter_events(0)) == [(100, CANCELLED, {'job_id': job_id})]
+    assert job.status == CANCELLED
+    assert job.events == [(CANCELLED, {'job_id': job_id})]
+
+    # Klien yang reconnect setelah event yang dibuang tetap menerima status akhir
+    assert list(job.iter_events(42)) == [(100, CANCELLED, {'job_id': job_id})]
+    assert list(job.iter_events(101)) == []
+
+
+def test_cancel_queued_job_is_immediate():
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def blocking(progress=None, cancel_token=None):
+        started.set()
+        release.wait(10)
+
+    def job(progress=None, cancel_token=None):
+        calls.append('ran')
+
+    running_id = queue.submit(blocking)
+    started.wait(10)
+    queued_id = queue.submit(job)
+    assert queue.get(queued_id).status == QUEUED
+
+    queued = queue.cancel(queued_id)
+    # Status berubah tanpa menunggu worker mengambil job dari antrian
+    assert queued.status == CANCELLED
+    assert queued.finished_at is not None
+    assert list(queued.iter_events(0)) == [(0, CANCELLED, {'job_id': queued_id})]
+
+    release.set()
+    running = queue.get(running_id)
+    assert list(running.iter_events(0)) == [(0, DONE, {'job_id': running_id})]
+    queue._executor.shutdown(wait=True)
+    assert calls == []
+    assert queued.status == CANCELLED and queued.started_at is None
@@ -0,0 +1,21 @@
+from flask import render_template
+
+import app as forecast_app
+import outbound_shipment
+
+
+def render_result(flask_app, **context):
+    with flask_app.test_request_context('/analyze'):
+        return render_template('result.html', tables=['<table></table>'], total_december_forecast='1',
+                               graph_html='', **context)
+
+
+def test_result_page_without_analysis_id_links_static_download():
+    # outbound_shipment.py, outbound_tonase.py, dan temp.py tidak punya endpoint export_forecast
+    html = render_result(outbound_shipment.app)
+    assert 'href="/download/forecast_results.csv"' in html
+
+
+def test_result_page_with_analysis_id_links_export():
+    html = render_result(forecast_app.app, analysis_id='abcdef')
+    assert 'href="/export/abcdef"' in html
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from rollup_cube import RollupCube
+
+
+def history_with_missing_dims():
+    return pd.DataFrame({
+        'DATE': pd.to_datetime(['2024-11-01', '2024-11-01', '2024-11-02', '2024-11-02']),
+        'AREA': ['A1', 'A1', 'A1', 'A2'],
+        'AREA 2': ['X', np.nan, 'X', np.nan],
+        'Destname': ['D1', 'D2', np.nan, np.nan],
+        'Cnote': [1, 10, 100, 1000],
+    })
+
+
+def test_rows_with_missing_dims_count_in_coarser_levels():
+    data = history_with_missing_dims()
+    cube = RollupCube(['AREA', 'AREA 2', 'Destname'])
+    cube.add('history', data, 'Cnote', date_col='DATE')
+
+    assert cube.totals('history', level=0) == data['Cnote'].sum()
+
+    # Sama seperti groupby langsung per AREA (baseline sebelum cube)
+    per_area = cube.totals('history', level=1).set_index('AREA')['Cnote']
+    expected = data.groupby('AREA')['Cnote'].sum()
+    pd.testing.assert_series_equal(per_area, expected, check_names=False)
+
+    per_area2 = cube.totals('history', level=2).set_index(['AREA', 'AREA 2'])['Cnote']
+    pd.testing.assert_series_equal(per_area2, data.groupby(['AREA', 'AREA 2'])['Cnote'].sum(), check_names=False)
+
+
+def test_daily_total_series_keeps_rows_with_missing_dims():
+    data = history_with_missing_dims()
+    cube = RollupCube(['AREA', 'AREA 2', 'Destname'])
+    cube.add('history', data, 'Cnote', date_col='DATE')
+
+    daily = cube.series('history', level=0).set_index('Date')['Cnote']
+    assert daily.to_dict() == {pd.Timestamp('2024-11-01'): 11, pd.Timestamp('2024-11-02'): 1100}
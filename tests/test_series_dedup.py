@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import prophet_fits
+from series_dedup import flat_forecast, forecast_unique_series, is_flat_series, series_fingerprint
+
+DATES = pd.date_range('2024-09-01', '2024-12-01')
+
+
+def series(values):
+    return pd.DataFrame({'ds': DATES, 'y': values})
+
+
+class FakeProphet:
+    """
+    Pengganti Prophet: mencatat setiap fitting dan mengembalikan rata-rata series sebagai forecast.
+    """
+    fitted = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def fit(self, data):
+        FakeProphet.fitted.append(data)
+        self.data = data
+        return self
+
+    def make_future_dataframe(self, periods):
+        future = pd.date_range(self.data['ds'].max() + pd.Timedelta(days=1), periods=periods)
+        return pd.DataFrame({'ds': pd.concat([self.data['ds'], pd.Series(future)], ignore_index=True)})
+
+    def predict(self, future):
+        return future.assign(yhat=float(self.data['y'].mean()))
+
+
+@pytest.fixture
+def fake_prophet(monkeypatch):
+    FakeProphet.fitted = []
+    monkeypatch.setattr(prophet_fits, 'Prophet', FakeProphet)
+    return FakeProphet
+
+
+def fit(series_data):
+    return prophet_fits.fit_origin_city(series_data, events=None)
+
+
+def test_identical_series_are_fitted_once(fake_prophet):
+    rng = np.random.default_rng(0)
+    mirrored = rng.poisson(50, len(DATES)).astype(float)
+    other = rng.poisson(80, len(DATES)).astype(float)
+    series_by_key = {'HUB A': series(mirrored), 'HUB B': series(mirrored.copy()),
+                     'HUB C': series(other), 'HUB D': series(mirrored.copy())}
+
+    forecasts = forecast_unique_series(series_by_key, fit, max_workers=2)
+
+    assert len(fake_prophet.fitted) == 2
+    assert list(forecasts) == ['HUB A', 'HUB B', 'HUB C', 'HUB D']
+    pd.testing.assert_frame_equal(forecasts['HUB A'], forecasts['HUB B'])
+    pd.testing.assert_frame_equal(forecasts['HUB A'], forecasts['HUB D'])
+    assert forecasts['HUB A'] is not forecasts['HUB B']
+    assert forecasts['HUB C']['yhat'].iloc[0] == pytest.approx(other.mean())
+
+
+def test_flat_series_never_call_prophet(fake_prophet):
+    zeros = series(np.zeros(len(DATES)))
+    constant = series(np.full(len(DATES), 7.0))
+    assert is_flat_series(zeros) and is_flat_series(constant)
+
+    completed = []
+    forecasts = forecast_unique_series({'ZERO': zeros, 'CONSTANT': constant}, fit, periods=31,
+                                       on_complete=lambda keys, forecast: completed.append(keys))
+
+    assert fake_prophet.fitted == []
+    assert sorted(completed) == [['CONSTANT'], ['ZERO']]
+    pd.testing.assert_frame_equal(forecasts['ZERO'], flat_forecast(zeros, periods=31))
+    pd.testing.assert_frame_equal(forecasts['CONSTANT'], flat_forecast(constant, periods=31))
+    assert (forecasts['CONSTANT']['yhat'] == 7.0).all()
+    assert forecasts['ZERO']['ds'].iloc[-1] == pd.Timestamp('2025-01-01')
+
+
+def test_fingerprint_depends_on_values_and_dates():
+    values = np.arange(len(DATES), dtype=float)
+    assert series_fingerprint(series(values)) == series_fingerprint(series(values.copy()))
+    assert series_fingerprint(series(values)) != series_fingerprint(series(values + 1))
+    shifted = series(values).assign(ds=DATES + pd.Timedelta(days=1))
+    assert series_fingerprint(series(values)) != series_fingerprint(shifted)
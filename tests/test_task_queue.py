@@ -0,0 +1,217 @@
+import multiprocessing
+import os
+import time
+import uuid
+
+import pytest
+
+import cancellation
+from task_queue import RemoteTaskError, TaskQueueExecutor, run_worker
+
+# Worker dijalankan dengan fork agar fungsi task di modul test bisa di-unpickle
+ctx = multiprocessing.get_context('fork')
+
+
+# Fungsi task: catat setiap eksekusi sebagai file di folder calls/ (satu file per pemanggilan)
+def record_call(calls, key):
+    path = os.path.join(calls, f"{key}.{os.getpid()}.{uuid.uuid4().hex}")
+    with open(path, 'w'):
+        pass
+
+
+def calls_for(calls, key):
+    return [name for name in os.listdir(calls) if name.split('.')[0] == str(key)]
+
+
+def square(calls, i):
+    record_call(calls, i)
+    time.sleep(0.02)
+    return i * i
+
+
+def flaky(calls, key, failures):
+    previous = len(calls_for(calls, key))
+    record_call(calls, key)
+    if previous < failures:
+        raise ValueError(f"attempt {previous + 1} failed")
+    return previous + 1
+
+
+def die_first_time(calls, key):
+    first = not calls_for(calls, key)
+    record_call(calls, key)
+    if first:
+        # Worker mati di tengah task (tanpa menulis hasil dan tanpa heartbeat lagi)
+        os._exit(1)
+    return 'recovered'
+
+
+def slow_first_time(calls, key):
+    first = not calls_for(calls, key)
+    record_call(calls, key)
+    if first:
+        time.sleep(1.5)
+        return 'stale'
+    return 'fresh'
+
+
+def wait_for_cancel(calls, key):
+    record_call(calls, key)
+    # Token pembatalan dipasang worker (cancel_scope) selama task berjalan
+    token = cancellation._current.token
+    deadline = time.time() + 10
+    while not token.is_cancelled() and time.time() < deadline:
+        time.sleep(0.02)
+    if token.is_cancelled():
+        record_call(calls, f"{key}-cancelled")
+    return 'finished'
+
+
+def die_when_cancelled(calls, key):
+    record_call(calls, key)
+    token = cancellation._current.token
+    deadline = time.time() + 10
+    while not token.is_cancelled() and time.time() < deadline:
+        time.sleep(0.02)
+    # Worker mati setelah penanda pembatalan terbaca, sebelum sempat menghapusnya
+    os._exit(1)
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    root = str(tmp_path / 'queue')
+    calls = str(tmp_path / 'calls')
+    os.makedirs(calls)
+    executor = TaskQueueExecutor(root, lease_seconds=0.5, max_attempts=3, poll_interval=0.05)
+    workers = []
+
+    def start_worker(**kwargs):
+        kwargs = {'poll_interval': 0.05, 'heartbeat_seconds': 0.1, **kwargs}
+        worker = ctx.Process(target=run_worker, args=(root,), kwargs=kwargs, daemon=True)
+        worker.start()
+        workers.append(worker)
+        return worker
+
+    yield executor, calls, start_worker
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join(5)
+
+
+def queue_files(executor, folder):
+    return os.listdir(os.path.join(executor.root, folder))
+
+
+def test_workers_run_each_task_exactly_once(queue):
+    executor, calls, start_worker = queue
+    for _ in range(3):
+        start_worker()
+
+    futures = {i: executor.submit(square, calls, i) for i in range(30)}
+    assert {i: future.result(timeout=30) for i, future in futures.items()} == {i: i * i for i in range(30)}
+
+    # Rename dari pending/ ke running/: setiap task diambil tepat satu worker
+    assert all(len(calls_for(calls, i)) == 1 for i in range(30))
+    pids = {name.split('.')[1] for name in os.listdir(calls)}
+    assert len(pids) > 1
+    assert queue_files(executor, 'pending') == []
+    assert queue_files(executor, 'running') == []
+    assert queue_files(executor, 'done') == []
+
+
+def test_failed_tasks_are_retried_up_to_max_attempts(queue):
+    executor, calls, start_worker = queue
+    for _ in range(2):
+        start_worker()
+
+    recovers = executor.submit(flaky, calls, 'recovers', failures=2)
+    fails = executor.submit(flaky, calls, 'fails', failures=5)
+
+    assert recovers.result(timeout=30) == 3
+    with pytest.raises(RemoteTaskError, match='attempt 3 failed'):
+        fails.result(timeout=30)
+    assert len(calls_for(calls, 'recovers')) == 3
+    assert len(calls_for(calls, 'fails')) == 3
+
+
+def test_task_of_dead_worker_is_taken_over_after_lease_expires(queue):
+    executor, calls, start_worker = queue
+    workers = [start_worker() for _ in range(3)]
+
+    doomed = executor.submit(die_first_time, calls, 'doomed')
+    others = [executor.submit(square, calls, i) for i in range(10)]
+
+    assert doomed.result(timeout=30) == 'recovered'
+    assert [future.result(timeout=30) for future in others] == [i * i for i in range(10)]
+    assert len(calls_for(calls, 'doomed')) == 2
+    assert all(len(calls_for(calls, i)) == 1 for i in range(10))
+    assert sum(worker.exitcode == 1 for worker in workers) == 1
+
+
+def test_duplicate_result_from_expired_lease_is_discarded(queue):
+    executor, calls, start_worker = queue
+    # Worker tanpa heartbeat: lease task-nya habis selagi task masih berjalan
+    stale = start_worker(heartbeat_seconds=60, max_tasks=1)
+    future = executor.submit(slow_first_time, calls, 'slow')
+    wait_until(lambda: queue_files(executor, 'running'))
+    start_worker()
+
+    # Percobaan kedua (worker lain) selesai lebih dulu dan dipakai
+    assert future.result(timeout=30) == 'fresh'
+    stale.join(10)
+    assert stale.exitcode == 0
+    assert len(calls_for(calls, 'slow')) == 2
+
+    # Hasil percobaan pertama yang datang belakangan dibuang oleh collector
+    assert executor.submit(square, calls, 7).result(timeout=30) == 49
+    assert future.result() == 'fresh'
+    assert queue_files(executor, 'done') == []
+
+
+def test_cancelled_tasks_are_removed_from_queue_or_stopped_on_worker(queue):
+    executor, calls, start_worker = queue
+
+    # Task yang belum diambil worker dihapus dari pending/
+    queued = executor.submit(square, calls, 1)
+    queued.cancel()
+    wait_until(lambda: not queue_files(executor, 'pending'))
+
+    # Task yang sedang berjalan menerima penanda pembatalan dan tidak menulis hasil
+    start_worker()
+    running = executor.submit(wait_for_cancel, calls, 'running')
+    wait_until(lambda: calls_for(calls, 'running'))
+    running.cancel()
+    wait_until(lambda: calls_for(calls, 'running-cancelled'))
+    wait_until(lambda: not queue_files(executor, 'running') and not queue_files(executor, 'cancelled'))
+
+    assert executor.submit(square, calls, 2).result(timeout=30) == 4
+    assert calls_for(calls, 1) == []
+    assert queue_files(executor, 'done') == []
+
+
+def test_cancel_marker_of_dead_worker_is_removed_after_lease(queue):
+    executor, calls, start_worker = queue
+    worker = start_worker()
+    doomed = executor.submit(die_when_cancelled, calls, 'doomed')
+    wait_until(lambda: calls_for(calls, 'doomed'))
+    doomed.cancel()
+    wait_until(lambda: not worker.is_alive())
+    assert worker.exitcode == 1
+    assert queue_files(executor, 'cancelled') and queue_files(executor, 'running')
+
+    # Tidak ada task lain yang berjalan: collector tetap membersihkan penanda setelah lease habis
+    wait_until(lambda: not queue_files(executor, 'cancelled') and not queue_files(executor, 'running'))
+    wait_until(lambda: executor._collector is None)
+    assert executor._cancel_markers == {}
+
+    start_worker()
+    assert executor.submit(square, calls, 3).result(timeout=30) == 9
+    assert queue_files(executor, 'cancelled') == []
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from training_window import (LEVEL_SHIFT_RATIO, adaptive_window_start, apply_training_window,
+                             parse_training_window)
+
+END = pd.Timestamp('2024-11-30')
+
+
+def daily_series(start='2019-01-01', level=lambda dates: np.full(len(dates), 100.0)):
+    dates = pd.date_range(start, END)
+    return pd.DataFrame({'ds': dates, 'y': level(dates)})
+
+
+def step_series(step_date, factor, start='2019-01-01'):
+    return daily_series(start, lambda dates: np.where(dates >= pd.Timestamp(step_date), 100.0 * factor, 100.0))
+
+
+def test_parse_training_window():
+    assert parse_training_window(None) == ('all', None)
+    assert parse_training_window(' Adaptive ') == ('adaptive', None)
+    assert parse_training_window('days:365') == ('days', 365)
+    assert parse_training_window('years:2') == ('years', 2)
+    for value in ('days:0', 'days:-5', 'weeks:3', 'years:x'):
+        with pytest.raises(ValueError):
+            parse_training_window(value)
+
+
+def test_days_and_years_keep_most_recent_history():
+    series = daily_series()
+
+    last_365 = apply_training_window(series, ('days', 365))
+    assert len(last_365) == 365
+    assert last_365['ds'].iloc[0] == pd.Timestamp('2023-12-02')
+    assert last_365['ds'].iloc[-1] == END
+
+    # years:K memakai kalender: 2 tahun sampai 30 Nov 2024 dimulai 1 Des 2022 (termasuk 29 Feb 2024)
+    last_2_years = apply_training_window(series, ('years', 2))
+    assert last_2_years['ds'].iloc[0] == pd.Timestamp('2022-12-01')
+    assert len(last_2_years) == 731
+
+    assert apply_training_window(series, ('all', None)) is series
+    assert len(apply_training_window(series.iloc[:100], ('days', 365))) == 100
+
+
+@pytest.mark.parametrize('factor', [3.0, 1 / 3, 1.6])
+def test_adaptive_window_starts_at_level_shift(factor):
+    # Perubahan level 2021-06-01, lebih dari 730 hari sebelum cutoff
+    series = step_series('2021-06-01', factor)
+    assert adaptive_window_start(series) == pd.Timestamp('2021-06-01')
+    trimmed = apply_training_window(series, ('adaptive', None))
+    assert trimmed['ds'].iloc[0] == pd.Timestamp('2021-06-01')
+    assert trimmed['y'].nunique() == 1
+
+
+def test_adaptive_window_ignores_shift_below_threshold():
+    series = step_series('2021-06-01', LEVEL_SHIFT_RATIO * 0.9)
+    # Tanpa perubahan level: maksimal 4 tahun histori
+    assert adaptive_window_start(series) == END - pd.DateOffset(years=4)
+
+
+def test_adaptive_window_keeps_min_days_and_latest_shift():
+    # Perubahan level terlalu baru: window tetap minimal 730 hari
+    recent = step_series('2024-01-01', 3.0)
+    assert adaptive_window_start(recent) == END - pd.DateOffset(years=4)
+
+    # Dua perubahan level: yang terakhir (dalam batas min_days) dipakai
+    two_shifts = daily_series(level=lambda dates: np.select(
+        [dates < '2020-03-01', dates < '2021-09-01'], [50.0, 150.0], 400.0))
+    assert adaptive_window_start(two_shifts) == pd.Timestamp('2021-09-01')
+    noisy = two_shifts.assign(y=two_shifts['y'] * np.random.default_rng(0).normal(1, 0.1, len(two_shifts)))
+    assert abs(adaptive_window_start(noisy) - pd.Timestamp('2021-09-01')) <= pd.Timedelta(days=7)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import weekly_forecast
+from weekly_forecast import disaggregate_weekly, estimate_daily_profile, forecast_weekly, week_start
+
+DOW_SHARE = np.array([0.2, 0.18, 0.16, 0.15, 0.14, 0.1, 0.07])
+
+EVENTS = pd.DataFrame({
+    'holiday': ['Hari Raya Natal'],
+    'ds': pd.to_datetime(['2024-12-25']),
+    'lower_window': [0],
+    'upper_window': [0],
+})
+
+
+def weekly_sums(daily):
+    return daily.groupby(week_start(daily['ds']).values)['yhat'].sum()
+
+
+def test_disaggregated_days_sum_back_to_weekly_forecast():
+    dates = pd.date_range('2024-11-25', '2024-12-29')  # Lima minggu penuh (Senin - Minggu)
+    weeks = week_start(dates).drop_duplicates().reset_index(drop=True)
+    yhat = np.array([700.0, 840.0, 910.0, 1050.0, 1400.0])
+    weekly = pd.DataFrame({'ds': weeks, 'trend': yhat, 'yhat_lower': yhat * 0.9,
+                           'yhat_upper': yhat * 1.1, 'yhat': yhat})
+
+    daily = disaggregate_weekly(weekly, DOW_SHARE, {(12, 25): 2.0}, dates)
+
+    assert list(daily.columns) == ['ds', 'trend', 'yhat_lower', 'yhat_upper', 'yhat']
+    np.testing.assert_allclose(weekly_sums(daily).to_numpy(), yhat)
+
+    # Minggu tanpa event mengikuti porsi hari dalam minggu
+    first_week = daily['yhat'].to_numpy()[:7]
+    np.testing.assert_allclose(first_week, 700.0 * DOW_SHARE)
+
+    # Hari event (Rabu 25 Desember) mendapat bobot 2x dibanding hari biasa di minggu yang sama
+    by_date = daily.set_index('ds')['yhat']
+    ratio = by_date['2024-12-25'] / by_date['2024-12-24']
+    assert ratio == pytest.approx(2.0 * DOW_SHARE[2] / DOW_SHARE[1])
+    christmas_week = by_date['2024-12-23':'2024-12-29']
+    assert christmas_week.sum() == pytest.approx(1400.0)
+    assert christmas_week['2024-12-23'] < 1400.0 * DOW_SHARE[0]
+
+
+def test_daily_profile_recovers_weekday_shares_and_event_factor():
+    dates = pd.date_range('2021-01-04', '2023-12-31')
+    y = 1000.0 * DOW_SHARE[dates.dayofweek]
+    christmas = (dates.month == 12) & (dates.day == 25)
+    y[christmas] *= 2.0
+    history = pd.DataFrame({'ds': dates, 'y': y})
+
+    dow_share, event_factor = estimate_daily_profile(history, EVENTS)
+
+    np.testing.assert_allclose(dow_share, DOW_SHARE, rtol=1e-6)
+    assert list(event_factor) == [(12, 25)]
+    assert event_factor[(12, 25)] > 1.5
+
+
+class ConstantWeeklyProphet:
+    # Pengganti Prophet mingguan: setiap minggu diprediksi 7000
+    def __init__(self, **kwargs):
+        pass
+
+    def fit(self, data):
+        return self
+
+    def predict(self, weeks):
+        return weeks.assign(trend=7000.0, yhat_lower=7000.0, yhat_upper=7000.0, yhat=7000.0)
+
+
+def test_forecast_weekly_keeps_weekly_totals(monkeypatch):
+    monkeypatch.setattr(weekly_forecast, 'Prophet', ConstantWeeklyProphet)
+    dates = pd.date_range('2022-01-03', '2024-11-24')
+    history = pd.DataFrame({'ds': dates, 'y': 1000.0 * DOW_SHARE[dates.dayofweek]})
+
+    daily = forecast_weekly(history, EVENTS, periods=35)
+
+    assert daily['ds'].iloc[-1] == pd.Timestamp('2024-12-29')
+    december = daily[daily['ds'] >= '2024-11-25']
+    np.testing.assert_allclose(weekly_sums(december).to_numpy(), 7000.0)
@@ -0,0 +1,119 @@
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+
+# Pilihan policy window training yang ditampilkan di form
+TRAINING_WINDOW_CHOICES = {
+    'all': 'All history',
+    'days:365': 'Last 365 days',
+    'days:730': 'Last 730 days',
+    'years:2': 'Last 2 years',
+    'years:3': 'Last 3 years',
+    'adaptive': 'Adaptive per series',
+}
+
+
+# Panjang rata-rata bergerak (hari) sebelum dan sesudah tanggal yang dibandingkan pada mode adaptif
+LEVEL_WINDOW_DAYS = 90
+
+# Rasio level sesudah/sebelum minimal agar dianggap perubahan level (misalnya hub baru atau
+# hilangnya pelanggan besar); fluktuasi musiman 90 harian pada data pengiriman umumnya di bawah 1.5x
+LEVEL_SHIFT_RATIO = 1.5
+
+
+# Fungsi untuk membaca policy window training dari input user
+def parse_training_window(value):
+    """
+    Membaca policy window training.
+
+    Format yang didukung:
+    - 'all': seluruh histori.
+    - 'days:N': N hari terakhir sebelum cutoff.
+    - 'years:K': K tahun terakhir sebelum cutoff.
+    - 'adaptive': window dipilih per series (lihat `adaptive_window_start`).
+
+    Returns:
+    - Tuple (jenis, angka), misalnya ('days', 365) atau ('all', None).
+
+    Raises:
+    - ValueError jika format tidak dikenali.
+    """
+    value = (value or 'all').strip().lower()
+    if value in ('all', 'adaptive'):
+        return value, None
+
+    kind, _, amount = value.partition(':')
+    if kind not in ('days', 'years') or not amount.isdigit() or int(amount) <= 0:
+        raise ValueError(f"Invalid training window: {value}")
+    return kind, int(amount)
+
+
+# Fungsi untuk mencari awal window adaptif berdasarkan perubahan level terakhir
+def adaptive_window_start(series_data, min_days=730, max_years=4, level_window=LEVEL_WINDOW_DAYS,
+                          shift_ratio=LEVEL_SHIFT_RATIO):
+    """
+    Memilih awal window training per series.
+
+    Window minimal `min_days` (agar seasonality tahunan dan Desember tahun
+    lalu tetap terlihat) dan maksimal `max_years`. Jika ada perubahan level
+    yang besar (rata-rata `level_window` hari sesudah vs sebelum berbeda lebih
+    dari `shift_ratio` kali), histori sebelum perubahan level terakhir dibuang
+    karena tidak lagi mewakili volume saat ini. Tanggal perubahan level adalah
+    tanggal dengan rasio terbesar pada rangkaian tanggal berurutan terakhir
+    yang melewati `shift_ratio`.
+
+    Returns:
+    - Timestamp awal window training.
+    """
+    ds = pd.to_datetime(series_data['ds'])
+    end = ds.max()
+    start = max(ds.min(), end - pd.DateOffset(years=max_years))
+    latest_allowed = end - pd.Timedelta(days=min_days)
+    if latest_allowed <= start:
+        return start
+
+    # Rata-rata bergerak sebelum dan sesudah setiap tanggal (vektor)
+    daily = series_data.assign(ds=ds).set_index('ds')['y'].asfreq('D', fill_value=0)
+    before = daily.rolling(level_window, min_periods=level_window).mean()
+    after = before.shift(-level_window)
+    ratio = (np.maximum(before, after) / np.minimum(before, after).replace(0, np.nan))
+
+    candidates = ratio[(ratio.index > start) & (ratio.index <= latest_allowed) & (ratio > shift_ratio)]
+    if candidates.empty:
+        return start
+
+    # Rasio juga melewati batas beberapa hari di sekitar perubahan level (window sebagian
+    # berisi level baru); ambil puncak rasio pada rangkaian kandidat terakhir
+    run = (candidates.index.to_series().diff() != pd.Timedelta(days=1)).cumsum()
+    last_shift = candidates[(run == run.iloc[-1]).to_numpy()]
+    return last_shift.idxmax() + pd.Timedelta(days=1)
+
+
+# Fungsi untuk menerapkan policy window training pada satu series
+def apply_training_window(series_data, policy):
+    """
+    Memotong series sesuai policy window training sebelum fitting.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y'.
+    - policy: Hasil `parse_training_window`.
+
+    Returns:
+    - DataFrame series yang sudah dipotong.
+    """
+    kind, amount = policy
+    if kind == 'all' or series_data.empty:
+        return series_data
+
+    end = pd.to_datetime(series_data['ds']).max()
+    if kind == 'days':
+        start = end - pd.Timedelta(days=amount - 1)
+    elif kind == 'years':
+        start = end - pd.DateOffset(years=amount) + pd.Timedelta(days=1)
+    else:
+        start = adaptive_window_start(series_data)
+
+    return series_data[pd.to_datetime(series_data['ds']) >= start].reset_index(drop=True)
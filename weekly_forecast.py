@@ -0,0 +1,167 @@
+# Library untuk operasi array
+import numpy as np
+
+# Library untuk melakukan manipulasi terhadap dataset
+import pandas as pd
+
+# Library yang mengunggah model Prophet untuk melakukan forecasting
+from prophet import Prophet
+
+
+# Fungsi untuk mendapatkan tanggal Senin dari minggu setiap tanggal (minggu = Senin s/d Minggu)
+def week_start(dates):
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    return dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')
+
+
+# Fungsi untuk mengubah series harian menjadi total mingguan
+def to_weekly(series_data):
+    """
+    Mengagregasi series harian menjadi total mingguan (Senin - Minggu).
+
+    Minggu yang tidak lengkap (kurang dari 7 hari data) di awal dan akhir
+    histori dibuang agar total mingguan tidak bias ke bawah.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y' (harian).
+
+    Returns:
+    - DataFrame dengan kolom 'ds' (tanggal Senin) dan 'y' (total mingguan).
+    """
+    daily = series_data[['ds', 'y']].copy()
+    daily['ds'] = pd.to_datetime(daily['ds'])
+    daily['week'] = week_start(daily['ds']).values
+
+    weekly = daily.groupby('week').agg(y=('y', 'sum'), days=('ds', 'nunique')).reset_index()
+    weekly = weekly[weekly['days'] == 7]
+    return weekly.rename(columns={'week': 'ds'})[['ds', 'y']].reset_index(drop=True)
+
+
+# Fungsi untuk mengestimasi profil harian (hari dalam minggu dan hari event) dari histori
+def estimate_daily_profile(series_data, events):
+    """
+    Mengestimasi pembagian total mingguan ke hari-hari dalam minggu.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y' (harian).
+    - events: DataFrame events Prophet (kolom 'holiday', 'ds', 'lower_window', 'upper_window').
+
+    Returns:
+    - Tuple (dow_share, event_factor):
+      - dow_share: array 7 elemen (Senin..Minggu) berisi porsi rata-rata hari
+        tersebut terhadap total mingguan (jumlahnya 1).
+      - event_factor: dictionary (bulan, hari) -> faktor pengali terhadap porsi
+        hari biasa, diestimasi dari kejadian event pada tahun-tahun sebelumnya.
+    """
+    daily = series_data[['ds', 'y']].copy()
+    daily['ds'] = pd.to_datetime(daily['ds'])
+    daily['week'] = week_start(daily['ds']).values
+    daily['dow'] = daily['ds'].dt.dayofweek
+
+    # Porsi setiap hari terhadap total mingguan (hanya minggu yang lengkap)
+    weekly = daily.groupby('week')['y'].agg(['sum', 'count'])
+    daily = daily.join(weekly, on='week')
+    full_weeks = daily[(daily['count'] == 7) & (daily['sum'] > 0)].copy()
+    full_weeks['share'] = full_weeks['y'] / full_weeks['sum']
+
+    dow_share = full_weeks.groupby('dow')['share'].median().reindex(range(7)).fillna(1 / 7).to_numpy()
+    dow_share = dow_share / dow_share.sum() if dow_share.sum() > 0 else np.full(7, 1 / 7)
+
+    # Rasio aktual terhadap porsi hari biasa untuk tanggal di sekitar event
+    full_weeks['ratio'] = full_weeks['share'] / dow_share[full_weeks['dow'].to_numpy()]
+    full_weeks['month'] = full_weeks['ds'].dt.month
+    full_weeks['day'] = full_weeks['ds'].dt.day
+
+    event_factor = {}
+    event_dates = pd.to_datetime(events['ds'])
+    for event_date, lower, upper in zip(event_dates, events['lower_window'], events['upper_window']):
+        for offset in range(int(lower), int(upper) + 1):
+            day = event_date + pd.Timedelta(days=offset)
+            ratios = full_weeks.loc[(full_weeks['month'] == day.month) & (full_weeks['day'] == day.day), 'ratio']
+            if not ratios.empty:
+                event_factor[(day.month, day.day)] = float(ratios.median())
+
+    return dow_share, event_factor
+
+
+# Fungsi untuk membagi total mingguan menjadi nilai harian
+def disaggregate_weekly(weekly_forecast, dow_share, event_factor, dates):
+    """
+    Membagi forecast mingguan menjadi forecast harian secara vektor.
+
+    Bobot setiap hari = porsi hari dalam minggu x faktor event, lalu
+    dinormalisasi per minggu sehingga total mingguan tetap sama.
+
+    Parameters:
+    - weekly_forecast: DataFrame hasil `model.predict` pada data mingguan.
+    - dow_share: Porsi per hari dalam minggu (lihat `estimate_daily_profile`).
+    - event_factor: Faktor pengali per (bulan, hari).
+    - dates: Tanggal harian yang ingin dihasilkan.
+
+    Returns:
+    - DataFrame harian dengan kolom 'ds', 'trend', 'yhat_lower', 'yhat_upper', dan 'yhat'.
+    """
+    daily = pd.DataFrame({'ds': pd.to_datetime(pd.Series(dates)).reset_index(drop=True)})
+    daily['week'] = week_start(daily['ds']).values
+    dow = daily['ds'].dt.dayofweek.to_numpy()
+
+    # Bobot hari: porsi hari dalam minggu dikali faktor event
+    factor_index = pd.MultiIndex.from_tuples(list(event_factor.keys())) if event_factor else None
+    weight = dow_share[dow].copy()
+    if factor_index is not None:
+        factors = pd.Series(list(event_factor.values()), index=factor_index)
+        day_keys = pd.MultiIndex.from_arrays([daily['ds'].dt.month, daily['ds'].dt.day])
+        weight *= factors.reindex(day_keys).fillna(1.0).to_numpy()
+
+    # Normalisasi bobot dengan total bobot satu minggu penuh (bukan hanya hari yang ada)
+    full_week = dow_share.sum()
+    event_extra = pd.Series(weight - dow_share[dow]).groupby(daily['week'].values).transform('sum').to_numpy()
+    weight = weight / (full_week + event_extra)
+
+    weekly_values = weekly_forecast.set_index('ds')[['trend', 'yhat_lower', 'yhat_upper', 'yhat']]
+    weekly_values = weekly_values.reindex(daily['week']).to_numpy()
+
+    result = pd.DataFrame(weekly_values * weight[:, None], columns=['trend', 'yhat_lower', 'yhat_upper', 'yhat'])
+    result.insert(0, 'ds', daily['ds'])
+    return result
+
+
+# Fungsi untuk melakukan forecasting pada resolusi mingguan lalu dikembalikan ke harian
+def forecast_weekly(series_data, events, periods=31, changepoint_prior_scale=0.1):
+    """
+    Melatih Prophet pada total mingguan (sekitar 7x lebih sedikit observasi)
+    lalu membagi hasilnya ke harian dengan profil hari dalam minggu dan event.
+
+    Parameters:
+    - series_data: DataFrame dengan kolom 'ds' dan 'y' (harian).
+    - events: DataFrame events Prophet.
+    - periods: Jumlah hari ke depan untuk forecasting.
+
+    Returns:
+    - DataFrame harian dengan bentuk yang sama seperti hasil `model.predict`
+      pada `model.make_future_dataframe(periods)` harian.
+    """
+    history_dates = pd.to_datetime(series_data['ds']).drop_duplicates().sort_values()
+    future_dates = pd.date_range(history_dates.max() + pd.Timedelta(days=1), periods=periods, freq='D')
+    dates = pd.concat([history_dates, pd.Series(future_dates)], ignore_index=True)
+
+    weekly = to_weekly(series_data)
+
+    # Event dipetakan ke minggu tempat event tersebut berada
+    weekly_events = events[['holiday']].copy()
+    weekly_events['ds'] = week_start(events['ds']).values
+
+    model = Prophet(
+        holidays=weekly_events,
+        changepoint_prior_scale=changepoint_prior_scale,
+        weekly_seasonality=False,
+        daily_seasonality=False
+    )
+    model.fit(weekly)
+
+    # Prediksi semua minggu yang mencakup histori dan periode ke depan
+    weeks = pd.DataFrame({'ds': week_start(dates).drop_duplicates().reset_index(drop=True)})
+    weekly_forecast = model.predict(weeks)
+
+    dow_share, event_factor = estimate_daily_profile(series_data, events)
+    return disaggregate_weekly(weekly_forecast, dow_share, event_factor, dates)